@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Everlast Voice Agent - Checkpoint Serialization Benchmark
+Compares the typed serializer against the previous json.dumps(default=...) path
+
+Run with: python benchmarks/bench_checkpoint_serde.py [turns] [iterations]
+"""
+
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from everlast_voice_agents import voice_serde
+from everlast_voice_agents.voice_serde import dumps_state, loads_state, upgrade_v0
+from everlast_voice_agents.voice_state import BANTState, ObjectionRecord, create_initial_state
+
+
+def build_state(turns: int) -> dict:
+    """Conversation state after the given number of caller/agent turns"""
+    state = create_initial_state("bench-conversation", "+4915112345678")
+    state["bant"] = BANTState(budget="Ja", authority="Entscheider", need="Hoch")
+    state["objections"] = [ObjectionRecord(type="Preis", text="Das ist mir zu teuer")]
+    messages = []
+    for turn in range(turns):
+        messages.append(HumanMessage(content=f"Wir haben etwa {turn * 10} Anfragen pro Tag, das ist viel Arbeit."))
+        messages.append(AIMessage(content="Verstehe. Wie entscheiden Sie bei Ihnen über neue Software?"))
+        state["caller_sentiment"].update("neutral", 0.1, 0.6)
+    state["messages"] = messages
+    return state
+
+
+def legacy_encode(state: dict) -> str:
+    """Previous path: model_dump fallback, str() for everything else"""
+    return json.dumps(state, default=lambda v: v.model_dump() if hasattr(v, "model_dump") else str(v))
+
+
+def main():
+    turns = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    state = build_state(turns)
+
+    legacy_blob = legacy_encode(state)
+    typed_blob = dumps_state(state)
+
+    results = {
+        "legacy encode": timeit.timeit(lambda: legacy_encode(state), number=iterations),
+        "legacy decode": timeit.timeit(lambda: json.loads(legacy_blob), number=iterations),
+        # What the legacy format costs once it is rehydrated into models as well
+        "legacy rehydrate": timeit.timeit(lambda: upgrade_v0(json.loads(legacy_blob)), number=iterations),
+        "typed encode": timeit.timeit(lambda: dumps_state(state), number=iterations),
+        "typed decode": timeit.timeit(lambda: loads_state(typed_blob), number=iterations),
+    }
+
+    print(f"\n{'='*60}")
+    print(f"Checkpoint serialization: {turns} turns, {iterations} iterations")
+    print(f"Backend: {'orjson' if voice_serde.ORJSON_AVAILABLE else 'json'}")
+    print('='*60)
+    print(f"Payload size: legacy {len(legacy_blob)} bytes, typed {len(typed_blob)} bytes")
+    for name, seconds in results.items():
+        print(f"{name:<18} {seconds / iterations * 1e6:10.1f} µs/op")
+
+    # Encode runs on every turn; decode only on cold loads (cache misses)
+    print(f"\nPer-turn encode: {results['typed encode'] / results['legacy encode']:.2f}x of legacy time")
+    print(f"Typed reload: {results['typed decode'] / results['legacy rehydrate']:.2f}x of legacy decode + rehydrate")
+    # Legacy decode leaves dicts behind; typed decode returns live models
+    print(f"Reloaded bant: {type(loads_state(typed_blob)['bant']).__name__} "
+          f"(legacy: {type(json.loads(legacy_blob)['bant']).__name__})")
+
+
+if __name__ == "__main__":
+    main()
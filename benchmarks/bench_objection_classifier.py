@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Everlast Voice Agent - Objection Classifier Benchmark
+Compares the compiled config-driven classifier against the previous per-keyword loop
+
+Run with: python benchmarks/bench_objection_classifier.py [iterations]
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from everlast_voice_agents.voice_objections import ObjectionClassifier, load_objection_classifier
+
+UTTERANCES = [
+    "Das ist uns ehrlich gesagt zu teuer, dafür haben wir kein Budget.",
+    "Ich habe gerade keine Zeit, rufen Sie später an.",
+    "Das muss ich erst mit meinem Chef abstimmen.",
+    "Wir nutzen bereits ChatGPT für so etwas.",
+    "Nein danke, wir sind nicht interessiert, das brauchen wir nicht.",
+    "Mit einem Roboter möchte ich nicht sprechen, KI ist doch nur Hype.",
+    "Wie genau funktioniert denn die Anbindung an unser CRM und was passiert mit den Daten?",
+]
+
+# Previous inline classification in the objection handler
+LEGACY_TYPES = {
+    "preis": ["teuer", "budget", "kosten", "geld", "preis"],
+    "zeit": ["keine zeit", "später", "busy", "termin"],
+    "nicht_entscheider": ["chef", "gf", "abstimmen", "nicht meine"],
+    "bereits_loesung": ["haben schon", "nutzen bereits", "chatgpt"],
+    "kein_bedarf": ["nicht interessiert", "kein bedarf", "brauchen nicht"],
+    "misstrauen": ["hype", "funktioniert nicht", "robeter"]
+}
+
+
+def legacy_classify(text: str) -> str:
+    message_lower = text.lower()
+    for obj, keywords in LEGACY_TYPES.items():
+        if any(kw in message_lower for kw in keywords):
+            return obj
+    return "Andere"
+
+
+def scaled_config(classifier: ObjectionClassifier, factor: int) -> dict:
+    """Config with `factor` times the patterns per entry (synthetic variants that never match)"""
+    scaled = {}
+    for key, entry in classifier.entries.items():
+        patterns = list(entry.get("patterns") or [])
+        patterns += [f"{pattern}x{i}" for i in range(1, factor) for pattern in patterns]
+        scaled[key] = {**entry, "patterns": patterns}
+    return scaled
+
+
+def legacy_for(config: dict):
+    """Legacy substring loop over an arbitrary config"""
+    types = {key: [p.lower() for p in entry.get("patterns") or []] for key, entry in config.items()}
+
+    def classify(text: str) -> str:
+        message_lower = text.lower()
+        for obj, keywords in types.items():
+            if any(kw in message_lower for kw in keywords):
+                return obj
+        return "Andere"
+
+    return classify
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    classifier = load_objection_classifier()
+    patterns = sum(len(entry.get("patterns") or []) for entry in classifier.entries.values())
+
+    results = {
+        "legacy keyword loop": timeit.timeit(lambda: [legacy_classify(u) for u in UTTERANCES], number=iterations),
+        "compiled classifier": timeit.timeit(lambda: [classifier.classify(u) for u in UTTERANCES], number=iterations),
+    }
+
+    print(f"\n{'='*60}")
+    print(f"Objection classification: {len(UTTERANCES)} utterances, {patterns} config patterns, {iterations} iterations")
+    print(f"{'='*60}")
+    baseline = results["legacy keyword loop"]
+    for name, seconds in results.items():
+        per_utterance = seconds / (iterations * len(UTTERANCES)) * 1e6
+        throughput = iterations * len(UTTERANCES) / seconds
+        print(f"  {name:<22} {per_utterance:6.2f} µs/utterance  {throughput:10.0f}/s  ({seconds / baseline:.2f}x)")
+
+    # Worst case for the legacy loop: nothing matches, so every pattern is tried
+    miss = UTTERANCES[-1]
+    print(f"\nNo-match utterance vs. pattern count ({iterations} iterations):")
+    for factor in (1, 4, 16):
+        config = scaled_config(classifier, factor)
+        scaled = ObjectionClassifier(config)
+        legacy = legacy_for(config)
+        count = sum(len(entry["patterns"]) for entry in config.values())
+        legacy_us = timeit.timeit(lambda: legacy(miss), number=iterations) / iterations * 1e6
+        compiled_us = timeit.timeit(lambda: scaled.classify(miss), number=iterations) / iterations * 1e6
+        print(f"  {count:4d} patterns   legacy {legacy_us:6.2f} µs   compiled {compiled_us:6.2f} µs")
+
+    print("\nClassifications:")
+    for text in UTTERANCES:
+        match = classifier.classify(text)
+        print(f"  {legacy_classify(text):<18} -> {match.type:<18} {match.confidence:.2f}  {text[:40]!r}")
+
+
+if __name__ == "__main__":
+    main()
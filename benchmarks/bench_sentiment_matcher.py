@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Everlast Voice Agent - Sentiment Matcher Benchmark
+Compares the compiled single-pass matcher against the previous per-keyword substring scans
+
+Run with: python benchmarks/bench_sentiment_matcher.py [iterations]
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from everlast_voice_agents.voice_sentiment import DEFAULT_SENTIMENT_LEXICON, SentimentMatcher
+
+UTTERANCES = [
+    "Ja, das klingt interessant, wir haben im Januar sowieso Budget eingeplant.",
+    "Nein, das ist mir gerade nicht wichtig, rufen Sie bitte nächste Woche nochmal an.",
+    "Wow, das ist ja genial, genau so etwas suchen wir schon seit Monaten für unseren Vertrieb.",
+    "Ich bin ehrlich gesagt genervt, das ist schon der dritte Anruf diese Woche.",
+    "Wir sind ein Team von zwanzig Leuten und bearbeiten etwa hundert Anfragen am Tag, "
+    "davon ist vieles manuell und wiederholt sich ständig, das kostet uns sehr viel Zeit.",
+]
+
+
+def legacy_count(text: str) -> tuple:
+    """Previous path: one substring search per keyword"""
+    text_lower = text.lower()
+    return tuple(
+        sum(1 for word in DEFAULT_SENTIMENT_LEXICON[category] if word in text_lower)
+        for category in ("positive", "negative", "frustration", "excitement")
+    )
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    matcher = SentimentMatcher(DEFAULT_SENTIMENT_LEXICON)
+    words = sum(len(u.split()) for u in UTTERANCES)
+
+    results = {
+        "legacy substring scans": timeit.timeit(lambda: [legacy_count(u) for u in UTTERANCES], number=iterations),
+        "compiled matcher": timeit.timeit(lambda: [matcher.count(u) for u in UTTERANCES], number=iterations),
+    }
+
+    print(f"\n{'='*60}")
+    print(f"Sentiment matching: {len(UTTERANCES)} utterances, {words} words, {iterations} iterations")
+    print(f"{'='*60}")
+    baseline = results["legacy substring scans"]
+    for name, seconds in results.items():
+        per_utterance = seconds / (iterations * len(UTTERANCES)) * 1e6
+        per_word = seconds / (iterations * words) * 1e9
+        print(f"  {name:<24} {per_utterance:7.2f} µs/utterance  {per_word:6.0f} ns/word  ({seconds / baseline:.2f}x)")
+
+    print("\nFalse positives fixed by word matching:")
+    for text in ("Im Januar", "Das ist nichts für uns", "Gutachten liegt vor"):
+        print(f"  {text!r:<28} legacy={legacy_count(text)} matcher={matcher.count(text)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Everlast Voice Agent - Batch Sentiment Re-Scoring Benchmark
+Compares analyze_sentiment per utterance against the batch scorer used by voice_rescoring
+
+Run with: python benchmarks/bench_sentiment_rescoring.py [calls]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from everlast_voice_agents.voice_rescoring import CallTranscript, score_calls
+from everlast_voice_agents.voice_state import SentimentState, analyze_sentiment
+
+UTTERANCES = [
+    "Ja, das klingt interessant, wir haben im Januar sowieso Budget eingeplant.",
+    "Nein, das ist mir gerade nicht wichtig, rufen Sie bitte nächste Woche nochmal an.",
+    "Wow, das ist ja genial, genau so etwas suchen wir schon seit Monaten.",
+    "Ich bin ehrlich gesagt genervt, das ist schon der dritte Anruf diese Woche.",
+    "Wir sind ein Team von zwanzig Leuten und bearbeiten etwa hundert Anfragen am Tag.",
+    "Okay.",
+]
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    rng = random.Random(42)
+    corpus = [
+        CallTranscript(f"conv-{i}", [rng.choice(UTTERANCES) for _ in range(rng.randint(5, 40))])
+        for i in range(calls)
+    ]
+    utterances = sum(len(call.utterances) for call in corpus)
+
+    started = time.perf_counter()
+    for call in corpus:
+        state = SentimentState()
+        for text in call.utterances:
+            analyze_sentiment(text, state)
+    per_state = time.perf_counter() - started
+
+    started = time.perf_counter()
+    score_calls(corpus)
+    batch = time.perf_counter() - started
+
+    print(f"\n{'='*60}")
+    print(f"Re-scoring {calls} calls, {utterances} utterances")
+    print(f"{'='*60}")
+    print(f"  analyze_sentiment per utterance  {per_state:7.2f} s  ({utterances / per_state:9.0f} utterances/s)")
+    print(f"  batch scorer                     {batch:7.2f} s  ({utterances / batch:9.0f} utterances/s)")
+    print(f"  speedup                          {per_state / batch:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Everlast Voice Agent - SQLite Checkpointer Throughput Benchmark
+Compares the pooled WAL SqliteSaver against a connection-per-operation saver
+
+Run with: python benchmarks/bench_sqlite_checkpointer.py [callers] [turns]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import aiosqlite
+
+from everlast_voice_agents.voice_checkpointer import SqliteSaver, split_state
+from everlast_voice_agents.voice_serde import dumps_state, loads_state
+
+
+class ConnectionPerOperationSaver:
+    """Previous behaviour: new connection, rollback journal and commit per call"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+
+    async def connect(self):
+        async with aiosqlite.connect(self.db_path) as conn:
+            await conn.execute(
+                "CREATE TABLE IF NOT EXISTS checkpoints (thread_id TEXT PRIMARY KEY, state TEXT NOT NULL)"
+            )
+            await conn.commit()
+
+    async def get(self, thread_id):
+        async with aiosqlite.connect(self.db_path) as conn:
+            async with conn.execute("SELECT state FROM checkpoints WHERE thread_id = ?", (thread_id,)) as cursor:
+                row = await cursor.fetchone()
+        return loads_state(row[0]) if row else None
+
+    async def set(self, thread_id, state):
+        scalar, _ = split_state(state)
+        async with aiosqlite.connect(self.db_path) as conn:
+            await conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (thread_id, state) VALUES (?, ?)",
+                (thread_id, dumps_state(scalar))
+            )
+            await conn.commit()
+
+    async def close(self):
+        pass
+
+
+async def caller(saver, index: int, turns: int):
+    """One simulated call: load, append a message, save - once per turn"""
+    thread_id = f"+4915{index:08d}"
+    for turn in range(turns):
+        state = await saver.get(thread_id) or {"phone_number": thread_id, "messages": []}
+        state["messages"] = list(state.get("messages", [])) + [f"Turn {turn}"]
+        await saver.set(thread_id, state)
+
+
+async def run(saver, callers: int, turns: int) -> float:
+    await saver.connect()
+    started = time.perf_counter()
+    await asyncio.gather(*(caller(saver, i, turns) for i in range(callers)))
+    elapsed = time.perf_counter() - started
+    await saver.close()
+    return elapsed
+
+
+async def main():
+    callers = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    turns = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    operations = callers * turns
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = await run(ConnectionPerOperationSaver(os.path.join(tmp, "legacy.db")), callers, turns)
+        pooled_saver = SqliteSaver(os.path.join(tmp, "pooled.db"))
+        pooled = await run(pooled_saver, callers, turns)
+
+    print(f"\n{'='*60}")
+    print(f"SQLite checkpointer: {callers} concurrent callers x {turns} turns")
+    print('='*60)
+    print(f"connection per operation {operations / legacy:10.0f} turns/s  ({legacy:.2f}s)")
+    print(f"pooled WAL + batching    {operations / pooled:10.0f} turns/s  ({pooled:.2f}s)")
+    print(f"\nSpeedup: {legacy / pooled:.1f}x")
+    print(f"Writer: {pooled_saver.stats()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -6,13 +6,23 @@ Production-ready client with error handling, retries, and caching
 import os
 import json
 import asyncio
-from datetime import datetime, timedelta
-from typing import Optional, Dict, List, Any, Tuple
+import bisect
+from datetime import datetime, timedelta, timezone as dt_timezone
+from zoneinfo import ZoneInfo
+from typing import Optional, Dict, List, Any, Tuple, AsyncIterator, Awaitable, Callable
 from dataclasses import dataclass, field
 from enum import Enum
 import httpx
 from functools import lru_cache
 import logging
+import time
+
+# HTTP/2 multiplexes concurrent requests over one connection (needs h2)
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -44,6 +54,11 @@ class CalendlyRateLimitError(CalendlyError):
     pass
 
 
+class CalendlyDeadlineExceeded(CalendlyError):
+    """The request could not finish before its deadline (rate limit wait, retries or timeout)"""
+    pass
+
+
 class BookingStatus(Enum):
     """Booking status enum"""
     PENDING = "pending"
@@ -87,6 +102,310 @@ class EventType:
     scheduling_url: Optional[str] = None
 
 
+@dataclass
+class SlotSuggestion:
+    """Bookable slot in the caller's timezone, ready to be read out"""
+    start: datetime
+    end: datetime
+    date: str  # YYYY-MM-DD
+    time: str  # HH:MM
+    label: str  # e.g. "Dienstag, 14.05. um 10:00 Uhr"
+
+
+WEEKDAYS_DE = ["Montag", "Dienstag", "Mittwoch", "Donnerstag", "Freitag", "Samstag", "Sonntag"]
+
+# Local start hours per time-of-day preference, [from, to)
+SLOT_PREFERENCES = {
+    "morning": (0, 12),
+    "afternoon": (12, 24),
+}
+
+
+def parse_calendly_time(value: str) -> datetime:
+    """Parse a Calendly ISO 8601 timestamp into an aware datetime"""
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def local_slot_start(date: str, time: str, timezone: str = "Europe/Berlin") -> Optional[datetime]:
+    """Aware start datetime for a date (YYYY-MM-DD) and time (HH:MM), None if invalid"""
+    try:
+        return datetime.fromisoformat(f"{date}T{time}:00").replace(tzinfo=ZoneInfo(timezone))
+    except (ValueError, KeyError):
+        return None
+
+
+@dataclass
+class _AvailabilityWindow:
+    """Sorted available slots of one event type"""
+    starts: List[datetime]
+    slots: List[TimeSlot]
+    window_start: datetime
+    window_end: datetime
+    loaded_at: float
+
+
+class RateLimiter:
+    """
+    Token bucket shared by all requests of one client (i.e. one worker).
+
+    Each request reserves a token; when the bucket is empty the request waits
+    its turn. A 429 pauses the whole bucket for Retry-After, so concurrent
+    calls back off together instead of each hitting the limit again. A
+    request whose wait would exceed its deadline is rejected immediately.
+    """
+
+    def __init__(self, rate: float = 10.0, burst: int = 20):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+
+        self.waiting = 0
+        self.queued = 0
+        self.throttled = 0
+        self.rejected = 0
+        self._wait_total = 0.0
+
+    def _reserve(self, now: float) -> float:
+        """Take a token (possibly on credit) and return the seconds to wait for it"""
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= 1
+        wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        return max(wait, self._paused_until - now)
+
+    async def acquire(self, deadline: Optional[float] = None) -> None:
+        """
+        Wait for a request slot
+
+        Args:
+            deadline: time.monotonic() by which the request must be sent
+
+        Raises:
+            CalendlyDeadlineExceeded: If the wait would pass the deadline
+        """
+        now = time.monotonic()
+        wait = self._reserve(now)
+        if deadline is not None and now + wait >= deadline:
+            self._tokens += 1
+            self.rejected += 1
+            raise CalendlyDeadlineExceeded(f"Rate limit wait of {wait:.2f}s exceeds the deadline")
+        if wait <= 0:
+            return
+
+        self.queued += 1
+        self.waiting += 1
+        try:
+            await asyncio.sleep(wait)
+        finally:
+            self.waiting -= 1
+            self._wait_total += wait
+
+    def pause(self, seconds: float) -> None:
+        """Hold all requests for `seconds` after a 429"""
+        self.throttled += 1
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        """Throttling and queueing counters"""
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "waiting": self.waiting,
+            "queued": self.queued,
+            "throttled": self.throttled,
+            "rejected": self.rejected,
+            "paused_for_s": round(max(0.0, self._paused_until - time.monotonic()), 2),
+            "avg_wait_ms": round(self._wait_total / self.queued * 1000, 2) if self.queued else 0.0,
+        }
+
+
+class AvailabilityCache:
+    """
+    Rolling-window availability per event type, refreshed in the background.
+
+    Slots are kept sorted by parsed start time so lookups are a bisect
+    instead of a Calendly round-trip. Entries older than max_age are treated
+    as unknown (callers fall back to the API) and refreshed in the
+    background. Bookings and cancellations update the index immediately.
+    """
+
+    # Calendly accepts at most 7 days per available_times request
+    MAX_RANGE = timedelta(days=7)
+
+    def __init__(
+        self,
+        client: "CalendlyClient",
+        window_days: int = 14,
+        refresh_interval: float = 300.0
+    ):
+        self.client = client
+        self.window_days = window_days
+        self.refresh_interval = refresh_interval
+        self.max_age = refresh_interval * 2
+
+        self._windows: Dict[str, _AvailabilityWindow] = {}
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._tracked: set = set()
+
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+
+    def _window(self, event_type_uri: str) -> Optional[_AvailabilityWindow]:
+        """Fresh window for an event type, or None (and refresh it)"""
+        self._tracked.add(event_type_uri)
+        window = self._windows.get(event_type_uri)
+        if window is None or time.monotonic() - window.loaded_at > self.max_age:
+            self.refresh_soon(event_type_uri)
+            return None
+        return window
+
+    def lookup(self, event_type_uri: str, start: datetime) -> Optional[bool]:
+        """
+        Check a slot start against the cached availability
+
+        Returns:
+            True/False if the start lies inside a fresh cached window, None otherwise
+        """
+        window = self._window(event_type_uri)
+        if window is None or not window.window_start <= start < window.window_end:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        index = bisect.bisect_left(window.starts, start)
+        return index < len(window.starts) and window.starts[index] == start and window.slots[index].is_available
+
+    def slots_between(self, event_type_uri: str, start: datetime, end: datetime) -> Optional[List[TimeSlot]]:
+        """Available slots starting in [start, end), or None if not cached"""
+        window = self._window(event_type_uri)
+        if window is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        lo = bisect.bisect_left(window.starts, start)
+        hi = bisect.bisect_left(window.starts, end)
+        return [slot for slot in window.slots[lo:hi] if slot.is_available]
+
+    def remove_slot(self, event_type_uri: str, start: Optional[datetime]) -> None:
+        """Drop a slot that was just booked (or turned out to be taken)"""
+        window = self._windows.get(event_type_uri)
+        if window is None or start is None:
+            return
+        index = bisect.bisect_left(window.starts, start)
+        if index < len(window.starts) and window.starts[index] == start:
+            del window.starts[index]
+            del window.slots[index]
+
+    def invalidate(self, event_type_uri: Optional[str] = None) -> None:
+        """Forget cached availability (all event types by default) and refetch in the background"""
+        targets = [event_type_uri] if event_type_uri else list(self._windows)
+        for uri in targets:
+            self._windows.pop(uri, None)
+            self.refresh_soon(uri)
+
+    async def refresh(self, event_type_uri: str) -> None:
+        """Load the rolling window for one event type from Calendly"""
+        self._tracked.add(event_type_uri)
+        # Calendly rejects start times in the past
+        window_start = datetime.now(dt_timezone.utc) + timedelta(minutes=1)
+        window_end = window_start + timedelta(days=self.window_days)
+
+        ranges = []
+        cursor = window_start
+        while cursor < window_end:
+            ranges.append((cursor, min(cursor + self.MAX_RANGE, window_end)))
+            cursor = ranges[-1][1]
+
+        try:
+            chunks = await asyncio.gather(*(
+                self.client._fetch_available_times(event_type_uri, start, end)
+                for start, end in ranges
+            ))
+        except CalendlyError:
+            self.refresh_errors += 1
+            raise
+
+        slots = sorted(
+            (slot for chunk in chunks for slot in chunk),
+            key=lambda slot: parse_calendly_time(slot.start_time)
+        )
+        self._windows[event_type_uri] = _AvailabilityWindow(
+            starts=[parse_calendly_time(slot.start_time) for slot in slots],
+            slots=slots,
+            window_start=window_start,
+            window_end=window_end,
+            loaded_at=time.monotonic()
+        )
+        self.refreshes += 1
+
+    def refresh_soon(self, event_type_uri: str) -> None:
+        """Start a background refresh unless one is already running"""
+        if event_type_uri in self._refreshing:
+            return
+        try:
+            task = asyncio.get_running_loop().create_task(self._refresh_quietly(event_type_uri))
+        except RuntimeError:
+            return  # no event loop (sync caller)
+        self._refreshing[event_type_uri] = task
+        task.add_done_callback(lambda _: self._refreshing.pop(event_type_uri, None))
+
+    async def ensure_loaded(self, event_type_uri: str) -> bool:
+        """Wait for the window of an event type, joining a running refresh if any"""
+        task = self._refreshing.get(event_type_uri)
+        if task is not None:
+            await asyncio.shield(task)
+        elif event_type_uri not in self._windows:
+            await self._refresh_quietly(event_type_uri)
+        return event_type_uri in self._windows
+
+    async def _refresh_quietly(self, event_type_uri: str) -> None:
+        try:
+            await self.refresh(event_type_uri)
+        except Exception as e:
+            logger.warning(f"Availability refresh failed for {event_type_uri}: {e}")
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            for uri in list(self._tracked):
+                await self._refresh_quietly(uri)
+            await asyncio.sleep(self.refresh_interval)
+
+    def start(self, event_type_uris: Optional[List[str]] = None) -> None:
+        """Refresh tracked event types every refresh_interval in the background"""
+        self._tracked.update(uri for uri in event_type_uris or [] if uri)
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.get_running_loop().create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        """Stop background refreshing"""
+        tasks = list(self._refreshing.values())
+        if self._refresh_task:
+            tasks.append(self._refresh_task)
+            self._refresh_task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss and refresh counters"""
+        lookups = self.hits + self.misses
+        return {
+            "event_types": len(self._windows),
+            "slots": sum(len(window.starts) for window in self._windows.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups * 100, 2) if lookups else 0,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+        }
+
+
 class CalendlyClient:
     """
     Production-ready Calendly API v2 Client
@@ -109,11 +428,24 @@ class CalendlyClient:
         event_type_uri: Optional[str] = None,
         timeout: int = 30,
         max_retries: int = 3,
-        retry_delay: float = 1.0
+        retry_delay: float = 1.0,
+        http2: bool = True,
+        max_connections: int = 10,
+        max_keepalive_connections: int = 5,
+        keepalive_expiry: float = 60.0,
+        availability_window_days: int = 14,
+        availability_refresh_interval: float = 300.0,
+        rate_limit: float = 10.0,
+        rate_burst: int = 20,
+        request_deadline: Optional[float] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None
     ):
         """
         Initialize Calendly client
 
+        Create one client per worker and reuse it: connections, the
+        event type cache and the metrics live as long as the client.
+
         Args:
             api_key: Calendly API token (or from CALENDLY_API_KEY env var)
             user_uri: Calendly user URI (or from CALENDLY_USER_URI env var)
@@ -121,6 +453,16 @@ class CalendlyClient:
             timeout: Request timeout in seconds
             max_retries: Maximum number of retry attempts
             retry_delay: Initial retry delay in seconds
+            http2: Use HTTP/2 if the h2 package is installed
+            max_connections: Connection pool size
+            max_keepalive_connections: Idle connections kept open
+            keepalive_expiry: Seconds an idle connection is kept open
+            availability_window_days: Days of availability kept in memory
+            availability_refresh_interval: Seconds between background refreshes
+            rate_limit: Requests per second allowed by the shared token bucket
+            rate_burst: Requests that may be sent at once before throttling
+            request_deadline: Default seconds a request (incl. waits and retries) may take
+            transport: Custom transport (tests)
         """
         self.api_key = api_key or os.getenv("CALENDLY_API_KEY")
         self.user_uri = user_uri or os.getenv("CALENDLY_USER_URI")
@@ -128,12 +470,22 @@ class CalendlyClient:
         self.timeout = timeout
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        self.request_deadline = request_deadline
+
+        self.http2 = http2 and HTTP2_AVAILABLE
 
         # Initialize with retry strategy
-        transport = httpx.AsyncHTTPTransport(
-            retries=max_retries,
-            limits=httpx.Limits(max_keepalive_connections=5, max_connections=10)
-        )
+        if transport is None:
+            transport = httpx.AsyncHTTPTransport(
+                retries=max_retries,
+                http2=self.http2,
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_keepalive_connections,
+                    keepalive_expiry=keepalive_expiry
+                )
+            )
+        self._transport = transport
 
         self.client = httpx.AsyncClient(
             transport=transport,
@@ -146,6 +498,23 @@ class CalendlyClient:
         self._event_types_cache: Optional[Tuple[List[EventType], datetime]] = None
         self._cache_ttl = timedelta(minutes=5)
 
+        # Available slots per event type (see start_availability_refresh)
+        self.availability = AvailabilityCache(
+            self,
+            window_days=availability_window_days,
+            refresh_interval=availability_refresh_interval
+        )
+
+        # Client-side throttling, shared by all coroutines using this client
+        self.rate_limiter = RateLimiter(rate=rate_limit, burst=rate_burst)
+
+        # Request metrics
+        self._deadline_exceeded = 0
+        self._requests = 0
+        self._in_flight = 0
+        self._request_errors = 0
+        self._request_time_total = 0.0
+
         self._validate_config()
 
     def _validate_config(self):
@@ -175,6 +544,7 @@ class CalendlyClient:
         self,
         method: str,
         endpoint: str,
+        deadline: Optional[float] = None,
         **kwargs
     ) -> Dict[str, Any]:
         """
@@ -183,29 +553,51 @@ class CalendlyClient:
         Args:
             method: HTTP method (GET, POST, etc.)
             endpoint: API endpoint (without base URL)
+            deadline: time.monotonic() by which the request must finish
+                (defaults to now + request_deadline)
             **kwargs: Additional arguments for httpx
 
         Returns:
             Response JSON as dict
 
         Raises:
+            CalendlyDeadlineExceeded: If the deadline cannot be met
             CalendlyError: Various Calendly-specific exceptions
         """
         url = f"{self.BASE_URL}/{endpoint.lstrip('/')}"
+        if deadline is None:
+            deadline = self.deadline_in(self.request_deadline)
 
+        try:
+            return await self._request_with_retries(method, url, endpoint, deadline, **kwargs)
+        except CalendlyDeadlineExceeded:
+            self._deadline_exceeded += 1
+            raise
+
+    async def _request_with_retries(
+        self,
+        method: str,
+        url: str,
+        endpoint: str,
+        deadline: Optional[float],
+        **kwargs
+    ) -> Dict[str, Any]:
+        """Retry loop of _make_request"""
         for attempt in range(self.max_retries):
+            await self.rate_limiter.acquire(deadline)
+            if deadline is not None:
+                # Never wait on the socket past the deadline
+                kwargs["timeout"] = min(self.timeout, self._remaining(deadline))
+
             try:
-                response = await self.client.request(
-                    method=method,
-                    url=url,
-                    **kwargs
-                )
+                response = await self._send(method, url, **kwargs)
 
-                # Handle rate limiting
+                # Handle rate limiting: pause every request of this worker,
+                # the next acquire() waits (or fails fast against the deadline)
                 if response.status_code == 429:
-                    retry_after = int(response.headers.get("Retry-After", 60))
-                    logger.warning(f"Rate limited. Retrying after {retry_after} seconds.")
-                    await asyncio.sleep(retry_after)
+                    retry_after = float(response.headers.get("Retry-After", 60))
+                    logger.warning(f"Rate limited. Pausing requests for {retry_after} seconds.")
+                    self.rate_limiter.pause(retry_after)
                     raise CalendlyRateLimitError("Rate limit exceeded")
 
                 # Handle auth errors
@@ -236,26 +628,97 @@ class CalendlyClient:
 
             except CalendlyRateLimitError:
                 if attempt < self.max_retries - 1:
-                    await asyncio.sleep(self.retry_delay * (2 ** attempt))
                     continue
                 raise
 
             except httpx.HTTPStatusError as e:
                 logger.error(f"HTTP error {e.response.status_code}: {e.response.text}")
                 if attempt < self.max_retries - 1:
-                    await asyncio.sleep(self.retry_delay * (2 ** attempt))
+                    await self._backoff(attempt, deadline)
                     continue
                 raise CalendlyError(f"HTTP error: {e.response.status_code}") from e
 
             except httpx.RequestError as e:
                 logger.error(f"Request error: {e}")
+                if isinstance(e, httpx.TimeoutException) and deadline is not None and time.monotonic() >= deadline:
+                    raise CalendlyDeadlineExceeded(f"Request timed out at its deadline: {endpoint}") from e
                 if attempt < self.max_retries - 1:
-                    await asyncio.sleep(self.retry_delay * (2 ** attempt))
+                    await self._backoff(attempt, deadline)
                     continue
                 raise CalendlyError(f"Request failed: {str(e)}") from e
 
         raise CalendlyError("Max retries exceeded")
 
+    @staticmethod
+    def deadline_in(seconds: Optional[float]) -> Optional[float]:
+        """Absolute deadline (time.monotonic()) `seconds` from now, None for no deadline"""
+        return time.monotonic() + seconds if seconds else None
+
+    @staticmethod
+    def _remaining(deadline: float) -> float:
+        """Seconds left until the deadline"""
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise CalendlyDeadlineExceeded("Deadline passed before the request was sent")
+        return remaining
+
+    async def _backoff(self, attempt: int, deadline: Optional[float]) -> None:
+        """Exponential backoff before a retry, failing fast if it would pass the deadline"""
+        delay = self.retry_delay * (2 ** attempt)
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            raise CalendlyDeadlineExceeded("No time left for another retry")
+        await asyncio.sleep(delay)
+
+    async def _send(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send one HTTP request and record latency metrics"""
+        self._requests += 1
+        self._in_flight += 1
+        started = time.perf_counter()
+        try:
+            return await self.client.request(method=method, url=url, **kwargs)
+        except httpx.RequestError:
+            self._request_errors += 1
+            raise
+        finally:
+            self._in_flight -= 1
+            self._request_time_total += time.perf_counter() - started
+
+    async def warm_up(self) -> bool:
+        """
+        Open a pooled connection (DNS, TCP, TLS) before the first call needs it
+
+        Also fills the event type cache. Failures are logged, not raised.
+
+        Returns:
+            True if the API was reachable
+        """
+        try:
+            if self.user_uri:
+                await self.get_event_types()
+            else:
+                await self.get_current_user()
+            return True
+        except Exception as e:
+            logger.warning(f"Calendly warm-up failed: {e}")
+            return False
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Connection pool and request latency metrics"""
+        # httpcore pool internals; absent for custom transports
+        connections = getattr(getattr(self._transport, "_pool", None), "connections", [])
+        idle = sum(1 for conn in connections if conn.is_idle())
+        return {
+            "http2": self.http2,
+            "connections": len(connections),
+            "idle_connections": idle,
+            "requests": self._requests,
+            "in_flight": self._in_flight,
+            "request_errors": self._request_errors,
+            "avg_latency_ms": round(self._request_time_total / self._requests * 1000, 2) if self._requests else 0.0,
+            "deadline_exceeded": self._deadline_exceeded,
+            "rate_limiter": self.rate_limiter.stats(),
+        }
+
     async def get_current_user(self) -> Dict[str, Any]:
         """
         Get current user information
@@ -374,34 +837,59 @@ class CalendlyClient:
             end = start + timedelta(days=7)
             end_date = end.strftime("%Y-%m-%d")
 
+        try:
+            return await self._fetch_available_times(
+                event_type_uri,
+                f"{start_date}T00:00:00",
+                f"{end_date}T23:59:59",
+                timezone
+            )
+        except CalendlyError as e:
+            logger.error(f"Failed to get available slots: {e}")
+            return []
+
+    async def _fetch_available_times(
+        self,
+        event_type_uri: str,
+        start_time: Any,
+        end_time: Any,
+        timezone: str = "Europe/Berlin"
+    ) -> List[TimeSlot]:
+        """
+        Fetch available times for one range (max 7 days), raising on errors
+
+        Args:
+            event_type_uri: Event type URI
+            start_time: Range start (ISO string or datetime)
+            end_time: Range end (ISO string or datetime)
+            timezone: Target timezone
+
+        Returns:
+            List of TimeSlot objects
+        """
         # Build query params
         params = {
             "event_type": event_type_uri,
-            "start_time": f"{start_date}T00:00:00",
-            "end_time": f"{end_date}T23:59:59",
+            "start_time": start_time.isoformat() if isinstance(start_time, datetime) else start_time,
+            "end_time": end_time.isoformat() if isinstance(end_time, datetime) else end_time,
             "timezone": timezone
         }
 
-        try:
-            response = await self._make_request(
-                "GET",
-                "/event_type_available_times",
-                params=params
-            )
-
-            slots = []
-            for item in response.get("collection", []):
-                slots.append(TimeSlot(
-                    start_time=item.get("start_time", ""),
-                    end_time=item.get("end_time", ""),
-                    is_available=item.get("status", "available") == "available"
-                ))
+        response = await self._make_request(
+            "GET",
+            "/event_type_available_times",
+            params=params
+        )
 
-            return slots
+        slots = []
+        for item in response.get("collection", []):
+            slots.append(TimeSlot(
+                start_time=item.get("start_time", ""),
+                end_time=item.get("end_time", ""),
+                is_available=item.get("status", "available") == "available"
+            ))
 
-        except CalendlyError as e:
-            logger.error(f"Failed to get available slots: {e}")
-            return []
+        return slots
 
     async def check_slot_availability(
         self,
@@ -424,6 +912,13 @@ class CalendlyClient:
         """
         start_datetime = f"{date}T{time}:00"
 
+        # Answer from the availability cache when the slot is inside its window
+        slot_start = local_slot_start(date, time, timezone)
+        if slot_start is not None:
+            cached = self.availability.lookup(event_type_uri, slot_start)
+            if cached is not None:
+                return cached
+
         # Get slots for the day
         slots = await self.get_available_slots(
             event_type_uri=event_type_uri,
@@ -439,6 +934,83 @@ class CalendlyClient:
 
         return False
 
+    async def suggest_slots(
+        self,
+        preference: Optional[str] = None,
+        after: Optional[datetime] = None,
+        n: int = 3,
+        timezone: str = "Europe/Berlin",
+        event_type_uri: Optional[str] = None,
+        one_per_day: bool = True
+    ) -> List[SlotSuggestion]:
+        """
+        Suggest the earliest bookable slots from cached availability
+
+        Args:
+            preference: "morning", "afternoon" or None for any time
+            after: Earliest start (defaults to now; naive values are in timezone)
+            n: Number of suggestions
+            timezone: Caller timezone for filtering and labels
+            event_type_uri: Event type URI (uses default if not specified)
+            one_per_day: Prefer different days before offering a second slot on one day
+
+        Returns:
+            Up to n SlotSuggestion objects, earliest first
+        """
+        if preference is not None and preference not in SLOT_PREFERENCES:
+            raise ValueError(f"Unknown slot preference: {preference}")
+
+        event_uri = event_type_uri or self.default_event_type_uri
+        if not event_uri:
+            return []
+
+        tz = ZoneInfo(timezone)
+        after = after or datetime.now(tz)
+        if after.tzinfo is None:
+            after = after.replace(tzinfo=tz)
+        until = after + timedelta(days=self.availability.window_days)
+
+        slots = self.availability.slots_between(event_uri, after, until)
+        if slots is None:
+            # Cold or stale cache: wait for the refresh, later calls are served from memory
+            if not await self.availability.ensure_loaded(event_uri):
+                return []
+            slots = self.availability.slots_between(event_uri, after, until) or []
+
+        hours = SLOT_PREFERENCES.get(preference, (0, 24))
+        candidates = []
+        for slot in slots:
+            start = parse_calendly_time(slot.start_time).astimezone(tz)
+            if hours[0] <= start.hour < hours[1]:
+                candidates.append((start, parse_calendly_time(slot.end_time).astimezone(tz)))
+
+        chosen = []
+        if one_per_day:
+            days = set()
+            for candidate in candidates:
+                if candidate[0].date() not in days:
+                    days.add(candidate[0].date())
+                    chosen.append(candidate)
+                    if len(chosen) == n:
+                        break
+        for candidate in candidates:
+            if len(chosen) >= n:
+                break
+            if candidate not in chosen:
+                chosen.append(candidate)
+        chosen.sort()
+
+        return [
+            SlotSuggestion(
+                start=start,
+                end=end,
+                date=start.strftime("%Y-%m-%d"),
+                time=start.strftime("%H:%M"),
+                label=f"{WEEKDAYS_DE[start.weekday()]}, {start.strftime('%d.%m.')} um {start.strftime('%H:%M')} Uhr"
+            )
+            for start, end in chosen
+        ]
+
     async def create_scheduling_link(
         self,
         event_type_uri: Optional[str] = None,
@@ -490,7 +1062,8 @@ class CalendlyClient:
         event_type_uri: Optional[str] = None,
         timezone: str = "Europe/Berlin",
         language: str = "de",
-        custom_questions: Optional[Dict[str, str]] = None
+        custom_questions: Optional[Dict[str, str]] = None,
+        deadline: Optional[float] = None
     ) -> CalendlyBookingResult:
         """
         Book an appointment via Calendly API
@@ -507,6 +1080,7 @@ class CalendlyClient:
             timezone: Timezone
             language: Language code
             custom_questions: Additional Q&A pairs
+            deadline: Seconds the booking may take (defaults to request_deadline)
 
         Returns:
             CalendlyBookingResult with success status
@@ -528,6 +1102,7 @@ class CalendlyClient:
 
         # Format datetime
         start_time = f"{date}T{time}:00"
+        booked_start = local_slot_start(date, time, timezone)
 
         # Build questions and answers
         questions_and_answers = []
@@ -585,6 +1160,7 @@ class CalendlyClient:
             response = await self._make_request(
                 "POST",
                 "/scheduled_events",
+                deadline=self.deadline_in(deadline),
                 json=payload
             )
 
@@ -595,6 +1171,8 @@ class CalendlyClient:
             invitees = resource.get("invitees", [])
             invitee_uri = invitees[0].get("uri") if invitees else None
 
+            self.availability.remove_slot(event_type_uri or self.default_event_type_uri, booked_start)
+
             return CalendlyBookingResult(
                 success=True,
                 status=BookingStatus.CONFIRMED,
@@ -611,6 +1189,9 @@ class CalendlyClient:
 
             # Check for double booking
             if "already taken" in error_message or "conflict" in error_message:
+                # Our cached availability was stale for this slot
+                self.availability.remove_slot(event_type_uri or self.default_event_type_uri, booked_start)
+                self.availability.refresh_soon(event_type_uri or self.default_event_type_uri)
                 return CalendlyBookingResult(
                     success=False,
                     status=BookingStatus.ERROR,
@@ -637,6 +1218,16 @@ class CalendlyClient:
                 raw_response={"error": str(e)}
             )
 
+        except CalendlyDeadlineExceeded as e:
+            logger.warning(f"Booking deadline exceeded: {e}")
+            return CalendlyBookingResult(
+                success=False,
+                status=BookingStatus.ERROR,
+                error_message="Die Buchung dauert gerade zu lange. Ich schicke Ihnen den Buchungslink per E-Mail.",
+                error_code="DEADLINE_EXCEEDED",
+                raw_response={"error": str(e)}
+            )
+
         except CalendlyError as e:
             logger.error(f"Booking failed: {e}")
             return CalendlyBookingResult(
@@ -672,6 +1263,8 @@ class CalendlyClient:
                 f"{invitee_uri}/cancellation",
                 json=payload
             )
+            # The freed slot is not known here: refetch cached availability
+            self.availability.invalidate()
             return True
 
         except CalendlyError as e:
@@ -697,6 +1290,33 @@ class CalendlyClient:
         except CalendlyNotFoundError:
             return None
 
+    def _scheduled_events_params(
+        self,
+        user_uri: Optional[str],
+        organization_uri: Optional[str],
+        start_date: Optional[str],
+        end_date: Optional[str],
+        status: Optional[str],
+        count: int
+    ) -> Dict[str, Any]:
+        """Query parameters for /scheduled_events"""
+        params = {"count": count}
+
+        if user_uri:
+            params["user"] = user_uri
+        elif self.user_uri:
+            params["user"] = self.user_uri
+
+        if organization_uri:
+            params["organization"] = organization_uri
+        if start_date:
+            params["min_start_time"] = start_date
+        if end_date:
+            params["max_start_time"] = end_date
+        if status:
+            params["status"] = status
+        return params
+
     async def list_scheduled_events(
         self,
         user_uri: Optional[str] = None,
@@ -707,7 +1327,7 @@ class CalendlyClient:
         count: int = 20
     ) -> List[Dict[str, Any]]:
         """
-        List scheduled events
+        List scheduled events (first page only, see iter_scheduled_events)
 
         Args:
             user_uri: Filter by user
@@ -720,21 +1340,7 @@ class CalendlyClient:
         Returns:
             List of scheduled events
         """
-        params = {"count": count}
-
-        if user_uri:
-            params["user"] = user_uri
-        elif self.user_uri:
-            params["user"] = self.user_uri
-
-        if organization_uri:
-            params["organization"] = organization_uri
-        if start_date:
-            params["min_start_time"] = start_date
-        if end_date:
-            params["max_start_time"] = end_date
-        if status:
-            params["status"] = status
+        params = self._scheduled_events_params(user_uri, organization_uri, start_date, end_date, status, count)
 
         response = await self._make_request(
             "GET",
@@ -744,8 +1350,116 @@ class CalendlyClient:
 
         return response.get("collection", [])
 
+    async def iter_scheduled_events(
+        self,
+        user_uri: Optional[str] = None,
+        organization_uri: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        status: Optional[str] = None,
+        page_size: int = 100,
+        prefetch: bool = True
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream all scheduled events, following Calendly's page tokens
+
+        At most two pages are held in memory. With prefetch the next page is
+        requested while the caller processes the current one.
+
+        Args:
+            user_uri: Filter by user
+            organization_uri: Filter by organization
+            start_date: Min start time (ISO 8601)
+            end_date: Max start time (ISO 8601)
+            status: Filter by status (active, canceled)
+            page_size: Results per request (Calendly allows up to 100)
+            prefetch: Fetch the next page in the background
+
+        Yields:
+            Scheduled event resources, in API order
+        """
+        params = self._scheduled_events_params(
+            user_uri, organization_uri, start_date, end_date, status, min(page_size, 100)
+        )
+
+        def fetch(page_token: Optional[str]) -> Awaitable[Dict[str, Any]]:
+            page_params = dict(params, page_token=page_token) if page_token else params
+            return self._make_request("GET", "/scheduled_events", params=page_params)
+
+        next_page: Optional[asyncio.Future] = None
+        try:
+            response = await fetch(None)
+            while True:
+                token = (response.get("pagination") or {}).get("next_page_token")
+                if token and prefetch:
+                    next_page = asyncio.ensure_future(fetch(token))
+
+                for event in response.get("collection", []):
+                    yield event
+
+                if not token:
+                    return
+                if next_page is not None:
+                    response = await next_page
+                    next_page = None
+                else:
+                    response = await fetch(token)
+        finally:
+            # Caller stopped early: drop the page that is still in flight
+            if next_page is not None and not next_page.done():
+                next_page.cancel()
+
+    async def collect_scheduled_events(
+        self,
+        handler: Optional[Callable[[Dict[str, Any]], Awaitable[Any]]] = None,
+        concurrency: int = 8,
+        **filters
+    ) -> List[Any]:
+        """
+        Collect all scheduled events, optionally processing each one
+
+        Events are streamed page by page; at most `concurrency` handler
+        calls run at the same time, so pages are not fetched faster than
+        they are processed.
+
+        Args:
+            handler: Async callback per event (e.g. reconcile with the appointments table)
+            concurrency: Maximum concurrent handler calls
+            **filters: Arguments for iter_scheduled_events
+
+        Returns:
+            Events (or handler results) in API order
+        """
+        if handler is None:
+            return [event async for event in self.iter_scheduled_events(**filters)]
+
+        semaphore = asyncio.Semaphore(concurrency)
+        tasks = []
+
+        async def run(event: Dict[str, Any]) -> Any:
+            try:
+                return await handler(event)
+            finally:
+                semaphore.release()
+
+        try:
+            async for event in self.iter_scheduled_events(**filters):
+                await semaphore.acquire()
+                tasks.append(asyncio.ensure_future(run(event)))
+            return list(await asyncio.gather(*tasks))
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+    def start_availability_refresh(self, event_type_uris: Optional[List[str]] = None) -> None:
+        """Keep availability of the given (default) event types warm in the background"""
+        self.availability.start(event_type_uris or [self.default_event_type_uri])
+
     async def close(self):
-        """Close HTTP client"""
+        """Stop background refreshes and close HTTP client"""
+        await self.availability.stop()
         await self.client.aclose()
 
     async def __aenter__(self):
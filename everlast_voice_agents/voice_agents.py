@@ -1,12 +1,13 @@
 # LangGraph Multi-Agent System for Everlast Voice Agent
 # Supervisor + 4 Specialized Agents with Checkpointing and Sentiment Analysis
 
-from typing import TypedDict, Annotated, Sequence, Optional, Literal
+from typing import TypedDict, Annotated, Awaitable, Callable, List, Sequence, Optional, Literal
 from langgraph.graph import StateGraph, END
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, SystemMessage
-from langchain_core.prompts import ChatPromptTemplate
 from langchain_anthropic import ChatAnthropic
 import operator
+import asyncio
+import functools
 import json
 import os
 from datetime import datetime
@@ -19,7 +20,10 @@ from .voice_state import (
     SentimentState, GuardrailsState, analyze_sentiment,
     calculate_lead_score, create_initial_state
 )
-from .voice_checkpointer import get_checkpointer, BaseCheckpointer
+from .voice_checkpointer import get_checkpointer, BaseCheckpointer, CachedCheckpointer
+from .voice_router import route_deterministic, router_stats, VALID_AGENTS
+from .voice_prompts import AgentPrompt, PROMPT_SHARED_CONTEXT, load_shared_context, prompt_stats
+from .voice_objections import classify_objection, template_response
 
 # ============================================================================
 # CHECKPOINTER SETUP
@@ -30,13 +34,24 @@ CHECKPOINTER_BACKEND = os.getenv("CHECKPOINTER_BACKEND", "sqlite")
 # Only pass db_path for SQLite backend
 checkpointer_kwargs = {}
 if CHECKPOINTER_BACKEND == "sqlite":
-    checkpointer_kwargs["db_path"] = "checkpoints.db"
+    checkpointer_kwargs["db_path"] = os.getenv("DATABASE_PATH", "checkpoints.db")
+    checkpointer_kwargs["pool_size"] = int(os.getenv("SQLITE_POOL_SIZE", "4"))
+    checkpointer_kwargs["write_batch_size"] = int(os.getenv("SQLITE_WRITE_BATCH_SIZE", "64"))
 
 checkpointer: BaseCheckpointer = get_checkpointer(
     backend=CHECKPOINTER_BACKEND,
     **checkpointer_kwargs
 )
 
+# Keep hot conversations in memory in front of the database
+if os.getenv("CHECKPOINT_CACHE", "true").lower() == "true":
+    checkpointer = CachedCheckpointer(
+        checkpointer,
+        max_entries=int(os.getenv("CHECKPOINT_CACHE_MAX_ENTRIES", "1000")),
+        ttl_seconds=float(os.getenv("CHECKPOINT_CACHE_TTL_SECONDS", "1800")),
+        write_behind=os.getenv("CHECKPOINT_WRITE_BEHIND", "false").lower() == "true"
+    )
+
 # ============================================================================
 # LLM SETUP
 # ============================================================================
@@ -47,6 +62,78 @@ llm = ChatAnthropic(
     max_tokens=1024
 )
 
+# ============================================================================
+# EXECUTION MODE
+# ============================================================================
+
+# "async" (default) runs the graph via graph.ainvoke with llm.ainvoke, so the
+# event loop keeps serving other calls while Anthropic answers.
+# "sync" keeps the legacy blocking graph.invoke path.
+AGENT_EXECUTION_MODE = os.getenv("AGENT_EXECUTION_MODE", "async")
+
+# "turn" (default) ends the graph run as soon as a specialist has produced the
+# caller-facing reply. "loop" keeps the legacy supervisor ↔ specialist cycle.
+AGENT_EXECUTION_SCOPE = os.getenv("AGENT_EXECUTION_SCOPE", "turn")
+
+# Maximum number of graph nodes (each at most one LLM call) per webhook turn
+MAX_TURN_NODES = int(os.getenv("MAX_TURN_NODES", "4"))
+if MAX_TURN_NODES < 2:
+    # Below two nodes the supervisor would run but no specialist could reply
+    raise ValueError(f"MAX_TURN_NODES must be at least 2 (supervisor + specialist), got {MAX_TURN_NODES}")
+
+# Supervisor routing: "hybrid" (default) decides locally and asks the LLM only
+# below ROUTER_CONFIDENCE_THRESHOLD, "llm" always asks, "rules" never asks.
+ROUTER_MODE = os.getenv("ROUTER_MODE", "hybrid")
+ROUTER_CONFIDENCE_THRESHOLD = float(os.getenv("ROUTER_CONFIDENCE_THRESHOLD", "0.75"))
+
+# Objection handling: answer clearly classified objections with the vetted
+# response/fallback texts from prompts/config.yaml instead of asking the LLM
+# (never for frustrated callers). 0.8 = a phrase or two hits of one type; a
+# single bare word (0.6) is too weak for a canned answer without the LLM.
+OBJECTION_TEMPLATES = os.getenv("OBJECTION_TEMPLATES", "true").lower() == "true"
+OBJECTION_TEMPLATE_MIN_CONFIDENCE = float(os.getenv("OBJECTION_TEMPLATE_MIN_CONFIDENCE", "0.8"))
+
+# ============================================================================
+# SLOT SUGGESTIONS
+# ============================================================================
+
+# Async (preference) -> slot labels, registered by the app (e.g. from the
+# Calendly availability cache). The booker offers these concrete slots
+# instead of asking the caller for a time first.
+SlotProvider = Callable[[Optional[str]], Awaitable[List[str]]]
+slot_provider: Optional[SlotProvider] = None
+
+# The suggestion must not hold up the reply: skip it after this many seconds
+SLOT_SUGGESTION_TIMEOUT = float(os.getenv("SLOT_SUGGESTION_TIMEOUT", "0.3"))
+
+
+def register_slot_provider(provider: Optional[SlotProvider]) -> None:
+    """Set (or clear with None) the slot source used by the Calendly booker"""
+    global slot_provider
+    slot_provider = provider
+
+
+def detect_slot_preference(message: str) -> Optional[str]:
+    """Map "vormittags"/"nachmittags" in a caller message to a slot preference"""
+    text = message.lower()
+    if "nachmittag" in text:
+        return "afternoon"
+    if "vormittag" in text or "morgens" in text:
+        return "morning"
+    return None
+
+
+async def _suggest_slots(state: AgentState) -> List[str]:
+    """Slot labels from the registered provider, or [] if none/slow/failing"""
+    if slot_provider is None:
+        return []
+    preference = detect_slot_preference(_last_caller_message(state))
+    try:
+        return list(await asyncio.wait_for(slot_provider(preference), SLOT_SUGGESTION_TIMEOUT))
+    except Exception as e:
+        print(f"Slot suggestion skipped: {e!r}")
+        return []
+
 # ============================================================================
 # AGENT DEFINITIONS
 # ============================================================================
@@ -146,6 +233,34 @@ SUMMARY-STRUKTUR:
 - Sentiment-Entwicklung
 - Nächste Schritte"""
 
+# Compiled once: shared context + the system prompts above are the cacheable
+# prefix of every call (the agent prompts alone are below the provider's
+# minimum cacheable length), per-turn details go into the hint block and the
+# human message
+SHARED_CONTEXT = load_shared_context() if PROMPT_SHARED_CONTEXT else ""
+
+SUPERVISOR_TEMPLATE = AgentPrompt(SUPERVISOR_PROMPT, """Letzte Nachricht: {last_message}
+
+Aktueller Agent: {current_agent}
+Call gestartet: {call_started}
+Call beendet: {call_ended}
+
+SENTIMENT KONTEXT:
+- Aktuelles Sentiment: {sentiment}
+- Sentiment-Score: {sentiment_score}
+- Verlauf: {sentiment_history}
+
+Berücksichtige das Sentiment beim Routing.""", shared=SHARED_CONTEXT, name="supervisor")
+BANT_TEMPLATE = AgentPrompt(
+    BANT_PROMPT,
+    "Letzte Nachricht: {last_message}\n\nBisher erfasst: {bant_so_far}",
+    shared=SHARED_CONTEXT,
+    name="bant_qualifier"
+)
+OBJECTION_TEMPLATE = AgentPrompt(OBJECTION_PROMPT, "Einwand: {last_message}", shared=SHARED_CONTEXT, name="objection_handler")
+CALENDLY_TEMPLATE = AgentPrompt(CALENDLY_PROMPT, "Letzte Nachricht: {last_message}", shared=SHARED_CONTEXT, name="calendly_booker")
+DSGVO_TEMPLATE = AgentPrompt(DSGVO_PROMPT, "Gespräch beginnt. Bitte Consent einholen.", shared=SHARED_CONTEXT, name="dsgvo_logger")
+
 # ============================================================================
 # GUARDRAILS FUNCTIONS
 # ============================================================================
@@ -210,52 +325,79 @@ def apply_guardrails(state: AgentState, response: str) -> tuple[str, GuardrailsS
 # ============================================================================
 # SENTIMENT-AWARE AGENT FUNCTIONS
 # ============================================================================
-
-def supervisor_agent(state: AgentState) -> dict:
-    """Supervisor: Routes to appropriate agent with sentiment awareness"""
+# Each agent is split into a prepare step (builds the LLM prompt) and a finish
+# step (turns the LLM response into a state update). The sync node calls
+# llm.invoke between the two, the async node awaits llm.ainvoke, so both
+# execution modes share the same routing and extraction logic.
+
+def _last_caller_message(state: AgentState) -> str:
+    """Latest caller utterance (skips supervisor routing markers)"""
+    for message in reversed(state.get("messages", [])):
+        if isinstance(message, HumanMessage):
+            return message.content
+    return state["messages"][-1].content if state.get("messages") else ""
+
+def _prepare_supervisor(state: AgentState) -> tuple[Optional[list], dict]:
+    """Update sentiment and build the supervisor prompt (None if rules decide)"""
     last_message = state["messages"][-1].content if state["messages"] else ""
 
     # Analyze sentiment
     current_sentiment = state.get("caller_sentiment", SentimentState())
     updated_sentiment = analyze_sentiment(last_message, current_sentiment)
 
+    context = {"last_message": last_message, "sentiment": updated_sentiment, "decision": None}
+
+    # Try the deterministic router first
+    if ROUTER_MODE != "llm":
+        decision = route_deterministic(state, last_message, updated_sentiment)
+        context["decision"] = decision
+        if ROUTER_MODE == "rules" or decision.confidence >= ROUTER_CONFIDENCE_THRESHOLD:
+            return None, context
+
     # Get sentiment for routing decision
     sentiment = updated_sentiment.current_sentiment
     sentiment_score = updated_sentiment.sentiment_score
 
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", SUPERVISOR_PROMPT),
-        ("human", f"""Letzte Nachricht: {last_message}
-
-Aktueller Agent: {state['current_agent']}
-Call gestartet: {state['call_started']}
-Call beendet: {state['call_ended']}
+    messages = SUPERVISOR_TEMPLATE.format_messages(
+        last_message=last_message,
+        current_agent=state['current_agent'],
+        call_started=state['call_started'],
+        call_ended=state['call_ended'],
+        sentiment=sentiment,
+        sentiment_score=sentiment_score,
+        sentiment_history=updated_sentiment.summary()
+    )
+    return messages, context
 
-SENTIMENT KONTEXT:
-- Aktuelles Sentiment: {sentiment}
-- Sentiment-Score: {sentiment_score}
-- Verlauf: {updated_sentiment.history}
+def _finish_supervisor(state: AgentState, context: dict, response) -> dict:
+    """Take the rule decision, or validate the LLM decision and apply overrides"""
+    last_message = context["last_message"]
+    updated_sentiment = context["sentiment"]
+    decision = context["decision"]
+    sentiment = updated_sentiment.current_sentiment
 
-Berücksichtige das Sentiment beim Routing.""")
-    ])
+    if response is None:
+        # Confident rule-based decision, no LLM call was made
+        target_agent = decision.agent
+        router_stats.record("rules", target_agent, decision.reason)
+    else:
+        target_agent = response.content.strip().lower()
 
-    response = llm.invoke(prompt.format_messages({}))
-    target_agent = response.content.strip().lower()
+        # Validate target agent
+        if target_agent not in VALID_AGENTS:
+            target_agent = "bant_qualifier"  # Default fallback
 
-    # Validate target agent
-    valid_agents = ["bant_qualifier", "objection_handler", "calendly_booker", "dsgvo_logger"]
-    if target_agent not in valid_agents:
-        target_agent = "bant_qualifier"  # Default fallback
+        # Sentiment-based routing override
+        if sentiment in ["frustriert", "negativ"] and target_agent != "objection_handler":
+            # Route to objection handler if caller seems frustrated
+            if "einwand" in last_message.lower() or "problem" in last_message.lower():
+                target_agent = "objection_handler"
 
-    # Sentiment-based routing override
-    if sentiment in ["frustriert", "negativ"] and target_agent != "objection_handler":
-        # Route to objection handler if caller seems frustrated
-        if "einwand" in last_message.lower() or "problem" in last_message.lower():
-            target_agent = "objection_handler"
+        if sentiment == "begeistert" and state.get("bant", BANTState()).is_complete():
+            # Route to calendly if enthusiastic and qualified
+            target_agent = "calendly_booker"
 
-    if sentiment == "begeistert" and state.get("bant", BANTState()).is_complete():
-        # Route to calendly if enthusiastic and qualified
-        target_agent = "calendly_booker"
+        router_stats.record("llm_fallback" if decision else "llm", target_agent)
 
     return {
         "current_agent": target_agent,
@@ -263,9 +405,9 @@ Berücksichtige das Sentiment beim Routing.""")
         "messages": [AIMessage(content=f"[SUPERVISOR → {target_agent}]")]
     }
 
-def bant_qualifier_agent(state: AgentState) -> dict:
-    """BANT Qualifier: Collects qualification data"""
-    last_message = state["messages"][-1].content
+def _prepare_bant_qualifier(state: AgentState) -> tuple[list, dict]:
+    """Build BANT qualifier prompt"""
+    last_message = _last_caller_message(state)
 
     # Consider sentiment in response
     sentiment = state.get("caller_sentiment", SentimentState())
@@ -275,12 +417,13 @@ def bant_qualifier_agent(state: AgentState) -> dict:
     elif sentiment.current_sentiment == "begeistert":
         tone_hint = "Der Caller ist begeistert! Nutze die positive Energie."
 
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", BANT_PROMPT + "\n" + tone_hint),
-        ("human", f"Letzte Nachricht: {last_message}\n\nBisher erfasst: {state['bant'].model_dump() if state.get('bant') else {}}")
-    ])
+    bant_so_far = state['bant'].model_dump() if state.get('bant') else {}
+    messages = BANT_TEMPLATE.format_messages(tone_hint, last_message=last_message, bant_so_far=bant_so_far)
+    return messages, {"last_message": last_message}
 
-    response = llm.invoke(prompt.format_messages({}))
+def _finish_bant_qualifier(state: AgentState, context: dict, response) -> dict:
+    """Apply guardrails and extract BANT info from the caller's message"""
+    last_message = context["last_message"]
 
     # Apply guardrails
     safe_response, updated_guardrails = apply_guardrails(state, response.content)
@@ -306,42 +449,49 @@ def bant_qualifier_agent(state: AgentState) -> dict:
         "messages": [AIMessage(content=safe_response)]
     }
 
-def objection_handler_agent(state: AgentState) -> dict:
-    """Objection Handler: Handles objections"""
-    last_message = state["messages"][-1].content
+def _prepare_objection_handler(state: AgentState) -> tuple[Optional[list], dict]:
+    """Build objection handler prompt (None if a configured template answers)"""
+    last_message = _last_caller_message(state)
+    sentiment = state.get("caller_sentiment", SentimentState())
+    objection = classify_objection(last_message)
+    context = {"last_message": last_message, "sentiment": sentiment, "objection": objection}
+
+    # Textbook objection, caller not frustrated: vetted answer, no LLM round trip
+    if (
+        OBJECTION_TEMPLATES
+        and objection.confidence >= OBJECTION_TEMPLATE_MIN_CONFIDENCE
+        and sentiment.current_sentiment != "frustriert"
+    ):
+        previous = sum(1 for record in state.get("objections", []) if record.type == objection.type)
+        template = template_response(objection, state.get("company_info") or CompanyInfo(), previous)
+        if template:
+            prompt_stats.record_template("objection_handler")
+            context["template"] = template
+            return None, context
 
     # Consider sentiment
-    sentiment = state.get("caller_sentiment", SentimentState())
     tone_hint = ""
     if sentiment.current_sentiment == "frustriert":
         tone_hint = "WICHTIG: Der Caller ist frustriert! Sei extrem geduldig, bestätige Gefühle, gehe langsam vor."
 
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", OBJECTION_PROMPT + "\n" + tone_hint),
-        ("human", f"Einwand: {last_message}")
-    ])
-
-    response = llm.invoke(prompt.format_messages({}))
+    messages = OBJECTION_TEMPLATE.format_messages(tone_hint, last_message=last_message)
+    return messages, context
 
-    # Apply guardrails
-    safe_response, updated_guardrails = apply_guardrails(state, response.content)
+def _finish_objection_handler(state: AgentState, context: dict, response) -> dict:
+    """Apply guardrails and record the objection"""
+    last_message = context["last_message"]
+    sentiment = context["sentiment"]
 
-    # Record objection
-    objection_types = {
-        "preis": ["teuer", "budget", "kosten", "geld", "preis"],
-        "zeit": ["keine zeit", "später", "busy", "termin"],
-        "nicht_entscheider": ["chef", "gf", "abstimmen", "nicht meine"],
-        "bereits_loesung": ["haben schon", "nutzen bereits", "chatgpt"],
-        "kein_bedarf": ["nicht interessiert", "kein bedarf", "brauchen nicht"],
-        "misstrauen": ["hype", "funktioniert nicht", "robeter"]
-    }
+    if response is None:
+        # Configured template: vetted text, the LLM guardrails do not apply
+        safe_response = context["template"]
+        updated_guardrails = state.get("guardrails", GuardrailsState())
+    else:
+        # Apply guardrails
+        safe_response, updated_guardrails = apply_guardrails(state, response.content)
 
-    obj_type = "Andere"
-    message_lower = last_message.lower()
-    for obj, keywords in objection_types.items():
-        if any(kw in message_lower for kw in keywords):
-            obj_type = obj
-            break
+    # Record objection (classified from prompts/config.yaml in _prepare_objection_handler)
+    obj_type = context["objection"].type
 
     # Determine outcome based on sentiment change
     outcome = "Offen"
@@ -361,9 +511,9 @@ def objection_handler_agent(state: AgentState) -> dict:
         "messages": [AIMessage(content=safe_response)]
     }
 
-def calendly_booker_agent(state: AgentState) -> dict:
-    """Calendly Booker: Books appointments"""
-    last_message = state["messages"][-1].content
+def _prepare_calendly_booker(state: AgentState, slots: Optional[List[str]] = None) -> tuple[list, dict]:
+    """Build Calendly booker prompt, offering the given free slots if any"""
+    last_message = _last_caller_message(state)
 
     # Consider sentiment for closing technique
     sentiment = state.get("caller_sentiment", SentimentState())
@@ -373,12 +523,17 @@ def calendly_booker_agent(state: AgentState) -> dict:
     elif sentiment.current_sentiment == "neutral":
         closing_hint = "Der Caller ist neutral. Gib zusätzliche Sicherheit und Vorteile."
 
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", CALENDLY_PROMPT + "\n" + closing_hint),
-        ("human", f"Letzte Nachricht: {last_message}")
-    ])
+    slot_hint = ""
+    if slots:
+        slot_hint = "Freie Termine (biete diese konkret an): " + "; ".join(slots)
 
-    response = llm.invoke(prompt.format_messages({}))
+    hint = "\n".join(part for part in (closing_hint, slot_hint) if part)
+    messages = CALENDLY_TEMPLATE.format_messages(hint, last_message=last_message)
+    return messages, {"last_message": last_message}
+
+def _finish_calendly_booker(state: AgentState, context: dict, response) -> dict:
+    """Apply guardrails and detect booking intent"""
+    last_message = context["last_message"]
 
     # Apply guardrails
     safe_response, updated_guardrails = apply_guardrails(state, response.content)
@@ -386,7 +541,8 @@ def calendly_booker_agent(state: AgentState) -> dict:
     # Check for booking intent
     message_lower = last_message.lower()
     booking_keywords = ["termin", "buchen", "reservieren", "passt", "gut", "ja"]
-    if any(kw in message_lower for kw in booking_keywords) and not state["appointment"]["booked"]:
+    appointment = state.get("appointment", AppointmentState())
+    if any(kw in message_lower for kw in booking_keywords) and not appointment.booked:
         return {
             "appointment": AppointmentState(
                 booked=True,
@@ -402,19 +558,18 @@ def calendly_booker_agent(state: AgentState) -> dict:
         "messages": [AIMessage(content=safe_response)]
     }
 
-def dsgvo_logger_agent(state: AgentState) -> dict:
-    """DSGVO Logger: Handles consent and logging"""
-    last_message = state["messages"][-1].content
-
+def _prepare_dsgvo_logger(state: AgentState) -> tuple[Optional[list], dict]:
+    """Build consent prompt at call start; no LLM call is needed otherwise"""
     # Check if this is start or end of call
     if not state["call_started"]:
         # Start of call - get consent
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", DSGVO_PROMPT),
-            ("human", "Gespräch beginnt. Bitte Consent einholen.")
-        ])
-        response = llm.invoke(prompt.format_messages({}))
+        return DSGVO_TEMPLATE.format_messages(), {}
+
+    return None, {}
 
+def _finish_dsgvo_logger(state: AgentState, context: dict, response) -> dict:
+    """Record consent or create the end-of-call summary"""
+    if not state["call_started"]:
         return {
             "call_started": True,
             "consent": ConsentState(
@@ -433,23 +588,16 @@ def dsgvo_logger_agent(state: AgentState) -> dict:
         # Calculate lead score
         score, reason = calculate_lead_score(bant, state.get("objections", []))
 
-        # Calculate sentiment trend
-        sentiment_trend = "gleich"
-        if sentiment.history and len(sentiment.history) >= 2:
-            first = sentiment.history[0].get("score", 0)
-            last = sentiment.history[-1].get("score", 0)
-            if last > first + 0.3:
-                sentiment_trend = "verbessert"
-            elif last < first - 0.3:
-                sentiment_trend = "verschlechtert"
+        # Sentiment trend from the running aggregates (history is only the latest window)
+        sentiment_trend = sentiment.trend()
 
         summary = f"""
 Gespräch mit {state['phone_number']}
 Lead-Score: {score}
 BANT: Budget={bant.budget}, Authority={bant.authority}, Need={bant.need}, Timeline={bant.timeline}
 Einwände: {len(state.get('objections', []))}
-Termin gebucht: {state.get('appointment', {}).get('booked', False)}
-Sentiment-Start: {sentiment.history[0]['sentiment'] if sentiment.history else 'neutral'}
+Termin gebucht: {state.get('appointment', AppointmentState()).booked}
+Sentiment-Start: {sentiment.start_sentiment}
 Sentiment-Ende: {sentiment.current_sentiment}
 Sentiment-Trend: {sentiment_trend}
 """
@@ -463,12 +611,87 @@ Sentiment-Trend: {sentiment_trend}
 
     return {"messages": []}
 
+def _invoke(agent: str, messages: list):
+    """llm.invoke with per-agent token and prompt-cache accounting"""
+    response = llm.invoke(messages)
+    prompt_stats.record(agent, response)
+    return response
+
+async def _ainvoke(agent: str, messages: list):
+    """llm.ainvoke with per-agent token and prompt-cache accounting"""
+    response = await llm.ainvoke(messages)
+    prompt_stats.record(agent, response)
+    return response
+
+# Sync nodes (legacy path, used with graph.invoke)
+
+def supervisor_agent(state: AgentState) -> dict:
+    """Supervisor: Routes to appropriate agent with sentiment awareness"""
+    prompt, context = _prepare_supervisor(state)
+    response = _invoke("supervisor", prompt) if prompt is not None else None
+    return _finish_supervisor(state, context, response)
+
+def bant_qualifier_agent(state: AgentState) -> dict:
+    """BANT Qualifier: Collects qualification data"""
+    prompt, context = _prepare_bant_qualifier(state)
+    return _finish_bant_qualifier(state, context, _invoke("bant_qualifier", prompt))
+
+def objection_handler_agent(state: AgentState) -> dict:
+    """Objection Handler: Handles objections"""
+    prompt, context = _prepare_objection_handler(state)
+    response = _invoke("objection_handler", prompt) if prompt is not None else None
+    return _finish_objection_handler(state, context, response)
+
+def calendly_booker_agent(state: AgentState) -> dict:
+    """Calendly Booker: Books appointments"""
+    prompt, context = _prepare_calendly_booker(state)
+    return _finish_calendly_booker(state, context, _invoke("calendly_booker", prompt))
+
+def dsgvo_logger_agent(state: AgentState) -> dict:
+    """DSGVO Logger: Handles consent and logging"""
+    prompt, context = _prepare_dsgvo_logger(state)
+    response = _invoke("dsgvo_logger", prompt) if prompt is not None else None
+    return _finish_dsgvo_logger(state, context, response)
+
+# Async nodes (default path, used with graph.ainvoke)
+
+async def asupervisor_agent(state: AgentState) -> dict:
+    """Supervisor (async): awaits the routing decision without blocking the loop"""
+    prompt, context = _prepare_supervisor(state)
+    response = await _ainvoke("supervisor", prompt) if prompt is not None else None
+    return _finish_supervisor(state, context, response)
+
+async def abant_qualifier_agent(state: AgentState) -> dict:
+    """BANT Qualifier (async)"""
+    prompt, context = _prepare_bant_qualifier(state)
+    return _finish_bant_qualifier(state, context, await _ainvoke("bant_qualifier", prompt))
+
+async def aobjection_handler_agent(state: AgentState) -> dict:
+    """Objection Handler (async)"""
+    prompt, context = _prepare_objection_handler(state)
+    response = await _ainvoke("objection_handler", prompt) if prompt is not None else None
+    return _finish_objection_handler(state, context, response)
+
+async def acalendly_booker_agent(state: AgentState) -> dict:
+    """Calendly Booker (async): offers concrete free slots when a provider is registered"""
+    prompt, context = _prepare_calendly_booker(state, await _suggest_slots(state))
+    return _finish_calendly_booker(state, context, await _ainvoke("calendly_booker", prompt))
+
+async def adsgvo_logger_agent(state: AgentState) -> dict:
+    """DSGVO Logger (async)"""
+    prompt, context = _prepare_dsgvo_logger(state)
+    response = await _ainvoke("dsgvo_logger", prompt) if prompt is not None else None
+    return _finish_dsgvo_logger(state, context, response)
+
 # ============================================================================
 # ROUTING LOGIC
 # ============================================================================
 
 def route_from_supervisor(state: AgentState) -> str:
     """Determine next node based on supervisor decision"""
+    # A finished call always goes to the logger for the summary
+    if state.get("call_ended"):
+        return "dsgvo_logger"
     return state["current_agent"]
 
 def should_end_call(state: AgentState) -> str:
@@ -481,68 +704,105 @@ def should_end_call(state: AgentState) -> str:
 
     return "supervisor"
 
+def route_after_agent(state: AgentState) -> str:
+    """Decide whether the turn continues after a specialist has replied"""
+    # Another supervisor → specialist hop costs two nodes
+    budget_left = MAX_TURN_NODES - state.get("turn_node_count", 0)
+
+    next_node = should_end_call(state)
+    if next_node == "dsgvo_logger":
+        return next_node if budget_left >= 1 else END
+
+    if AGENT_EXECUTION_SCOPE == "turn" or budget_left < 2:
+        return END
+
+    return next_node
+
+def count_node(node):
+    """Wrap a node so its state update increments the per-turn node counter"""
+    if asyncio.iscoroutinefunction(node):
+        @functools.wraps(node)
+        async def counted(state: AgentState) -> dict:
+            update = await node(state)
+            update["turn_node_count"] = state.get("turn_node_count", 0) + 1
+            return update
+    else:
+        @functools.wraps(node)
+        def counted(state: AgentState) -> dict:
+            update = node(state)
+            update["turn_node_count"] = state.get("turn_node_count", 0) + 1
+            return update
+    return counted
+
 # ============================================================================
 # GRAPH CONSTRUCTION
 # ============================================================================
 
-# Create the graph
-workflow = StateGraph(AgentState)
-
-# Add nodes
-workflow.add_node("supervisor", supervisor_agent)
-workflow.add_node("bant_qualifier", bant_qualifier_agent)
-workflow.add_node("objection_handler", objection_handler_agent)
-workflow.add_node("calendly_booker", calendly_booker_agent)
-workflow.add_node("dsgvo_logger", dsgvo_logger_agent)
-
-# Add edges
-workflow.set_entry_point("supervisor")
-
-# Supervisor routes to agents
-workflow.add_conditional_edges(
-    "supervisor",
-    route_from_supervisor,
-    {
-        "bant_qualifier": "bant_qualifier",
-        "objection_handler": "objection_handler",
-        "calendly_booker": "calendly_booker",
-        "dsgvo_logger": "dsgvo_logger"
-    }
-)
+SYNC_NODES = {
+    "supervisor": supervisor_agent,
+    "bant_qualifier": bant_qualifier_agent,
+    "objection_handler": objection_handler_agent,
+    "calendly_booker": calendly_booker_agent,
+    "dsgvo_logger": dsgvo_logger_agent
+}
+
+ASYNC_NODES = {
+    "supervisor": asupervisor_agent,
+    "bant_qualifier": abant_qualifier_agent,
+    "objection_handler": aobjection_handler_agent,
+    "calendly_booker": acalendly_booker_agent,
+    "dsgvo_logger": adsgvo_logger_agent
+}
+
+def build_graph(nodes: dict):
+    """Build and compile the agent graph from a set of node functions"""
+    workflow = StateGraph(AgentState)
+
+    # Add nodes
+    for name, node in nodes.items():
+        workflow.add_node(name, count_node(node))
+
+    # Add edges
+    workflow.set_entry_point("supervisor")
+
+    # Supervisor routes to agents
+    workflow.add_conditional_edges(
+        "supervisor",
+        route_from_supervisor,
+        {
+            "bant_qualifier": "bant_qualifier",
+            "objection_handler": "objection_handler",
+            "calendly_booker": "calendly_booker",
+            "dsgvo_logger": "dsgvo_logger"
+        }
+    )
 
-# All agents return to supervisor (or end)
-workflow.add_conditional_edges(
-    "bant_qualifier",
-    should_end_call,
-    {
-        "supervisor": "supervisor",
-        "dsgvo_logger": "dsgvo_logger"
-    }
-)
+    # Agents end the turn, hand over to the logger, or loop back to supervisor
+    for agent in ["bant_qualifier", "objection_handler", "calendly_booker"]:
+        workflow.add_conditional_edges(
+            agent,
+            route_after_agent,
+            {
+                "supervisor": "supervisor",
+                "dsgvo_logger": "dsgvo_logger",
+                END: END
+            }
+        )
 
-workflow.add_conditional_edges(
-    "objection_handler",
-    should_end_call,
-    {
-        "supervisor": "supervisor",
-        "dsgvo_logger": "dsgvo_logger"
-    }
-)
+    # DSGVO logger ends the flow
+    workflow.add_edge("dsgvo_logger", END)
 
-workflow.add_conditional_edges(
-    "calendly_booker",
-    should_end_call,
-    {
-        "supervisor": "supervisor",
-        "dsgvo_logger": "dsgvo_logger"
-    }
-)
+    return workflow.compile()
 
-# DSGVO logger ends the flow
-workflow.add_edge("dsgvo_logger", END)
+# Compile the graphs: sync nodes for graph.invoke, async nodes for graph.ainvoke
+graph = build_graph(SYNC_NODES)
+async_graph = build_graph(ASYNC_NODES)
 
-# Compile the graph
-graph = workflow.compile()
+async def run_graph(state: AgentState) -> dict:
+    """Run the agent graph in the configured execution mode"""
+    if AGENT_EXECUTION_MODE == "sync":
+        return graph.invoke(state)
+    return await async_graph.ainvoke(state)
 
 # ============================================================================
 # PUBLIC INTERFACE WITH CHECKPOINTING
@@ -566,7 +826,8 @@ async def process_message(
         sentiment_data: Optional Deepgram sentiment data
 
     Returns:
-        Updated state with agent response
+        Updated state with agent response; turn_node_count holds the number
+        of graph nodes executed for this message
     """
     # Try to load existing state from checkpoint (for return callers)
     if state is None:
@@ -574,15 +835,24 @@ async def process_message(
         if checkpoint:
             state = checkpoint
             print(f"Loaded checkpoint for {phone_number}")
+            if state.get("conversation_id") != conversation_id:
+                # Returning caller, new call: keep the context, but rows and
+                # summaries of this call belong to the new conversation id
+                state["conversation_id"] = conversation_id
+                state["call_message_offset"] = len(state.get("messages", []))
+                state["call_ended"] = False
         else:
             # Initialize new state
             state = create_initial_state(
                 conversation_id=conversation_id,
                 phone_number=phone_number
             )
-    else:
-        # Add message to existing state
-        state["messages"] = list(state.get("messages", [])) + [HumanMessage(content=message)]
+
+    # Add message to state
+    state["messages"] = list(state.get("messages", [])) + [HumanMessage(content=message)]
+
+    # Start a fresh node budget for this turn
+    state["turn_node_count"] = 0
 
     # Update sentiment if Deepgram data provided
     if sentiment_data and "caller_sentiment" in state:
@@ -593,7 +863,7 @@ async def process_message(
         )
 
     # Run through graph
-    result = graph.invoke(state)
+    result = await run_graph(state)
 
     # Save checkpoint (thread_id = phone_number)
     await checkpointer.set(phone_number, result)
@@ -612,7 +882,8 @@ async def end_conversation(state: dict, phone_number: str) -> dict:
         Final state with summary
     """
     state["call_ended"] = True
-    result = graph.invoke(state)
+    state["turn_node_count"] = 0
+    result = await run_graph(state)
 
     # Save final checkpoint
     await checkpointer.set(phone_number, result)
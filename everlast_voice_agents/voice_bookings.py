@@ -0,0 +1,190 @@
+# Deferred Bookings for Everlast Voice Agent
+# Answer a booking tool call within the voice latency budget, finish it in the background
+
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from collections import OrderedDict
+from datetime import datetime
+import asyncio
+import time
+import uuid
+
+PENDING = "pending"
+CONFIRMED = "confirmed"
+FAILED = "failed"
+
+
+@dataclass
+class BookingTicket:
+    """One booking request and, once finished, its outcome"""
+    booking_id: str
+    conversation_id: str
+    status: str = PENDING
+    result: Optional[Dict[str, Any]] = None
+    context: Dict[str, Any] = field(default_factory=dict)
+    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    completed_at: Optional[str] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status != PENDING
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Status payload for the API and the getBookingStatus tool"""
+        return {
+            "booking_id": self.booking_id,
+            "conversation_id": self.conversation_id,
+            "status": self.status,
+            "result": self.result,
+            "created_at": self.created_at,
+            "completed_at": self.completed_at,
+        }
+
+
+# Called once per ticket when its booking has finished (persist, follow up)
+CompletionHandler = Callable[[BookingTicket], Awaitable[None]]
+
+
+class DeferredBookings:
+    """
+    Runs bookings as background tasks and waits for them only up to a budget.
+
+    submit() returns within latency_budget seconds: with the final ticket if
+    the booking was fast enough, otherwise with a pending ticket while the
+    booking keeps running. on_complete is called exactly once per ticket in
+    both cases, so persistence does not depend on who was waiting. Finished
+    tickets stay queryable for `retention` seconds.
+    """
+
+    def __init__(
+        self,
+        on_complete: Optional[CompletionHandler] = None,
+        latency_budget: float = 1.5,
+        retention: float = 3600.0,
+        max_tickets: int = 10000
+    ):
+        self.on_complete = on_complete
+        self.latency_budget = latency_budget
+        self.retention = retention
+        self.max_tickets = max_tickets
+
+        self._tickets: "OrderedDict[str, BookingTicket]" = OrderedDict()
+        self._expires: Dict[str, float] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+        self.submitted = 0
+        self.deferred = 0
+        self.confirmed = 0
+        self.failed = 0
+
+    async def submit(
+        self,
+        conversation_id: str,
+        book: Callable[[], Awaitable[Dict[str, Any]]],
+        context: Optional[Dict[str, Any]] = None,
+        wait_for_result: bool = False
+    ) -> BookingTicket:
+        """
+        Start a booking and wait for it at most latency_budget seconds.
+
+        Args:
+            conversation_id: Conversation the booking belongs to
+            book: Coroutine factory returning the booking result dict ("success" key)
+            context: Request data handed to on_complete (e.g. the tool parameters)
+            wait_for_result: Wait until the booking has finished, ignoring the
+                latency budget (blocking mode; book() should bound itself)
+
+        Returns:
+            The ticket - check ticket.done to see whether the result is final
+        """
+        self._prune()
+        ticket = BookingTicket(
+            booking_id=str(uuid.uuid4()),
+            conversation_id=conversation_id,
+            context=context or {}
+        )
+        self._tickets[ticket.booking_id] = ticket
+        self.submitted += 1
+
+        task = asyncio.create_task(self._run(ticket, book))
+        self._tasks[ticket.booking_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(ticket.booking_id, None))
+
+        if wait_for_result:
+            await asyncio.shield(task)
+            return ticket
+        try:
+            await asyncio.wait_for(asyncio.shield(task), self.latency_budget)
+        except asyncio.TimeoutError:
+            self.deferred += 1
+        return ticket
+
+    async def _run(self, ticket: BookingTicket, book: Callable[[], Awaitable[Dict[str, Any]]]) -> None:
+        """Execute the booking, record the outcome and notify on_complete"""
+        try:
+            result = await book()
+        except Exception as e:
+            result = {"success": False, "error": str(e), "error_code": "CLIENT_ERROR"}
+
+        ticket.result = result
+        ticket.status = CONFIRMED if result.get("success") else FAILED
+        ticket.completed_at = datetime.now().isoformat()
+        self._expires[ticket.booking_id] = time.monotonic() + self.retention
+        if ticket.status == CONFIRMED:
+            self.confirmed += 1
+        else:
+            self.failed += 1
+
+        if self.on_complete:
+            try:
+                await self.on_complete(ticket)
+            except Exception as e:
+                print(f"Booking completion handler failed ({ticket.booking_id}): {e}")
+
+    def get(self, booking_id: str) -> Optional[BookingTicket]:
+        """Ticket by booking id"""
+        self._prune()
+        return self._tickets.get(booking_id)
+
+    def for_conversation(self, conversation_id: str) -> List[BookingTicket]:
+        """Tickets of one conversation, newest first"""
+        self._prune()
+        return [t for t in reversed(self._tickets.values()) if t.conversation_id == conversation_id]
+
+    def _prune(self) -> None:
+        """Forget finished tickets past their retention, oldest first"""
+        now = time.monotonic()
+        for booking_id in list(self._expires):
+            if self._expires[booking_id] <= now:
+                del self._expires[booking_id]
+                self._tickets.pop(booking_id, None)
+        while len(self._tickets) > self.max_tickets:
+            booking_id, ticket = next(iter(self._tickets.items()))
+            if not ticket.done:
+                break
+            self._tickets.popitem(last=False)
+            self._expires.pop(booking_id, None)
+
+    async def close(self, timeout: Optional[float] = 10.0) -> None:
+        """Wait for running bookings so their outcome is persisted, then cancel the rest"""
+        tasks = list(self._tasks.values())
+        if not tasks:
+            return
+        done, pending = await asyncio.wait(tasks, timeout=timeout)
+        if pending:
+            print(f"Booking shutdown timed out, {len(pending)} bookings still running")
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Submitted/deferred counts and outcomes"""
+        return {
+            "latency_budget_s": self.latency_budget,
+            "submitted": self.submitted,
+            "deferred": self.deferred,
+            "running": len(self._tasks),
+            "confirmed": self.confirmed,
+            "failed": self.failed,
+            "tracked": len(self._tickets),
+        }
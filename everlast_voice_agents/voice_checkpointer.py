@@ -2,13 +2,23 @@
 # Supports SQLite (dev) and PostgreSQL/Supabase (production)
 # Thread-ID = Caller Phone Number for session persistence
 
-from typing import Optional, Dict, Any, List
-from datetime import datetime
-import json
+from typing import Optional, Dict, Any, List, Callable
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+import asyncio
+import copy
 import sqlite3
-from contextlib import contextmanager
+import time
+from contextlib import asynccontextmanager
 import os
 
+from pydantic import BaseModel
+
+from .voice_serde import (
+    SERDE_VERSION, VERSION_KEY, dumps, dumps_state, loads, loads_state, parse, revive_message, to_primitive
+)
+from .voice_supabase import create_async_postgrest
+
 # Try to import asyncpg for PostgreSQL support
 try:
     import asyncpg
@@ -44,198 +54,665 @@ class BaseCheckpointer:
         """List all thread IDs"""
         raise NotImplementedError
 
+    async def connect(self) -> None:
+        """Open connections ahead of the first request (optional)"""
+        pass
+
+    async def close(self) -> None:
+        """Release connections (optional)"""
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Backend pool/queue counters (optional)"""
+        return {}
+
+
+# ============================================================================
+# DELTA CHECKPOINT FORMAT
+# ============================================================================
+# The growing lists of a conversation (messages, sentiment history) are not
+# rewritten on every turn. The checkpoint row holds the small mutable state;
+# new list items are appended to checkpoint_log keyed by
+# (thread_id, stream, seq). Readers reassemble the lists on load, so the
+# write volume per turn stays constant regardless of call length.
+# SentimentState keeps only its latest updates, so its stream is a window
+# ending at update_count rather than a list starting at seq 0.
+
+LOG_STREAMS = ("messages", "sentiment")
+
+
+def split_state(state: Dict[str, Any]) -> tuple[Dict[str, Any], Dict[str, List[Any]]]:
+    """
+    Split state into the scalar checkpoint row and append-only log streams.
+
+    Returns:
+        Tuple of (scalar state, {stream: items}). scalar["_log"] holds the
+        total length of each stream; items are its most recent entries.
+    """
+    scalar = dict(state)
+    streams = {"messages": list(scalar.pop("messages", None) or [])}
+    lengths = {"messages": len(streams["messages"])}
+
+    sentiment = scalar.get("caller_sentiment")
+    if hasattr(sentiment, "model_copy"):
+        streams["sentiment"] = list(sentiment.history)
+        lengths["sentiment"] = max(sentiment.update_count, len(sentiment.history))
+        scalar["caller_sentiment"] = sentiment.model_copy(update={"history": []})
+    elif sentiment is not None:
+        sentiment = dict(sentiment)
+        streams["sentiment"] = list(sentiment.pop("history", None) or [])
+        lengths["sentiment"] = max(sentiment.get("update_count", 0), len(streams["sentiment"]))
+        scalar["caller_sentiment"] = sentiment
+
+    # Stream lengths tell readers how much of the log belongs to this state
+    scalar["_log"] = lengths
+    return scalar, streams
+
+
+def merge_state(scalar: Dict[str, Any], streams: Dict[str, List[Any]]) -> Dict[str, Any]:
+    """Reassemble a full state from the checkpoint row and its log streams"""
+    lengths = scalar.pop("_log", None)
+    if lengths is None:
+        # Legacy full-state checkpoint
+        return scalar
+
+    messages = streams.get("messages", [])[:lengths.get("messages", 0)]
+    scalar["messages"] = [revive_message(message) for message in messages]
+
+    history = streams.get("sentiment", [])[:lengths.get("sentiment", 0)]
+    sentiment = scalar.get("caller_sentiment")
+    if hasattr(sentiment, "model_validate"):
+        # Validation trims to the window (and fills aggregates for older checkpoints)
+        scalar["caller_sentiment"] = sentiment.model_validate({**sentiment.model_dump(), "history": history})
+    elif isinstance(sentiment, dict):
+        sentiment["history"] = history
+    return scalar
+
+
+def pending_log_entries(
+    streams: Dict[str, List[Any]],
+    persisted: Dict[str, int],
+    encode: Optional[Callable[[Any], Any]] = dumps,
+    lengths: Optional[Dict[str, int]] = None
+) -> tuple[bool, List[tuple[str, int, Any]]]:
+    """
+    Compute log rows that are not yet persisted.
+
+    Args:
+        streams: Current log streams from split_state
+        persisted: Number of items already stored per stream
+        encode: Payload encoder, None to return the items themselves
+        lengths: Total stream lengths (scalar["_log"]) when streams hold
+            only the most recent items; defaults to the item counts
+
+    Returns:
+        Tuple of (reset, [(stream, seq, payload)]). reset is True when a
+        stream shrank (new conversation on the same thread) and the old log
+        has to be deleted before appending.
+    """
+    lengths = lengths or {}
+    totals = {name: lengths.get(name, len(items)) for name, items in streams.items()}
+    reset = any(totals[name] < persisted.get(name, 0) for name in streams)
+    if reset:
+        persisted = {}
+
+    entries = []
+    for name, items in streams.items():
+        # seq of items[0]; entries that left the window unsaved are skipped
+        offset = totals[name] - len(items)
+        for seq in range(max(persisted.get(name, 0), offset), totals[name]):
+            item = items[seq - offset]
+            entries.append((name, seq, encode(item) if encode else item))
+    return reset, entries
+
+
+def group_log_rows(rows) -> Dict[str, List[Any]]:
+    """Group (stream, payload) rows ordered by seq into stream lists"""
+    streams: Dict[str, List[Any]] = {name: [] for name in LOG_STREAMS}
+    for stream, payload in rows:
+        streams.setdefault(stream, []).append(loads(payload))
+    return streams
+
+
+class _ThreadedConnection:
+    """
+    Minimal aiosqlite-compatible wrapper used when aiosqlite is missing.
+    Every call runs in a worker thread so the event loop never blocks on sqlite3.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    @classmethod
+    async def connect(cls, db_path: str, **kwargs) -> "_ThreadedConnection":
+        conn = await asyncio.to_thread(sqlite3.connect, db_path, check_same_thread=False, **kwargs)
+        return cls(conn)
+
+    async def execute(self, sql: str, params=()) -> None:
+        await asyncio.to_thread(self._conn.execute, sql, params)
+
+    async def executemany(self, sql: str, rows) -> None:
+        await asyncio.to_thread(self._conn.executemany, sql, rows)
+
+    async def execute_fetchall(self, sql: str, params=()) -> list:
+        return await asyncio.to_thread(lambda: self._conn.execute(sql, params).fetchall())
+
+    async def close(self) -> None:
+        await asyncio.to_thread(self._conn.close)
+
 
 class SqliteSaver(BaseCheckpointer):
     """
-    SQLite-based checkpointer for development.
+    SQLite-based checkpointer for development and small nodes.
     Thread-ID = Phone number for call session persistence.
+
+    Connections are opened once and reused: a pool of reader connections
+    and a single writer. The database runs in WAL mode so readers never wait
+    for the writer. Writes are queued and the writer commits everything that
+    queued up meanwhile in one transaction. Each connection keeps its
+    compiled statements cached, so the hot queries below are prepared once.
+    """
+
+    _SELECT_STATE = "SELECT state FROM checkpoints WHERE thread_id = ?"
+    _SELECT_LOG = "SELECT stream, payload FROM checkpoint_log WHERE thread_id = ? ORDER BY stream, seq"
+    _SELECT_LOG_LENGTHS = "SELECT stream, MAX(seq) + 1 FROM checkpoint_log WHERE thread_id = ? GROUP BY stream"
+    _SELECT_THREADS = "SELECT thread_id FROM checkpoints ORDER BY updated_at DESC LIMIT ?"
+    _UPSERT_STATE = """
+        INSERT INTO checkpoints (thread_id, state, updated_at)
+        VALUES (?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT(thread_id) DO UPDATE SET
+            state = excluded.state,
+            updated_at = CURRENT_TIMESTAMP
     """
+    _INSERT_LOG = "INSERT OR IGNORE INTO checkpoint_log (thread_id, stream, seq, payload) VALUES (?, ?, ?, ?)"
+    _DELETE_STATE = "DELETE FROM checkpoints WHERE thread_id = ?"
+    _DELETE_LOG = "DELETE FROM checkpoint_log WHERE thread_id = ?"
 
-    def __init__(self, db_path: str = "checkpoints.db"):
+    def __init__(
+        self,
+        db_path: str = "checkpoints.db",
+        pool_size: int = 4,
+        write_batch_size: int = 64,
+        busy_timeout_ms: int = 5000
+    ):
         self.db_path = db_path
-        self._init_db()
+        self.pool_size = pool_size
+        self.write_batch_size = write_batch_size
+        self.busy_timeout_ms = busy_timeout_ms
+        # Log items already stored per thread and stream
+        self._log_lengths: Dict[str, Dict[str, int]] = {}
+
+        self._connect_lock = asyncio.Lock()
+        self._writer = None
+        self._readers: Optional[asyncio.Queue] = None
+        self._reader_conns: List[Any] = []
+        self._write_queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+
+        self.write_batches = 0
+        self.writes = 0
 
-    def _init_db(self):
+    async def _open(self):
+        """Open one connection with WAL and relaxed fsync"""
+        # isolation_level=None: transactions are issued explicitly by the writer
+        if ASYNC_SQLITE_AVAILABLE:
+            conn = await aiosqlite.connect(self.db_path, isolation_level=None, cached_statements=256)
+        else:
+            conn = await _ThreadedConnection.connect(self.db_path, isolation_level=None, cached_statements=256)
+        await conn.execute("PRAGMA journal_mode=WAL")
+        # Durable across app crashes; only an OS crash can lose the last commits
+        await conn.execute("PRAGMA synchronous=NORMAL")
+        await conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        return conn
+
+    async def connect(self) -> None:
+        """Open the connection pool and start the writer"""
+        if self._writer is not None:
+            return
+        async with self._connect_lock:
+            if self._writer is not None:
+                return
+
+            writer = await self._open()
+            await self._init_db(writer)
+
+            self._readers = asyncio.Queue()
+            for _ in range(max(1, self.pool_size)):
+                conn = await self._open()
+                self._reader_conns.append(conn)
+                self._readers.put_nowait(conn)
+
+            self._write_queue = asyncio.Queue()
+            self._writer = writer
+            self._writer_task = asyncio.create_task(self._write_loop())
+
+    async def _init_db(self, conn):
         """Initialize database schema"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS checkpoints (
-                    thread_id TEXT PRIMARY KEY,
-                    state TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                thread_id TEXT PRIMARY KEY,
+                state TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        await conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_updated_at ON checkpoints(updated_at)
+        """)
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS checkpoint_log (
+                thread_id TEXT NOT NULL,
+                stream TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                payload TEXT NOT NULL,
+                PRIMARY KEY (thread_id, stream, seq)
+            )
+        """)
+
+    @asynccontextmanager
+    async def _reader(self):
+        """Borrow a reader connection from the pool"""
+        await self.connect()
+        conn = await self._readers.get()
+        try:
+            yield conn
+        finally:
+            self._readers.put_nowait(conn)
+
+    # ------------------------------------------------------------------------
+    # Single writer
+    # ------------------------------------------------------------------------
+
+    async def _apply(self, op: tuple) -> None:
+        """Execute one queued write on the writer connection"""
+        kind, thread_id = op[0], op[1]
+        if kind == "set":
+            _, _, state_blob, reset, entries = op
+            if reset:
+                await self._writer.execute(self._DELETE_LOG, (thread_id,))
+            if entries:
+                await self._writer.executemany(
+                    self._INSERT_LOG,
+                    [(thread_id, stream, seq, payload) for stream, seq, payload in entries]
                 )
-            """)
-            conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_updated_at ON checkpoints(updated_at)
-            """)
-            conn.commit()
+            await self._writer.execute(self._UPSERT_STATE, (thread_id, state_blob))
+        else:
+            await self._writer.execute(self._DELETE_STATE, (thread_id,))
+            await self._writer.execute(self._DELETE_LOG, (thread_id,))
+
+    async def _commit(self, batch: list) -> Optional[Exception]:
+        """Apply a batch in one transaction; returns the error instead of raising"""
+        try:
+            await self._writer.execute("BEGIN IMMEDIATE")
+            for op, _ in batch:
+                await self._apply(op)
+            await self._writer.execute("COMMIT")
+        except Exception as e:
+            try:
+                await self._writer.execute("ROLLBACK")
+            except Exception:
+                pass
+            return e
+        return None
+
+    async def _write_loop(self) -> None:
+        """Drain the write queue, one transaction per batch"""
+        while True:
+            batch = [await self._write_queue.get()]
+            while len(batch) < self.write_batch_size and not self._write_queue.empty():
+                batch.append(self._write_queue.get_nowait())
+
+            error = await self._commit(batch)
+            if error is not None and len(batch) > 1:
+                # Isolate the failing write so it does not take the batch down
+                results = [await self._commit([item]) for item in batch]
+            else:
+                results = [error] * len(batch)
+
+            self.write_batches += 1
+            self.writes += len(batch)
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    if result is None:
+                        future.set_result(None)
+                    else:
+                        future.set_exception(result)
+                self._write_queue.task_done()
+
+    async def _submit(self, op: tuple) -> None:
+        """Queue a write and wait until it is committed"""
+        await self.connect()
+        future = asyncio.get_running_loop().create_future()
+        self._write_queue.put_nowait((op, future))
+        try:
+            await future
+        except Exception:
+            # Re-read the persisted log lengths on the next write
+            self._log_lengths.pop(op[1], None)
+            raise
+
+    # ------------------------------------------------------------------------
+    # Checkpointer interface
+    # ------------------------------------------------------------------------
+
+    def _assemble(self, thread_id: str, state_text: str, log_rows) -> Dict[str, Any]:
+        """Build full state and remember persisted log lengths"""
+        scalar = loads_state(state_text)
+        if "_log" in scalar:
+            self._log_lengths[thread_id] = dict(scalar["_log"])
+        return merge_state(scalar, group_log_rows(log_rows))
 
     async def get(self, thread_id: str) -> Optional[Dict[str, Any]]:
         """Get checkpoint by thread ID (phone number)"""
-        if ASYNC_SQLITE_AVAILABLE:
-            async with aiosqlite.connect(self.db_path) as conn:
-                async with conn.execute(
-                    "SELECT state FROM checkpoints WHERE thread_id = ?",
-                    (thread_id,)
-                ) as cursor:
-                    row = await cursor.fetchone()
-                    if row:
-                        return json.loads(row[0])
-                    return None
-        else:
-            # Fallback to sync
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute(
-                    "SELECT state FROM checkpoints WHERE thread_id = ?",
-                    (thread_id,)
-                )
-                row = cursor.fetchone()
-                if row:
-                    return json.loads(row[0])
+        async with self._reader() as conn:
+            rows = await conn.execute_fetchall(self._SELECT_STATE, (thread_id,))
+            if not rows:
                 return None
+            # The writer commits log and row together, so the log is never behind the row
+            log_rows = await conn.execute_fetchall(self._SELECT_LOG, (thread_id,))
+        return self._assemble(thread_id, rows[0][0], log_rows)
 
     async def set(self, thread_id: str, state: Dict[str, Any]) -> None:
         """Save checkpoint - thread_id is the caller's phone number"""
-        state_json = json.dumps(state, default=str)
+        scalar, streams = split_state(state)
+        state_blob = dumps_state(scalar)
 
-        if ASYNC_SQLITE_AVAILABLE:
-            async with aiosqlite.connect(self.db_path) as conn:
-                await conn.execute("""
-                    INSERT INTO checkpoints (thread_id, state, updated_at)
-                    VALUES (?, ?, CURRENT_TIMESTAMP)
-                    ON CONFLICT(thread_id) DO UPDATE SET
-                        state = excluded.state,
-                        updated_at = CURRENT_TIMESTAMP
-                """, (thread_id, state_json))
-                await conn.commit()
-        else:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute("""
-                    INSERT INTO checkpoints (thread_id, state, updated_at)
-                    VALUES (?, ?, CURRENT_TIMESTAMP)
-                    ON CONFLICT(thread_id) DO UPDATE SET
-                        state = excluded.state,
-                        updated_at = CURRENT_TIMESTAMP
-                """, (thread_id, state_json))
-                conn.commit()
+        persisted = self._log_lengths.get(thread_id)
+        if persisted is None:
+            async with self._reader() as conn:
+                persisted = dict(await conn.execute_fetchall(self._SELECT_LOG_LENGTHS, (thread_id,)))
+        reset, entries = pending_log_entries(streams, persisted, lengths=scalar["_log"])
+
+        # Later writes of this thread diff against this state even before it commits
+        self._log_lengths[thread_id] = dict(scalar["_log"])
+        await self._submit(("set", thread_id, state_blob, reset, entries))
 
     async def delete(self, thread_id: str) -> None:
         """Delete checkpoint"""
-        if ASYNC_SQLITE_AVAILABLE:
-            async with aiosqlite.connect(self.db_path) as conn:
-                await conn.execute(
-                    "DELETE FROM checkpoints WHERE thread_id = ?",
-                    (thread_id,)
-                )
-                await conn.commit()
-        else:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute(
-                    "DELETE FROM checkpoints WHERE thread_id = ?",
-                    (thread_id,)
-                )
-                conn.commit()
+        self._log_lengths.pop(thread_id, None)
+        await self._submit(("delete", thread_id))
 
     async def list_threads(self, limit: int = 100) -> List[str]:
         """List all thread IDs (phone numbers)"""
-        if ASYNC_SQLITE_AVAILABLE:
-            async with aiosqlite.connect(self.db_path) as conn:
-                async with conn.execute(
-                    "SELECT thread_id FROM checkpoints ORDER BY updated_at DESC LIMIT ?",
-                    (limit,)
-                ) as cursor:
-                    rows = await cursor.fetchall()
-                    return [row[0] for row in rows]
-        else:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute(
-                    "SELECT thread_id FROM checkpoints ORDER BY updated_at DESC LIMIT ?",
-                    (limit,)
-                )
-                return [row[0] for row in cursor.fetchall()]
+        async with self._reader() as conn:
+            rows = await conn.execute_fetchall(self._SELECT_THREADS, (limit,))
+        return [row[0] for row in rows]
+
+    async def close(self) -> None:
+        """Wait for queued writes, then close all connections"""
+        if self._writer is None:
+            return
+        await self._write_queue.join()
+        self._writer_task.cancel()
+        try:
+            await self._writer_task
+        except asyncio.CancelledError:
+            pass
+
+        for conn in [self._writer] + self._reader_conns:
+            await conn.close()
+        self._writer = None
+        self._readers = None
+        self._reader_conns = []
+        self._write_queue = None
+        self._writer_task = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool and write batching counters"""
+        return {
+            "pool_size": self.pool_size,
+            "idle_readers": self._readers.qsize() if self._readers else 0,
+            "queued_writes": self._write_queue.qsize() if self._write_queue else 0,
+            "write_batches": self.write_batches,
+            "writes": self.writes,
+            "avg_batch_size": round(self.writes / self.write_batches, 2) if self.write_batches else 0.0,
+        }
 
 
 class PostgresSaver(BaseCheckpointer):
     """
     PostgreSQL/Supabase-based checkpointer for production.
     Thread-ID = Phone number for call session persistence.
+
+    JSONB columns are exchanged in binary form through a registered codec
+    (orjson when installed), the hot get/set statements are prepared on
+    every pooled connection, and both are single round-trips. Pool sizing
+    and timeouts come from PG_* environment variables; stats() reports pool
+    utilization and acquire waits to spot contention.
+    """
+
+    # Row plus its log in one round-trip
+    _SELECT_CHECKPOINT = """
+        SELECT c.state,
+               COALESCE(
+                   (SELECT jsonb_agg(jsonb_build_array(l.stream, l.payload) ORDER BY l.stream, l.seq)
+                    FROM checkpoint_log l WHERE l.thread_id = c.thread_id),
+                   '[]'::jsonb
+               ) AS log
+        FROM checkpoints c
+        WHERE c.thread_id = $1
+    """
+    # Truncate log rows beyond the new stream lengths, upsert new log items
+    # and the row in one statement (deleted and inserted seqs never overlap)
+    _SAVE_CHECKPOINT = """
+        WITH truncated AS (
+            DELETE FROM checkpoint_log l
+            USING jsonb_each_text($6::jsonb) AS len(stream, length)
+            WHERE l.thread_id = $1
+              AND l.stream = len.stream
+              AND l.seq >= len.length::INTEGER
+        ), appended AS (
+            INSERT INTO checkpoint_log (thread_id, stream, seq, payload)
+            SELECT $1, entry->>'stream', (entry->>'seq')::INTEGER, entry->'payload'
+            FROM jsonb_array_elements($5::jsonb) AS entry
+            ON CONFLICT (thread_id, stream, seq) DO UPDATE SET
+                payload = EXCLUDED.payload
+        )
+        INSERT INTO checkpoints (thread_id, state, phone_number, conversation_id, updated_at)
+        VALUES ($1, $2, $3, $4, NOW())
+        ON CONFLICT (thread_id) DO UPDATE SET
+            state = EXCLUDED.state,
+            phone_number = EXCLUDED.phone_number,
+            conversation_id = EXCLUDED.conversation_id,
+            updated_at = NOW()
     """
 
-    def __init__(self, dsn: Optional[str] = None):
+    def __init__(
+        self,
+        dsn: Optional[str] = None,
+        min_size: Optional[int] = None,
+        max_size: Optional[int] = None,
+        acquire_timeout: Optional[float] = None,
+        command_timeout: Optional[float] = None,
+        statement_timeout_ms: Optional[int] = None,
+        statement_cache_size: Optional[int] = None,
+        init_schema: Optional[bool] = None
+    ):
         if not POSTGRES_AVAILABLE:
             raise ImportError("asyncpg is required for PostgreSQL support. Install with: pip install asyncpg")
 
         self.dsn = dsn or os.getenv("DATABASE_URL", "postgresql://localhost/everlast")
+        self.min_size = min_size if min_size is not None else int(os.getenv("PG_POOL_MIN_SIZE", "2"))
+        self.max_size = max_size if max_size is not None else int(os.getenv("PG_POOL_MAX_SIZE", "10"))
+        self.acquire_timeout = acquire_timeout if acquire_timeout is not None else float(
+            os.getenv("PG_ACQUIRE_TIMEOUT", "5")
+        )
+        self.command_timeout = command_timeout if command_timeout is not None else float(
+            os.getenv("PG_COMMAND_TIMEOUT", "10")
+        )
+        self.statement_timeout_ms = statement_timeout_ms if statement_timeout_ms is not None else int(
+            os.getenv("PG_STATEMENT_TIMEOUT_MS", "5000")
+        )
+        # 0 disables prepared statements (required behind PgBouncer in transaction mode)
+        self.statement_cache_size = statement_cache_size if statement_cache_size is not None else int(
+            os.getenv("PG_STATEMENT_CACHE_SIZE", "100")
+        )
+        self.init_schema = init_schema if init_schema is not None else (
+            os.getenv("PG_INIT_SCHEMA", "true").lower() == "true"
+        )
+
         self.pool: Optional[Pool] = None
+        self._connect_lock = asyncio.Lock()
+        # Log items already stored per thread and stream
+        self._log_lengths: Dict[str, Dict[str, int]] = {}
+
+        self.acquires = 0
+        self.acquire_timeouts = 0
+        self.acquire_wait_total = 0.0
+        self.acquire_wait_max = 0.0
+        self._waiting = 0
 
     async def connect(self):
-        """Initialize connection pool"""
+        """Create schema (once) and the connection pool - call at app startup"""
+        if self.pool is not None:
+            return
+        async with self._connect_lock:
+            if self.pool is not None:
+                return
+            if self.init_schema:
+                conn = await asyncpg.connect(self.dsn, statement_cache_size=0)
+                try:
+                    await self._init_db(conn)
+                finally:
+                    await conn.close()
+
+            self.pool = await asyncpg.create_pool(
+                self.dsn,
+                min_size=self.min_size,
+                max_size=self.max_size,
+                command_timeout=self.command_timeout,
+                statement_cache_size=self.statement_cache_size,
+                server_settings={
+                    "statement_timeout": str(self.statement_timeout_ms),
+                    "application_name": "everlast-voice-agent"
+                },
+                init=self._setup_connection
+            )
+
+    async def _setup_connection(self, conn) -> None:
+        """Per-connection setup: binary JSONB codec and prepared hot statements"""
+        await conn.set_type_codec(
+            "jsonb",
+            schema="pg_catalog",
+            # Binary JSONB is a version byte followed by the JSON text
+            encoder=lambda value: b"\x01" + dumps(value),
+            decoder=lambda data: parse(data[1:]),
+            format="binary"
+        )
+        if self.statement_cache_size > 0:
+            # Prepared statements are cached by query text and reused by fetch/execute
+            await conn.prepare(self._SELECT_CHECKPOINT)
+            await conn.prepare(self._SAVE_CHECKPOINT)
+
+    async def _init_db(self, conn):
+        """Initialize database schema (matches supabase/checkpoints.sql)"""
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                thread_id TEXT PRIMARY KEY,
+                state JSONB NOT NULL,
+                created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+                updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+            )
+        """)
+        await conn.execute("""
+            ALTER TABLE checkpoints
+                ADD COLUMN IF NOT EXISTS phone_number TEXT,
+                ADD COLUMN IF NOT EXISTS conversation_id TEXT
+        """)
+        await conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_checkpoints_updated_at
+            ON checkpoints(updated_at DESC)
+        """)
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS checkpoint_log (
+                thread_id TEXT NOT NULL,
+                stream TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                payload JSONB NOT NULL,
+                created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+                PRIMARY KEY (thread_id, stream, seq)
+            )
+        """)
+
+    @asynccontextmanager
+    async def _acquire(self):
+        """Acquire a pooled connection and record how long the wait took"""
         if self.pool is None:
-            self.pool = await asyncpg.create_pool(self.dsn, min_size=5, max_size=20)
-            await self._init_db()
+            await self.connect()
 
-    async def _init_db(self):
-        """Initialize database schema"""
-        async with self.pool.acquire() as conn:
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS checkpoints (
-                    thread_id TEXT PRIMARY KEY,
-                    state JSONB NOT NULL,
-                    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-                    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-                )
-            """)
-            await conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_checkpoints_updated_at
-                ON checkpoints(updated_at DESC)
-            """)
+        self._waiting += 1
+        started = time.perf_counter()
+        try:
+            conn = await self.pool.acquire(timeout=self.acquire_timeout)
+        except asyncio.TimeoutError:
+            self.acquire_timeouts += 1
+            raise
+        finally:
+            self._waiting -= 1
+
+        waited = time.perf_counter() - started
+        self.acquires += 1
+        self.acquire_wait_total += waited
+        self.acquire_wait_max = max(self.acquire_wait_max, waited)
+        try:
+            yield conn
+        finally:
+            await self.pool.release(conn)
 
     async def get(self, thread_id: str) -> Optional[Dict[str, Any]]:
         """Get checkpoint by thread ID (phone number)"""
-        if not self.pool:
-            await self.connect()
-
-        async with self.pool.acquire() as conn:
-            row = await conn.fetchrow(
-                "SELECT state FROM checkpoints WHERE thread_id = $1",
-                thread_id
-            )
-            if row:
-                return dict(row['state'])
+        async with self._acquire() as conn:
+            row = await conn.fetchrow(self._SELECT_CHECKPOINT, thread_id)
+        if not row:
             return None
 
+        scalar = loads_state(row['state'])
+        if "_log" in scalar:
+            self._log_lengths[thread_id] = dict(scalar["_log"])
+        return merge_state(scalar, group_log_rows(row['log']))
+
     async def set(self, thread_id: str, state: Dict[str, Any]) -> None:
         """Save checkpoint - thread_id is the caller's phone number"""
-        if not self.pool:
-            await self.connect()
+        scalar, streams = split_state(state)
+        # Unknown lengths (first write in this process): send the whole log once
+        _, entries = pending_log_entries(
+            streams, self._log_lengths.get(thread_id, {}), encode=None, lengths=scalar["_log"]
+        )
+
+        try:
+            async with self._acquire() as conn:
+                await conn.execute(
+                    self._SAVE_CHECKPOINT,
+                    thread_id,
+                    {**scalar, VERSION_KEY: SERDE_VERSION},
+                    state.get("phone_number") or thread_id,
+                    state.get("conversation_id"),
+                    [{"stream": stream, "seq": seq, "payload": item} for stream, seq, item in entries],
+                    scalar["_log"]
+                )
+        except Exception:
+            self._log_lengths.pop(thread_id, None)
+            raise
 
-        async with self.pool.acquire() as conn:
-            await conn.execute("""
-                INSERT INTO checkpoints (thread_id, state, updated_at)
-                VALUES ($1, $2, NOW())
-                ON CONFLICT (thread_id) DO UPDATE SET
-                    state = EXCLUDED.state,
-                    updated_at = NOW()
-            """, thread_id, json.dumps(state, default=str))
+        self._log_lengths[thread_id] = dict(scalar["_log"])
 
     async def delete(self, thread_id: str) -> None:
         """Delete checkpoint"""
-        if not self.pool:
-            await self.connect()
-
-        async with self.pool.acquire() as conn:
-            await conn.execute(
-                "DELETE FROM checkpoints WHERE thread_id = $1",
-                thread_id
-            )
+        self._log_lengths.pop(thread_id, None)
+        async with self._acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(
+                    "DELETE FROM checkpoints WHERE thread_id = $1",
+                    thread_id
+                )
+                await conn.execute(
+                    "DELETE FROM checkpoint_log WHERE thread_id = $1",
+                    thread_id
+                )
 
     async def list_threads(self, limit: int = 100) -> List[str]:
         """List all thread IDs (phone numbers)"""
-        if not self.pool:
-            await self.connect()
-
-        async with self.pool.acquire() as conn:
+        async with self._acquire() as conn:
             rows = await conn.fetch(
                 "SELECT thread_id FROM checkpoints ORDER BY updated_at DESC LIMIT $1",
                 limit
@@ -248,59 +725,304 @@ class PostgresSaver(BaseCheckpointer):
             await self.pool.close()
             self.pool = None
 
+    def stats(self) -> Dict[str, Any]:
+        """Pool utilization and acquire wait times"""
+        size = self.pool.get_size() if self.pool else 0
+        idle = self.pool.get_idle_size() if self.pool else 0
+        return {
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+            "size": size,
+            "in_use": size - idle,
+            "idle": idle,
+            "utilization": round((size - idle) / self.max_size * 100, 2) if self.max_size else 0,
+            "waiting": self._waiting,
+            "acquires": self.acquires,
+            "acquire_timeouts": self.acquire_timeouts,
+            "acquire_wait_avg_ms": round(self.acquire_wait_total / self.acquires * 1000, 3) if self.acquires else 0.0,
+            "acquire_wait_max_ms": round(self.acquire_wait_max * 1000, 3),
+        }
+
 
 class SupabaseSaver(BaseCheckpointer):
     """
-    Supabase-compatible checkpointer using Supabase client.
+    Supabase-compatible checkpointer on the async PostgREST client.
     Stores checkpoints in the 'checkpoints' table.
+
+    Each write is a single non-blocking request to the save_checkpoint()
+    function (supabase/checkpoints.sql), which upserts the row on thread_id
+    and appends the new log items in one transaction.
     """
 
-    def __init__(self, supabase_url: Optional[str] = None, supabase_key: Optional[str] = None):
-        try:
-            from supabase import create_client, Client
-            self.supabase: Client = create_client(
-                supabase_url or os.getenv("SUPABASE_URL"),
-                supabase_key or os.getenv("SUPABASE_SERVICE_KEY")
-            )
-        except ImportError:
-            raise ImportError("supabase-py is required. Install with: pip install supabase")
+    def __init__(
+        self,
+        supabase_url: Optional[str] = None,
+        supabase_key: Optional[str] = None,
+        ttl_hours: Optional[float] = None
+    ):
+        self.client = create_async_postgrest(supabase_url, supabase_key)
+        # Sessions expire this long after their last write (cleanup_expired_checkpoints)
+        self.ttl_hours = ttl_hours if ttl_hours is not None else float(
+            os.getenv("SUPABASE_CHECKPOINT_TTL_HOURS", "24")
+        )
+
+        # Log items already stored per thread and stream
+        self._log_lengths: Dict[str, Dict[str, int]] = {}
 
     async def get(self, thread_id: str) -> Optional[Dict[str, Any]]:
         """Get checkpoint by thread ID (phone number)"""
-        result = self.supabase.table("checkpoints").select("state").eq("thread_id", thread_id).execute()
-        if result.data and len(result.data) > 0:
-            return result.data[0]['state']
-        return None
+        # Row and log are fetched concurrently: one round-trip of latency
+        result, log = await asyncio.gather(
+            self.client.table("checkpoints").select("state").eq("thread_id", thread_id).execute(),
+            self.client.table("checkpoint_log").select("stream, payload")
+                .eq("thread_id", thread_id).order("stream").order("seq").execute()
+        )
+        if not result.data:
+            return None
+
+        scalar = loads_state(result.data[0]['state'])
+        if "_log" in scalar:
+            self._log_lengths[thread_id] = dict(scalar["_log"])
+        return merge_state(scalar, group_log_rows((r['stream'], r['payload']) for r in log.data or []))
 
     async def set(self, thread_id: str, state: Dict[str, Any]) -> None:
         """Save checkpoint - thread_id is the caller's phone number"""
-        # Check if exists
-        existing = await self.get(thread_id)
-
-        if existing:
-            # Update
-            self.supabase.table("checkpoints").update({
-                "state": state,
-                "updated_at": datetime.now().isoformat()
-            }).eq("thread_id", thread_id).execute()
-        else:
-            # Insert
-            self.supabase.table("checkpoints").insert({
-                "thread_id": thread_id,
-                "state": state,
-                "created_at": datetime.now().isoformat(),
-                "updated_at": datetime.now().isoformat()
-            }).execute()
+        scalar, streams = split_state(state)
+
+        # Unknown lengths (first write in this process): send the whole log,
+        # save_checkpoint() overwrites and truncates it to the new lengths
+        _, entries = pending_log_entries(
+            streams, self._log_lengths.get(thread_id, {}), encode=None, lengths=scalar["_log"]
+        )
+
+        params = to_primitive({
+            "p_thread_id": thread_id,
+            "p_state": {**scalar, VERSION_KEY: SERDE_VERSION},
+            "p_phone_number": state.get("phone_number") or thread_id,
+            "p_conversation_id": state.get("conversation_id"),
+            "p_expires_at": (datetime.now(timezone.utc) + timedelta(hours=self.ttl_hours)).isoformat(),
+            "p_log": [{"stream": stream, "seq": seq, "payload": item} for stream, seq, item in entries],
+            "p_log_lengths": scalar["_log"],
+        })
+        try:
+            await self.client.rpc("save_checkpoint", params).execute()
+        except Exception:
+            self._log_lengths.pop(thread_id, None)
+            raise
+
+        self._log_lengths[thread_id] = dict(scalar["_log"])
 
     async def delete(self, thread_id: str) -> None:
         """Delete checkpoint"""
-        self.supabase.table("checkpoints").delete().eq("thread_id", thread_id).execute()
+        self._log_lengths.pop(thread_id, None)
+        await asyncio.gather(
+            self.client.table("checkpoints").delete().eq("thread_id", thread_id).execute(),
+            self.client.table("checkpoint_log").delete().eq("thread_id", thread_id).execute()
+        )
 
     async def list_threads(self, limit: int = 100) -> List[str]:
         """List all thread IDs (phone numbers)"""
-        result = self.supabase.table("checkpoints").select("thread_id").order("updated_at", desc=True).limit(limit).execute()
+        result = await self.client.table("checkpoints").select("thread_id").order("updated_at", desc=True).limit(limit).execute()
         return [row['thread_id'] for row in result.data] if result.data else []
 
+    async def close(self) -> None:
+        """Close the pooled HTTP client"""
+        await self.client.aclose()
+
+
+def copy_state(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Copy of a conversation state that shares no mutable parts with the original.
+
+    Nested models (BANTState, SentimentState, ...), lists and dicts are
+    copied, so in-place changes by a caller (analyze_sentiment, guardrails,
+    .update()) cannot reach a cached state. Messages are never mutated in
+    place and are shared; only their list is copied.
+    """
+    copied = {}
+    for key, value in state.items():
+        if isinstance(value, BaseModel):
+            value = value.model_copy(deep=True)
+        elif isinstance(value, list):
+            value = list(value) if key == "messages" else copy.deepcopy(value)
+        elif isinstance(value, dict):
+            value = copy.deepcopy(value)
+        copied[key] = value
+    return copied
+
+
+class CachedCheckpointer(BaseCheckpointer):
+    """
+    In-process write-through cache in front of any checkpointer.
+
+    Hot conversations stay in memory as state objects (no JSON
+    round-trip), so mid-call turns are served without database reads.
+    get() and set() copy the state (see copy_state), so the cache only
+    changes through set() and never holds a half-updated turn.
+    Entries are evicted LRU-first beyond max_entries and after ttl_seconds
+    without access. Concurrent loads of the same thread share one fetch.
+    With write_behind=True, backend writes run asynchronously and
+    consecutive writes of the same thread are coalesced.
+    """
+
+    def __init__(
+        self,
+        backend: BaseCheckpointer,
+        max_entries: int = 1000,
+        ttl_seconds: float = 1800.0,
+        write_behind: bool = False
+    ):
+        self.backend = backend
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.write_behind = write_behind
+
+        # thread_id -> (state, last access as time.monotonic())
+        self._entries: "OrderedDict[str, tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._loading: Dict[str, asyncio.Task] = {}
+        self._dirty: Dict[str, Dict[str, Any]] = {}
+        self._writers: Dict[str, asyncio.Task] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced_loads = 0
+        self.evictions = 0
+        self.write_errors = 0
+
+    def _lookup(self, thread_id: str) -> Optional[Dict[str, Any]]:
+        """Return cached state and refresh its LRU position, or None"""
+        entry = self._entries.get(thread_id)
+        if entry is None:
+            return None
+
+        state, last_access = entry
+        now = time.monotonic()
+        if now - last_access > self.ttl_seconds:
+            del self._entries[thread_id]
+            self.evictions += 1
+            return None
+
+        self._entries[thread_id] = (state, now)
+        self._entries.move_to_end(thread_id)
+        return state
+
+    def _store(self, thread_id: str, state: Dict[str, Any]) -> None:
+        """Insert or refresh an entry and evict beyond the size cap"""
+        self._entries[thread_id] = (state, time.monotonic())
+        self._entries.move_to_end(thread_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def _load(self, thread_id: str) -> Optional[Dict[str, Any]]:
+        """Fetch from the backend unless a write landed in the meantime"""
+        state = await self.backend.get(thread_id)
+        cached = self._lookup(thread_id)
+        if cached is not None:
+            return cached
+        if state is not None:
+            self._store(thread_id, state)
+        return state
+
+    async def get(self, thread_id: str) -> Optional[Dict[str, Any]]:
+        """Get checkpoint, served from memory for hot conversations"""
+        state = self._lookup(thread_id)
+        if state is None:
+            state = self._dirty.get(thread_id)
+        if state is not None:
+            self.hits += 1
+            # Callers mutate nested models; they must not see the cached objects
+            return copy_state(state)
+
+        task = self._loading.get(thread_id)
+        if task is None:
+            self.misses += 1
+            task = asyncio.ensure_future(self._load(thread_id))
+            self._loading[thread_id] = task
+            task.add_done_callback(lambda _: self._loading.pop(thread_id, None))
+        else:
+            self.coalesced_loads += 1
+
+        state = await asyncio.shield(task)
+        return copy_state(state) if state is not None else None
+
+    async def set(self, thread_id: str, state: Dict[str, Any]) -> None:
+        """Save checkpoint to memory and the backend (now or write-behind)"""
+        # Snapshot: later in-place changes by the caller stay out of the cache
+        state = copy_state(state)
+        self._store(thread_id, state)
+
+        if not self.write_behind:
+            await self.backend.set(thread_id, state)
+            return
+
+        self._dirty[thread_id] = state
+        if thread_id not in self._writers:
+            self._writers[thread_id] = asyncio.ensure_future(self._write_behind(thread_id))
+
+    async def _write_behind(self, thread_id: str) -> None:
+        """Persist the latest state of a thread until nothing is pending"""
+        try:
+            while thread_id in self._dirty:
+                state = self._dirty.pop(thread_id)
+                try:
+                    await self.backend.set(thread_id, state)
+                except Exception as e:
+                    self.write_errors += 1
+                    # Keep the newest state pending for the next flush
+                    self._dirty.setdefault(thread_id, state)
+                    print(f"Write-behind checkpoint failed for {thread_id}: {e}")
+                    return
+        finally:
+            self._writers.pop(thread_id, None)
+
+    async def flush(self) -> None:
+        """Wait for all pending write-behind checkpoints"""
+        for thread_id in list(self._dirty):
+            if thread_id not in self._writers:
+                self._writers[thread_id] = asyncio.ensure_future(self._write_behind(thread_id))
+        if self._writers:
+            await asyncio.gather(*self._writers.values(), return_exceptions=True)
+
+    async def delete(self, thread_id: str) -> None:
+        """Delete checkpoint from memory and the backend"""
+        self._entries.pop(thread_id, None)
+        self._dirty.pop(thread_id, None)
+        writer = self._writers.get(thread_id)
+        if writer:
+            await asyncio.gather(writer, return_exceptions=True)
+        await self.backend.delete(thread_id)
+
+    async def list_threads(self, limit: int = 100) -> List[str]:
+        """List all thread IDs (phone numbers)"""
+        if self._dirty:
+            await self.flush()
+        return await self.backend.list_threads(limit)
+
+    async def connect(self) -> None:
+        """Open backend connections"""
+        await self.backend.connect()
+
+    async def close(self) -> None:
+        """Flush pending writes and close the backend"""
+        await self.flush()
+        await self.backend.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache hit/miss and eviction counters"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups * 100, 2) if lookups > 0 else 0,
+            "coalesced_loads": self.coalesced_loads,
+            "evictions": self.evictions,
+            "pending_writes": len(self._dirty),
+            "write_errors": self.write_errors
+        }
+
 
 # Factory function
 def get_checkpointer(
@@ -366,5 +1088,6 @@ if __name__ == "__main__":
         # Cleanup
         await checkpointer.delete(phone_number)
         print("Checkpoint deleted")
+        await checkpointer.close()
 
     asyncio.run(test_checkpointer())
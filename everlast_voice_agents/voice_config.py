@@ -0,0 +1,107 @@
+# Prompt/Lexicon Configuration for Everlast Voice Agent
+# Loads prompts/config.yaml (or PROMPT_CONFIG_PATH); code defaults apply without it
+
+from typing import Any, Callable, Dict, Generic, Optional, TypeVar
+import os
+import time
+
+# Try to import PyYAML for the config file
+try:
+    import yaml
+    YAML_AVAILABLE = True
+except ImportError:
+    YAML_AVAILABLE = False
+
+# How often (seconds) ReloadingConfig checks the file for changes
+CONFIG_RELOAD_INTERVAL = float(os.getenv("CONFIG_RELOAD_INTERVAL", "2"))
+
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "prompts", "config.yaml")
+
+
+def config_path() -> str:
+    """Path of the prompt configuration file"""
+    return os.getenv("PROMPT_CONFIG_PATH", DEFAULT_CONFIG_PATH)
+
+
+def load_config(path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Load the prompt configuration.
+
+    Returns an empty dict when the file or PyYAML is missing, so callers
+    fall back to their built-in defaults. A file that exists but does not
+    parse raises, since silently ignoring it would hide a broken deploy.
+    """
+    path = path or config_path()
+    if not os.path.exists(path):
+        return {}
+    if not YAML_AVAILABLE:
+        print(f"PyYAML not installed, ignoring {path}")
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return yaml.safe_load(f) or {}
+
+
+def config_section(name: str, path: Optional[str] = None) -> Dict[str, Any]:
+    """One top-level section of the configuration ({} if absent)"""
+    section = load_config(path).get(name)
+    return section if isinstance(section, dict) else {}
+
+
+def config_mtime(path: Optional[str] = None) -> Optional[float]:
+    """Modification time of the configuration file (None if missing)"""
+    try:
+        return os.stat(path or config_path()).st_mtime
+    except OSError:
+        return None
+
+
+T = TypeVar("T")
+
+
+class ReloadingConfig(Generic[T]):
+    """
+    Value built from the configuration file, rebuilt when the file changes.
+
+    get() checks the file's mtime at most every check_interval seconds, so
+    the hot path costs a clock read. If a changed file fails to build (e.g.
+    broken YAML while it is being edited), the previous value stays in use.
+    """
+
+    def __init__(
+        self,
+        build: Callable[[Optional[str]], T],
+        path: Optional[str] = None,
+        check_interval: Optional[float] = None
+    ):
+        self.build = build
+        self.path = path
+        self.check_interval = CONFIG_RELOAD_INTERVAL if check_interval is None else check_interval
+        self.reloads = 0
+
+        self._value: Optional[T] = None
+        self._mtime: Optional[float] = None
+        self._next_check = 0.0
+
+    def get(self) -> T:
+        """Current value, rebuilt first if the file changed"""
+        if self._value is None:
+            return self.reload()
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._next_check = now + self.check_interval
+            mtime = config_mtime(self.path)
+            if mtime != self._mtime:
+                self._mtime = mtime
+                try:
+                    self._value = self.build(self.path)
+                    self.reloads += 1
+                except Exception as e:
+                    print(f"Config reload failed, keeping previous version: {e}")
+        return self._value
+
+    def reload(self) -> T:
+        """Build the value now (raises if the configuration is invalid)"""
+        self._mtime = config_mtime(self.path)
+        self._next_check = time.monotonic() + self.check_interval
+        self._value = self.build(self.path)
+        return self._value
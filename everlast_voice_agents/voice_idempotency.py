@@ -0,0 +1,132 @@
+# Idempotent Tool Calls for Everlast Voice Agent
+# Vapi retries tool calls on timeout; a retry must not book or insert twice
+
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from collections import OrderedDict
+import asyncio
+import hashlib
+import json
+import time
+
+
+def idempotency_key(
+    conversation_id: str,
+    function_name: str,
+    parameters: Dict[str, Any],
+    call_id: Optional[str] = None
+) -> str:
+    """
+    Key identifying one logical tool call.
+
+    The tool-call id from Vapi is used when present (retries reuse it).
+    Otherwise the key is a hash of conversation, function and parameters,
+    so an identical request within the TTL counts as a retry.
+    """
+    if call_id:
+        return f"{function_name}:{call_id}"
+    canonical = json.dumps(
+        [conversation_id, function_name, parameters],
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str
+    )
+    return f"{function_name}:{hashlib.sha256(canonical.encode()).hexdigest()}"
+
+
+class IdempotencyCache:
+    """
+    Single-flight execution with a TTL cache of completed results.
+
+    The first call for a key runs the work. Concurrent duplicates await the
+    same future instead of starting their own. Completed results are
+    replayed for ttl_seconds. Exceptions and results rejected by the
+    cacheable predicate are not cached, so a later retry can try again.
+    """
+
+    def __init__(self, ttl_seconds: float = 600.0, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        self._results: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+        self.executed = 0
+        self.replayed = 0
+        self.joined = 0
+
+    def _cached(self, key: str) -> Tuple[bool, Any]:
+        """(True, result) for an unexpired completed key"""
+        entry = self._results.get(key)
+        if entry is None:
+            return False, None
+        expires_at, result = entry
+        if expires_at <= time.monotonic():
+            del self._results[key]
+            return False, None
+        return True, result
+
+    async def run(
+        self,
+        key: str,
+        work: Callable[[], Awaitable[Any]],
+        cacheable: Optional[Callable[[Any], bool]] = None
+    ) -> Tuple[Any, bool]:
+        """
+        Execute work once per key.
+
+        Args:
+            key: Idempotency key (see idempotency_key)
+            work: Coroutine factory doing the actual tool call
+            cacheable: Optional check on the result; False skips the replay
+                cache (e.g. temporary errors). Concurrent duplicates still share it.
+
+        Returns:
+            (result, duplicate) - duplicate is True for replays and joined calls
+        """
+        found, result = self._cached(key)
+        if found:
+            self.replayed += 1
+            return result, True
+
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.joined += 1
+            return await asyncio.shield(future), True
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        self.executed += 1
+        try:
+            result = await work()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved: waiters (if any) re-raise it themselves
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            if cacheable is None or cacheable(result):
+                self._store(key, result)
+            return result, False
+        finally:
+            del self._in_flight[key]
+
+    def _store(self, key: str, result: Any) -> None:
+        """Remember a completed result, evicting the oldest entries"""
+        self._results[key] = (time.monotonic() + self.ttl_seconds, result)
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Executed vs. deduplicated calls"""
+        return {
+            "cached": len(self._results),
+            "in_flight": len(self._in_flight),
+            "executed": self.executed,
+            "replayed": self.replayed,
+            "joined": self.joined,
+        }
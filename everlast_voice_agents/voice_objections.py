@@ -0,0 +1,165 @@
+# Objection Classifier for Everlast Voice Agent
+# objections.*.patterns from prompts/config.yaml compiled into one regex, reloaded on change
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, get_args
+import re
+import string
+
+from .voice_config import ReloadingConfig, config_section
+from .voice_sentiment import SentimentMatcher
+from .voice_state import CompanyInfo, ObjectionRecord
+
+# Canonical ObjectionRecord.type values
+OBJECTION_TYPES = get_args(ObjectionRecord.model_fields["type"].annotation)
+UNKNOWN_OBJECTION = "Andere"
+
+# Template placeholders -> CompanyInfo fields ("{company}" -> company_info.name)
+TEMPLATE_FIELDS = {"company": "name", "industry": "industry", "current_tools": "current_tools"}
+
+_WORD = re.compile(r"\w+")
+
+# Quotes around the config texts are not spoken
+_TEMPLATE_QUOTES = "\"„“”'"
+
+# Used when the config has no objections section. Phrases rather than single
+# words, which also occur in ordinary BANT answers ("Budget", "Chef", "später")
+DEFAULT_OBJECTIONS: Dict[str, Dict[str, Any]] = {
+    "preis": {"type": "Preis", "patterns": ["zu teuer", "kein budget", "kein geld", "zu hohe kosten"]},
+    "zeit": {"type": "Zeit", "patterns": ["keine zeit", "rufen sie später an", "melden sie sich später", "busy"]},
+    "nicht_entscheider": {"type": "Nicht-Entscheider", "patterns": ["muss mit meinem chef", "muss mit dem chef", "nicht meine entscheidung"]},
+    "bereits_loesung": {"type": "Bereits-Lösung", "patterns": ["haben schon einen anbieter", "haben bereits einen anbieter", "nutzen bereits", "chatgpt"]},
+    "kein_bedarf": {"type": "Kein-Bedarf", "patterns": ["nicht interessiert", "kein bedarf", "brauchen wir nicht"]},
+    "misstrauen": {"type": "Misstrauen", "patterns": ["nur ein hype", "funktioniert doch nicht", "roboter"]},
+}
+
+
+@dataclass
+class ObjectionMatch:
+    """Classified objection: canonical type, confidence and the config entry it came from"""
+    type: str = UNKNOWN_OBJECTION
+    confidence: float = 0.0
+    key: Optional[str] = None
+    patterns: List[str] = field(default_factory=list)
+
+
+class ObjectionClassifier:
+    """
+    Maps a caller utterance to an objection type with one regex scan.
+
+    All patterns are compiled into a single alternation with one named
+    group per config entry, so the utterance is scanned once in C and each
+    hit names its entry directly; positions whose first character starts
+    no pattern are skipped. Patterns match whole words,
+    case-insensitively, with any punctuation/whitespace between words;
+    longer patterns of an entry are tried first. The entry with the most
+    hits wins, ties go to the entry listed first in the config. Confidence
+    grows with the number of matched words, so a single bare word is the
+    weakest evidence.
+    """
+
+    def __init__(self, objections: Dict[str, Dict[str, Any]]):
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._keys: List[str] = []
+        self._types: List[str] = []
+        alternatives = []
+        first_chars = set()
+
+        for key, entry in objections.items():
+            entry = entry or {}
+            objection_type = entry.get("type", key)
+            if objection_type not in OBJECTION_TYPES:
+                raise ValueError(f"Objection '{key}' has unknown type '{objection_type}' (expected one of {OBJECTION_TYPES})")
+
+            index = len(self._keys)
+            self.entries[key] = entry
+            self._keys.append(key)
+            self._types.append(objection_type)
+
+            phrases = {tuple(SentimentMatcher.tokenize(str(pattern))) for pattern in entry.get("patterns") or []}
+            phrases = sorted((words for words in phrases if words), key=lambda words: (-len(words), words))
+            if phrases:
+                first_chars.update(words[0][0] for words in phrases)
+                alternation = "|".join(r"\W+".join(map(re.escape, words)) for words in phrases)
+                alternatives.append(f"(?P<o{index}>{alternation})")
+
+        self._regex = None
+        if alternatives:
+            # The lookahead lets the engine skip words no pattern can start with
+            # instead of trying every alternative there (about half the scan time)
+            starts = re.escape("".join(sorted(first_chars)))
+            self._regex = re.compile(rf"\b(?=[{starts}])(?:" + "|".join(alternatives) + r")\b")
+
+    def classify(self, text: str) -> ObjectionMatch:
+        """Objection type of an utterance ("Andere" with confidence 0 if nothing matches)"""
+        if self._regex is None:
+            return ObjectionMatch()
+
+        matched: Dict[str, List[str]] = {}
+        for match in self._regex.finditer(text.lower()):
+            matched.setdefault(match.lastgroup, []).append(match.group())
+        if not matched:
+            return ObjectionMatch()
+
+        group = min(matched, key=lambda name: (-len(matched[name]), int(name[1:])))
+        index = int(group[1:])
+        hits = len(matched[group])
+        total = sum(map(len, matched.values()))
+        words = sum(len(_WORD.findall(pattern)) for pattern in matched[group])
+        # Share of the hits for the winner, scaled by the matched words:
+        # one bare word 0.6, a phrase or two hits 0.8, three words or more 1.0
+        confidence = hits / total * min(1.0, 0.4 + 0.2 * words)
+        return ObjectionMatch(self._types[index], round(confidence, 2), self._keys[index], matched[group])
+
+
+def render_template(text: str, company: CompanyInfo) -> Optional[str]:
+    """
+    Fill a response/fallback text from the config for speaking.
+
+    Placeholders ({company}, {industry}, {current_tools}) are filled from
+    CompanyInfo. Returns None if one of them is still unknown or not a
+    template field, so the caller can fall back to the LLM.
+    """
+    values = {}
+    try:
+        for _, name, _, _ in string.Formatter().parse(text):
+            if name is None:
+                continue
+            value = getattr(company, TEMPLATE_FIELDS.get(name, ""), None)
+            if not value:
+                return None
+            values[name] = value
+        rendered = text.format(**values)
+    except (ValueError, IndexError):
+        # Stray braces in the config text
+        return None
+    return " ".join(rendered.split()).strip(_TEMPLATE_QUOTES) or None
+
+
+def load_objection_classifier(path: Optional[str] = None) -> ObjectionClassifier:
+    """Classifier from the `objections` config section (built-in patterns if absent)"""
+    return ObjectionClassifier(config_section("objections", path) or DEFAULT_OBJECTIONS)
+
+
+# Process-wide classifier, rebuilt when prompts/config.yaml changes
+objection_classifier: ReloadingConfig[ObjectionClassifier] = ReloadingConfig(load_objection_classifier)
+
+
+def classify_objection(text: str) -> ObjectionMatch:
+    """Classify with the current configuration"""
+    return objection_classifier.get().classify(text)
+
+
+def template_response(match: ObjectionMatch, company: CompanyInfo, previous: int = 0) -> Optional[str]:
+    """
+    Configured answer to a classified objection.
+
+    The first time a type comes up the entry's `response` is used, the
+    second time its `fallback`. None when there is no usable text (later
+    repeats, unknown placeholders), meaning the LLM should answer.
+    """
+    entry = objection_classifier.get().entries.get(match.key) if match.key else None
+    if not entry or previous > 1:
+        return None
+    text = entry.get("fallback" if previous else "response")
+    return render_template(str(text), company) if text else None
@@ -0,0 +1,243 @@
+# Batched Async Persistence for Everlast Voice Agent
+# Tool calls enqueue analytics rows and return; per-table workers insert them in batches
+
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import asyncio
+import random
+import time
+
+# (table, rows) -> insert all rows in one request
+RowWriter = Callable[[str, List[Dict[str, Any]]], Awaitable[None]]
+
+# (table, rows written) -> called after rows reached the database
+WriteListener = Callable[[str, int], None]
+
+
+def postgrest_writer(client) -> RowWriter:
+    """
+    Multi-row insert through an AsyncPostgrestClient.
+
+    Columns missing in some rows get their database DEFAULT instead of NULL,
+    so rows of different shapes can share a batch.
+    """
+    from postgrest.types import ReturnMethod
+
+    async def write(table: str, rows: List[Dict[str, Any]]) -> None:
+        await client.table(table).insert(
+            rows,
+            returning=ReturnMethod.minimal,
+            default_to_null=False
+        ).execute()
+
+    return write
+
+
+class _TableStats:
+    """Counters for one table queue"""
+
+    def __init__(self):
+        self.enqueued = 0
+        self.written = 0
+        self.batches = 0
+        self.retries = 0
+        self.failed = 0
+        self.dropped = 0
+        self.high_watermark = 0
+        self.last_flush_ms = 0.0
+        self.last_error: Optional[str] = None
+
+
+class PersistenceQueue:
+    """
+    Bounded per-table queues drained by background batch writers.
+
+    enqueue() never blocks: when a table's queue is full the row is dropped
+    and counted, so the voice platform never waits on the database. A
+    worker flushes once batch_size rows are queued or flush_interval seconds
+    after the first row of a batch. Failed batches are retried with
+    exponential backoff; when retries are exhausted the rows are written one
+    by one so a single bad row does not lose its neighbours. on_written is
+    notified per table once rows are stored (e.g. to invalidate caches).
+    """
+
+    def __init__(
+        self,
+        writer: RowWriter,
+        max_queue_size: int = 1000,
+        batch_size: int = 50,
+        flush_interval: float = 0.5,
+        max_retries: int = 5,
+        retry_base_delay: float = 0.5,
+        retry_max_delay: float = 10.0,
+        on_written: Optional[WriteListener] = None
+    ):
+        self.writer = writer
+        self.on_written = on_written
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._workers: Dict[str, asyncio.Task] = {}
+        self._stats: Dict[str, _TableStats] = {}
+        self._closed = False
+
+    def enqueue(self, table: str, row: Dict[str, Any]) -> bool:
+        """
+        Queue a row for insertion without waiting.
+
+        Returns:
+            True if queued, False if dropped (queue full or shutting down)
+        """
+        stats = self._stats.setdefault(table, _TableStats())
+        if self._closed:
+            stats.dropped += 1
+            return False
+
+        queue = self._queue(table)
+        try:
+            queue.put_nowait(row)
+        except asyncio.QueueFull:
+            stats.dropped += 1
+            print(f"Persistence queue for {table} is full, dropping row")
+            return False
+
+        stats.enqueued += 1
+        stats.high_watermark = max(stats.high_watermark, queue.qsize())
+        return True
+
+    def _queue(self, table: str) -> asyncio.Queue:
+        """Queue for a table, starting its worker on first use"""
+        queue = self._queues.get(table)
+        if queue is None:
+            queue = asyncio.Queue(maxsize=self.max_queue_size)
+            self._queues[table] = queue
+            self._workers[table] = asyncio.create_task(self._worker(table, queue))
+        return queue
+
+    async def _worker(self, table: str, queue: asyncio.Queue) -> None:
+        """Collect batches by size or interval and write them"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                await self._write_batch(table, batch)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def _write_with_retry(self, table: str, rows: List[Dict[str, Any]]) -> Optional[Exception]:
+        """Write rows, retrying with backoff; returns the last error instead of raising"""
+        stats = self._stats[table]
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self.writer(table, rows)
+                return None
+            except Exception as e:
+                stats.last_error = str(e)
+                if attempt == self.max_retries:
+                    return e
+                stats.retries += 1
+                delay = min(self.retry_max_delay, self.retry_base_delay * 2 ** attempt)
+                await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+
+    async def _write_batch(self, table: str, batch: List[Dict[str, Any]]) -> None:
+        """Write one batch and record the outcome"""
+        stats = self._stats[table]
+        started = time.perf_counter()
+
+        written_before = stats.written
+        error = await self._write_with_retry(table, batch)
+        if error is None:
+            stats.written += len(batch)
+        elif len(batch) > 1:
+            for row in batch:
+                if await self._write_with_retry_once(table, row):
+                    stats.written += 1
+                else:
+                    stats.failed += 1
+        else:
+            stats.failed += 1
+            print(f"Error saving to Supabase ({table}): {error}")
+
+        if self.on_written and stats.written > written_before:
+            try:
+                self.on_written(table, stats.written - written_before)
+            except Exception as e:
+                print(f"Persistence write listener failed ({table}): {e}")
+
+        stats.batches += 1
+        stats.last_flush_ms = round((time.perf_counter() - started) * 1000, 2)
+
+    async def _write_with_retry_once(self, table: str, row: Dict[str, Any]) -> bool:
+        """Single-row write after a batch gave up (no further backoff)"""
+        try:
+            await self.writer(table, [row])
+            return True
+        except Exception as e:
+            self._stats[table].last_error = str(e)
+            print(f"Error saving to Supabase ({table}): {e}")
+            return False
+
+    async def drain(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every queued row has been written (or has failed).
+
+        Returns:
+            False if the timeout expired first
+        """
+        waits = [queue.join() for queue in self._queues.values()]
+        if not waits:
+            return True
+        try:
+            await asyncio.wait_for(asyncio.gather(*waits), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def close(self, timeout: Optional[float] = 10.0) -> None:
+        """Stop accepting rows, drain the queues and stop the workers"""
+        self._closed = True
+        if not await self.drain(timeout):
+            pending = sum(queue.qsize() for queue in self._queues.values())
+            print(f"Persistence drain timed out, {pending} rows not written")
+
+        for task in self._workers.values():
+            task.cancel()
+        await asyncio.gather(*self._workers.values(), return_exceptions=True)
+        self._workers.clear()
+        self._queues.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-table queue depth, throughput and failure counters"""
+        tables = {}
+        for table, stats in self._stats.items():
+            queue = self._queues.get(table)
+            tables[table] = {
+                "queued": queue.qsize() if queue else 0,
+                "high_watermark": stats.high_watermark,
+                "capacity": self.max_queue_size,
+                "enqueued": stats.enqueued,
+                "written": stats.written,
+                "batches": stats.batches,
+                "avg_batch_size": round(stats.written / stats.batches, 2) if stats.batches else 0.0,
+                "retries": stats.retries,
+                "failed": stats.failed,
+                "dropped": stats.dropped,
+                "last_flush_ms": stats.last_flush_ms,
+                "last_error": stats.last_error,
+            }
+        return tables
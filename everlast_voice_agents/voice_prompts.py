@@ -0,0 +1,176 @@
+# Agent Prompt Templates for Everlast Voice Agent
+# Built once at import; static system prompts are marked for Anthropic prompt caching
+
+from typing import Any, Dict, List, Optional
+import os
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+
+from .voice_config import YAML_AVAILABLE, load_config
+
+# Mark static system prompts with cache_control (Anthropic caches the prefix for ~5 min)
+PROMPT_CACHE = os.getenv("PROMPT_CACHE", "true").lower() == "true"
+
+# Anthropic only caches prefixes of at least this many tokens (Sonnet/Opus 1024,
+# Haiku 2048); shorter prefixes are sent normally and never show cache reads
+PROMPT_CACHE_MIN_TOKENS = int(os.getenv("PROMPT_CACHE_MIN_TOKENS", "1024"))
+
+# Put the shared call context from prompts/config.yaml in front of every agent
+# prompt; the agent prompts alone are a few hundred tokens, too short to cache
+PROMPT_SHARED_CONTEXT = os.getenv("PROMPT_SHARED_CONTEXT", "true").lower() == "true"
+
+# Config sections every agent may need (persona, BANT criteria, scoring, flow,
+# vetted objection answers, examples); matching patterns and lexicons are left out
+SHARED_CONTEXT_SECTIONS = ("agent", "qualification", "scoring", "conversation_flow", "objections", "few_shots")
+_SHARED_CONTEXT_SKIP = {"lexicon", "patterns"}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token; German text tends to need more tokens)"""
+    return len(text) // 4
+
+
+def _without_skipped(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: _without_skipped(item) for key, item in value.items() if key not in _SHARED_CONTEXT_SKIP}
+    if isinstance(value, list):
+        return [_without_skipped(item) for item in value]
+    return value
+
+
+def load_shared_context(path: Optional[str] = None) -> str:
+    """
+    Shared system prompt prefix from the prompt configuration.
+
+    Identical for all agents and all calls, so it sits in front of the agent
+    prompt inside the cached prefix. Empty if the config or PyYAML is missing.
+    """
+    config = load_config(path)
+    sections = {name: _without_skipped(config[name]) for name in SHARED_CONTEXT_SECTIONS if config.get(name)}
+    if not sections or not YAML_AVAILABLE:
+        return ""
+    import yaml
+    return (
+        "GEMEINSAMER GESPRÄCHSKONTEXT (gilt für alle Agenten, Referenz aus der Kampagnen-Konfiguration):\n\n"
+        + yaml.safe_dump(sections, allow_unicode=True, sort_keys=False, width=120)
+    )
+
+
+class AgentPrompt:
+    """
+    Prompt of one agent: shared context, static system prompt, per-turn hint, human template.
+
+    The shared context and the system prompt are content blocks of their own,
+    the second one with cache_control, so the provider can reuse the
+    processed prefix on every turn. Per-turn hints (tone, free slots) follow
+    after the cache breakpoint and do not invalidate it. The human template
+    is filled with str.format; variable values are inserted as-is.
+
+    Prefixes below PROMPT_CACHE_MIN_TOKENS are not cached by the provider;
+    that is logged when the prompt is built.
+    """
+
+    def __init__(
+        self,
+        system: str,
+        human: str,
+        cache: Optional[bool] = None,
+        shared: str = "",
+        name: Optional[str] = None
+    ):
+        self.system = system
+        self.human = human
+        self.shared = shared
+        self.name = name or system[:40]
+        self.prefix_tokens = estimate_tokens(shared + system)
+
+        self._system_block: Dict[str, Any] = {"type": "text", "text": system}
+        self._static_blocks: List[Dict[str, Any]] = [self._system_block]
+        if shared:
+            self._static_blocks.insert(0, {"type": "text", "text": shared})
+
+        self.cache = PROMPT_CACHE if cache is None else cache
+        if self.cache:
+            self._system_block["cache_control"] = {"type": "ephemeral"}
+            if self.prefix_tokens < PROMPT_CACHE_MIN_TOKENS:
+                print(
+                    f"Prompt '{self.name}' has ~{self.prefix_tokens} tokens, below the "
+                    f"{PROMPT_CACHE_MIN_TOKENS}-token cache minimum: it will not be cached"
+                )
+        self._static_system = SystemMessage(content=list(self._static_blocks))
+
+    @property
+    def cacheable(self) -> bool:
+        """Whether the static prefix is marked and (by estimate) long enough to be cached"""
+        return self.cache and self.prefix_tokens >= PROMPT_CACHE_MIN_TOKENS
+
+    def format_messages(self, hint: str = "", **variables) -> List[BaseMessage]:
+        """System message (static blocks + optional hint) and the filled human message"""
+        system = self._static_system
+        if hint:
+            system = SystemMessage(content=[*self._static_blocks, {"type": "text", "text": hint}])
+        return [system, HumanMessage(content=self.human.format(**variables))]
+
+
+class PromptStats:
+    """LLM calls, token usage, prompt-cache hits and template answers per agent"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Reset all counters"""
+        self.by_agent: Dict[str, Dict[str, int]] = {}
+
+    def _counters(self, agent: str) -> Dict[str, int]:
+        return self.by_agent.setdefault(agent, {
+            "calls": 0,
+            "cache_hits": 0,
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "cache_read_tokens": 0,
+            "cache_creation_tokens": 0,
+            "template_responses": 0,
+        })
+
+    def record(self, agent: str, response) -> None:
+        """Count one LLM response (uses its usage_metadata when present)"""
+        counters = self._counters(agent)
+        counters["calls"] += 1
+
+        usage = getattr(response, "usage_metadata", None) or {}
+        details = usage.get("input_token_details") or {}
+        cache_read = details.get("cache_read") or 0
+        counters["input_tokens"] += usage.get("input_tokens") or 0
+        counters["output_tokens"] += usage.get("output_tokens") or 0
+        counters["cache_read_tokens"] += cache_read
+        counters["cache_creation_tokens"] += details.get("cache_creation") or 0
+        if cache_read:
+            counters["cache_hits"] += 1
+
+    def record_template(self, agent: str) -> None:
+        """Count one turn answered from a configured template (no LLM call)"""
+        self._counters(agent)["template_responses"] += 1
+
+    def snapshot(self) -> dict:
+        """Current counters as a dict, with hit rate, cached input and template share per agent"""
+        agents = {}
+        for agent, counters in self.by_agent.items():
+            calls = counters["calls"]
+            input_tokens = counters["input_tokens"]
+            turns = calls + counters["template_responses"]
+            agents[agent] = {
+                **counters,
+                "cache_hit_rate": round(counters["cache_hits"] / calls * 100, 2) if calls > 0 else 0,
+                "cached_input_share": round(counters["cache_read_tokens"] / input_tokens * 100, 2) if input_tokens > 0 else 0,
+                "template_share": round(counters["template_responses"] / turns * 100, 2) if turns > 0 else 0,
+            }
+        return {
+            "prompt_cache": PROMPT_CACHE,
+            "cache_min_tokens": PROMPT_CACHE_MIN_TOKENS,
+            "total_calls": sum(counters["calls"] for counters in self.by_agent.values()),
+            "total_template_responses": sum(counters["template_responses"] for counters in self.by_agent.values()),
+            "by_agent": agents
+        }
+
+prompt_stats = PromptStats()
@@ -0,0 +1,264 @@
+# Batch Sentiment Re-Scoring for Everlast Voice Agent
+# Re-runs the keyword sentiment over past calls after a lexicon change and updates call_summaries
+#
+# Usage:
+#   python -m everlast_voice_agents.voice_rescoring transcripts.jsonl
+#   python -m everlast_voice_agents.voice_rescoring --checkpoints --dry-run
+
+from dataclasses import dataclass
+from typing import Any, AsyncIterable, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from collections import Counter
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from .voice_sentiment import (
+    SentimentMatcher,
+    classify_counts,
+    get_sentiment_matcher,
+    load_sentiment_matcher,
+    sentiment_trend,
+)
+
+# Roles in transcript exports whose lines are not caller speech
+AGENT_ROLES = {"assistant", "agent", "bot", "ai", "system"}
+
+# One (label, score, confidence) per utterance, as analyze_sentiment would set it
+UtteranceScore = Tuple[str, float, float]
+
+# Rows for rescore_call_sentiment -> number of call_summaries rows updated
+SummaryWriter = Callable[[List[Dict[str, Any]]], Awaitable[int]]
+
+
+@dataclass
+class CallTranscript:
+    """Caller utterances of one conversation, in order"""
+    conversation_id: str
+    utterances: List[str]
+
+
+# ============================================================================
+# SCORING
+# ============================================================================
+
+def score_utterances(utterances: List[str], matcher: Optional[SentimentMatcher] = None) -> List[UtteranceScore]:
+    """
+    Score many utterances at once.
+
+    Gives the same result as analyze_sentiment per utterance, without
+    building and mutating a SentimentState for each one.
+    """
+    count = (matcher or get_sentiment_matcher()).count
+    return [classify_counts(*count(text)) for text in utterances]
+
+
+def summarize_call(scores: List[UtteranceScore]) -> Dict[str, str]:
+    """call_summaries sentiment columns for one call's utterance scores"""
+    if not scores:
+        return {"sentiment_start": "neutral", "sentiment_end": "neutral", "sentiment_trend": "gleich"}
+    trend = sentiment_trend(scores[0][1], scores[-1][1]) if len(scores) >= 2 else "gleich"
+    return {"sentiment_start": scores[0][0], "sentiment_end": scores[-1][0], "sentiment_trend": trend}
+
+
+def score_calls(calls: List[CallTranscript], matcher: Optional[SentimentMatcher] = None) -> List[Dict[str, Any]]:
+    """Update rows for a chunk of calls, all utterances scored as one batch"""
+    scores = score_utterances([text for call in calls for text in call.utterances], matcher)
+    rows = []
+    offset = 0
+    for call in calls:
+        end = offset + len(call.utterances)
+        rows.append({"conversation_id": call.conversation_id, **summarize_call(scores[offset:end])})
+        offset = end
+    return rows
+
+
+# ============================================================================
+# SOURCES
+# ============================================================================
+
+def read_transcripts(path: str) -> Iterator[CallTranscript]:
+    """
+    Calls from a JSONL transcript export.
+
+    Each line is either a whole call ({"conversation_id", "utterances": [...]})
+    or one utterance ({"conversation_id", "text", "role"?}). Utterance lines
+    must be grouped by conversation; agent lines are skipped.
+    """
+    current: Optional[CallTranscript] = None
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            conversation_id = str(record["conversation_id"])
+
+            if "utterances" in record:
+                if current:
+                    yield current
+                    current = None
+                yield CallTranscript(conversation_id, [str(text) for text in record["utterances"]])
+                continue
+
+            if str(record.get("role", "user")).lower() in AGENT_ROLES:
+                continue
+            if current and current.conversation_id != conversation_id:
+                yield current
+                current = None
+            if current is None:
+                current = CallTranscript(conversation_id, [])
+            current.utterances.append(str(record.get("text", "")))
+
+    if current:
+        yield current
+
+
+async def read_checkpoints(checkpointer, limit: int = 100000) -> AsyncIterable[CallTranscript]:
+    """
+    Calls from the conversation checkpoints: only the latest call per caller.
+
+    Checkpoints are keyed by phone number and hold a returning caller's
+    earlier calls too; only the messages from call_message_offset on belong
+    to the stored conversation_id. Earlier calls cannot be attributed to
+    their ids from a checkpoint, re-score them from a transcript export.
+    Only human messages are scored, matching what analyze_sentiment saw live.
+    """
+    from langchain_core.messages import HumanMessage
+
+    for thread_id in await checkpointer.list_threads(limit=limit):
+        state = await checkpointer.get(thread_id)
+        if not state or not state.get("conversation_id"):
+            continue
+        messages = state.get("messages", [])[state.get("call_message_offset", 0):]
+        utterances = [
+            message.content for message in messages
+            if isinstance(message, HumanMessage) and isinstance(message.content, str)
+        ]
+        yield CallTranscript(state["conversation_id"], utterances)
+
+
+# ============================================================================
+# PIPELINE
+# ============================================================================
+
+def rpc_writer(client) -> SummaryWriter:
+    """Writes a chunk through the rescore_call_sentiment function (supabase/stats.sql)"""
+
+    async def write(rows: List[Dict[str, Any]]) -> int:
+        result = await client.rpc("rescore_call_sentiment", {"p_rows": rows}).execute()
+        return int(result.data or 0)
+
+    return write
+
+
+async def _calls(source: Union[Iterable[CallTranscript], AsyncIterable[CallTranscript]]):
+    """Iterate a sync or async call source"""
+    if hasattr(source, "__aiter__"):
+        async for call in source:
+            yield call
+    else:
+        for call in source:
+            yield call
+
+
+async def rescore_calls(
+    source: Union[Iterable[CallTranscript], AsyncIterable[CallTranscript]],
+    write: Optional[SummaryWriter] = None,
+    matcher: Optional[SentimentMatcher] = None,
+    chunk_size: int = 500
+) -> Dict[str, Any]:
+    """
+    Re-score calls chunk by chunk and stream the results to the database.
+
+    Each chunk is written while the next one is scored. Without a writer
+    (dry run) only the statistics are collected.
+
+    Returns:
+        Call/utterance/update counts and the new sentiment_end distribution
+    """
+    matcher = matcher or get_sentiment_matcher()
+    started = time.perf_counter()
+    result: Dict[str, Any] = {"calls": 0, "utterances": 0, "updated": 0}
+    distribution: Counter = Counter()
+    pending: Optional[asyncio.Task] = None
+
+    async def flush(chunk: List[CallTranscript]) -> None:
+        nonlocal pending
+        rows = score_calls(chunk, matcher)
+        result["calls"] += len(chunk)
+        result["utterances"] += sum(len(call.utterances) for call in chunk)
+        distribution.update(row["sentiment_end"] for row in rows)
+        if write is None:
+            return
+        if pending is not None:
+            result["updated"] += await pending
+        pending = asyncio.create_task(write(rows))
+
+    chunk: List[CallTranscript] = []
+    async for call in _calls(source):
+        chunk.append(call)
+        if len(chunk) >= chunk_size:
+            await flush(chunk)
+            chunk = []
+    if chunk:
+        await flush(chunk)
+    if pending is not None:
+        result["updated"] += await pending
+
+    result["sentiment_end"] = dict(distribution)
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    return result
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+async def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="Re-score call sentiment with the current lexicon")
+    parser.add_argument("transcripts", nargs="?", help="JSONL transcript export")
+    parser.add_argument("--checkpoints", action="store_true", help="Read the latest call per caller from the checkpoint store instead")
+    parser.add_argument("--limit", type=int, default=100000, help="Max checkpoint threads")
+    parser.add_argument("--config", help="Lexicon config (default: PROMPT_CONFIG_PATH or prompts/config.yaml)")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Calls per database update")
+    parser.add_argument("--dry-run", action="store_true", help="Score only, do not update call_summaries")
+    args = parser.parse_args(argv)
+
+    if bool(args.transcripts) == args.checkpoints:
+        parser.error("pass either a transcript file or --checkpoints")
+
+    matcher = load_sentiment_matcher(args.config)
+    client = None
+    checkpointer = None
+    try:
+        write = None
+        if not args.dry_run:
+            from .voice_supabase import create_async_postgrest
+            client = create_async_postgrest()
+            write = rpc_writer(client)
+
+        if args.checkpoints:
+            from .voice_checkpointer import get_checkpointer
+            backend = os.getenv("CHECKPOINTER_BACKEND", "sqlite")
+            kwargs = {"db_path": os.getenv("DATABASE_PATH", "checkpoints.db")} if backend == "sqlite" else {}
+            checkpointer = get_checkpointer(backend=backend, **kwargs)
+            await checkpointer.connect()
+            source = read_checkpoints(checkpointer, limit=args.limit)
+        else:
+            source = read_transcripts(args.transcripts)
+
+        result = await rescore_calls(source, write, matcher, chunk_size=args.chunk_size)
+    finally:
+        if checkpointer:
+            await checkpointer.close()
+        if client:
+            await client.aclose()
+
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    return result
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,148 @@
+# Deterministic Router for Everlast Voice Agent
+# Rule/feature-based supervisor decisions with LLM fallback on low confidence
+
+from dataclasses import dataclass
+from typing import Optional
+import re
+
+from .voice_state import AgentState, BANTState, SentimentState, calculate_lead_score
+
+# ============================================================================
+# ROUTING FEATURES
+# ============================================================================
+
+# Caller phrases that signal an objection or concern
+OBJECTION_CUES = [
+    "zu teuer", "kein budget", "kein geld", "zu hohe kosten", "keine zeit",
+    "rufen sie später an", "melden sie sich später", "nicht meine entscheidung",
+    "muss mit meinem chef", "muss mit dem chef", "mit meinem chef sprechen",
+    "mit meinem chef besprechen", "mit meinem chef abstimmen", "haben schon einen anbieter",
+    "haben bereits einen anbieter", "nutzen bereits", "nicht interessiert",
+    "kein bedarf", "brauchen wir nicht", "nur ein hype", "funktioniert doch nicht"
+]
+
+# Single words that often come with an objection but also occur in ordinary
+# BANT answers ("ich bin der Chef", "später im Jahr"): too weak to skip the LLM
+OBJECTION_WORDS = [
+    "teuer", "kosten", "später", "busy", "chef", "abstimmen", "chatgpt",
+    "hype", "roboter", "einwand", "problem", "bedenken"
+]
+
+
+def _cue_pattern(cues: list[str]) -> re.Pattern:
+    """Whole-word matcher for a cue list ("kosten" does not hit "Kostenvoranschlag")"""
+    alternatives = sorted((r"\W+".join(map(re.escape, cue.split())) for cue in cues), key=len, reverse=True)
+    return re.compile(r"\b(?:" + "|".join(alternatives) + r")\b")
+
+_OBJECTION_CUE = _cue_pattern(OBJECTION_CUES)
+_OBJECTION_WORD = _cue_pattern(OBJECTION_WORDS)
+
+# Caller phrases that signal readiness to book
+BOOKING_CUES = [
+    "termin", "buchen", "reservieren", "demo", "kalender", "wann passt",
+    "gespräch vereinbaren"
+]
+
+VALID_AGENTS = ["bant_qualifier", "objection_handler", "calendly_booker", "dsgvo_logger"]
+
+@dataclass
+class RoutingDecision:
+    """Deterministic routing decision with confidence (0.0 - 1.0)"""
+    agent: str
+    confidence: float
+    reason: str
+
+def route_deterministic(
+    state: AgentState,
+    last_message: str,
+    sentiment: Optional[SentimentState] = None
+) -> RoutingDecision:
+    """
+    Decide the next agent from local state only (no LLM call).
+
+    Uses call phase, BANT completeness, lead score, caller sentiment and
+    objection/booking keywords. Low confidence means the LLM should decide.
+    """
+    sentiment = sentiment or state.get("caller_sentiment") or SentimentState()
+    bant = state.get("bant") or BANTState()
+    message_lower = last_message.lower()
+
+    # Call phase
+    if state.get("call_ended"):
+        return RoutingDecision("dsgvo_logger", 1.0, "call_ended")
+    if not state.get("call_started"):
+        return RoutingDecision("dsgvo_logger", 0.95, "consent_required")
+
+    has_objection = _OBJECTION_CUE.search(message_lower) is not None
+    wants_booking = any(cue in message_lower for cue in BOOKING_CUES)
+    negative = sentiment.current_sentiment in ["frustriert", "negativ"]
+    positive = sentiment.current_sentiment in ["positiv", "begeistert"]
+
+    # Objections take priority, especially with negative sentiment
+    if has_objection and not wants_booking:
+        return RoutingDecision("objection_handler", 0.95 if negative else 0.85, "objection_cue")
+    # A lone objection word may just be a BANT answer: let the LLM decide
+    if not wants_booking and _OBJECTION_WORD.search(message_lower):
+        return RoutingDecision("objection_handler", 0.6, "objection_word")
+
+    if bant.is_complete():
+        score, _ = calculate_lead_score(bant, state.get("objections", []))
+        if score in ["A", "B"] and (wants_booking or positive):
+            return RoutingDecision("calendly_booker", 0.9, f"qualified_{score}")
+        if wants_booking:
+            return RoutingDecision("calendly_booker", 0.8, "booking_cue")
+        if negative:
+            return RoutingDecision("objection_handler", 0.6, "negative_sentiment")
+        return RoutingDecision("calendly_booker", 0.6, f"bant_complete_{score}")
+
+    # Discovery phase: BANT still incomplete
+    if wants_booking and positive:
+        return RoutingDecision("calendly_booker", 0.6, "early_booking_cue")
+    if negative:
+        return RoutingDecision("objection_handler", 0.6, "negative_sentiment")
+    return RoutingDecision("bant_qualifier", 0.8, "bant_incomplete")
+
+# ============================================================================
+# ROUTER STATISTICS
+# ============================================================================
+
+class RouterStats:
+    """Counters for how often each routing path is taken"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Reset all counters"""
+        self.rule_decisions = 0
+        self.llm_fallbacks = 0
+        self.llm_only = 0
+        self.by_agent: dict[str, int] = {}
+        self.by_reason: dict[str, int] = {}
+
+    def record(self, path: str, agent: str, reason: Optional[str] = None):
+        """Record a routing decision ("rules", "llm_fallback" or "llm")"""
+        if path == "rules":
+            self.rule_decisions += 1
+        elif path == "llm_fallback":
+            self.llm_fallbacks += 1
+        else:
+            self.llm_only += 1
+        self.by_agent[agent] = self.by_agent.get(agent, 0) + 1
+        if reason:
+            self.by_reason[reason] = self.by_reason.get(reason, 0) + 1
+
+    def snapshot(self) -> dict:
+        """Current counters as a dict"""
+        total = self.rule_decisions + self.llm_fallbacks + self.llm_only
+        return {
+            "total_decisions": total,
+            "rule_decisions": self.rule_decisions,
+            "llm_fallbacks": self.llm_fallbacks,
+            "llm_only": self.llm_only,
+            "rule_rate": round(self.rule_decisions / total * 100, 2) if total > 0 else 0,
+            "by_agent": dict(self.by_agent),
+            "by_reason": dict(self.by_reason)
+        }
+
+router_stats = RouterStats()
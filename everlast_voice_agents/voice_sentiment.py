@@ -0,0 +1,180 @@
+# Keyword Sentiment Matcher for Everlast Voice Agent
+# Lexicons compiled once into a word -> category table; one pass over the utterance per turn
+
+from typing import Dict, Iterable, List, Optional, Tuple
+import re
+
+from .voice_config import config_section
+
+# Categories in decision order (see voice_state.analyze_sentiment)
+CATEGORIES = ("positive", "negative", "frustration", "excitement")
+
+DEFAULT_SENTIMENT_LEXICON: Dict[str, List[str]] = {
+    "positive": ["gut", "super", "perfekt", "interessant", "gerne", "ja", "top", "exzellent", "begeistert"],
+    "negative": ["nein", "nicht", "schlecht", "ärgern", "frustrierend", "doof", "blöd", "ärgerlich"],
+    "frustration": ["verdammt", "unverschämt", "wütend", "sauer", "genervt", "reicht"],
+    "excitement": ["wow", "unglaublich", "fantastisch", "amazing", "genial", "toll"],
+}
+
+# Score per label and confidence gained per lexicon hit (see classify_counts)
+SENTIMENT_SCORES: Dict[str, float] = {
+    "frustriert": -0.7,
+    "begeistert": 0.9,
+    "negativ": -0.5,
+    "positiv": 0.5,
+    "neutral": 0.0,
+}
+CONFIDENCE_PER_MATCH = 0.3
+
+# Score change between first and last turn that counts as a trend
+TREND_THRESHOLD = 0.3
+
+# Unicode-aware words: "ja" does not match inside "januar", "nicht" not inside "nichts"
+_WORD = re.compile(r"\w+")
+
+# Stripped from whitespace-separated tokens ("ja," -> "ja"); str.split + strip
+# beats a regex tokenizer for turn-sized utterances
+_PUNCTUATION = ".,!?;:\"'()[]{}…-–—„“”‚‘’/*"
+
+
+class SentimentMatcher:
+    """
+    Counts lexicon hits per category in a single pass.
+
+    Entries match whole words only. An entry with several words ("es reicht")
+    matches that word sequence. Each word belongs to at most one category.
+    """
+
+    def __init__(self, lexicon: Dict[str, Iterable[str]]):
+        self._words: Dict[str, int] = {}
+        # first word -> [(remaining words, category index)]
+        self._phrases: Dict[str, List[Tuple[Tuple[str, ...], int]]] = {}
+
+        for index, category in enumerate(CATEGORIES):
+            for entry in lexicon.get(category, []):
+                words = tuple(self.tokenize(str(entry)))
+                if not words:
+                    continue
+                if len(words) > 1:
+                    self._phrases.setdefault(words[0], []).append((words[1:], index))
+                    continue
+                owner = self._words.setdefault(words[0], index)
+                if owner != index:
+                    raise ValueError(f"Sentiment word '{words[0]}' is in {CATEGORIES[owner]} and {category}")
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        """Lower-cased words of an utterance"""
+        tokens = []
+        for token in text.lower().split():
+            if not token.isalnum():
+                token = token.strip(_PUNCTUATION)
+                if not token.isalnum():
+                    # Inner punctuation ("gut/super") or nothing left
+                    tokens.extend(_WORD.findall(token))
+                    continue
+            tokens.append(token)
+        return tokens
+
+    def count(self, text: str) -> Tuple[int, int, int, int]:
+        """Hits per category, in CATEGORIES order"""
+        if self._phrases:
+            return self._count_with_phrases(text)
+
+        # Hot path: look words up as they come, strip punctuation only on a miss
+        counts = [0, 0, 0, 0]
+        get = self._words.get
+        for token in text.lower().split():
+            index = get(token)
+            if index is None:
+                if token.isalnum():
+                    continue
+                token = token.strip(_PUNCTUATION)
+                index = get(token)
+                if index is None:
+                    if not token.isalnum():
+                        for word in _WORD.findall(token):
+                            index = get(word)
+                            if index is not None:
+                                counts[index] += 1
+                    continue
+            counts[index] += 1
+        return tuple(counts)
+
+    def _count_with_phrases(self, text: str) -> Tuple[int, int, int, int]:
+        """count() for lexicons with multi-word entries"""
+        counts = [0, 0, 0, 0]
+        get = self._words.get
+        tokens = self.tokenize(text)
+        for position, token in enumerate(tokens):
+            index = get(token)
+            if index is not None:
+                counts[index] += 1
+            for rest, phrase_index in self._phrases.get(token, ()):
+                if tuple(tokens[position + 1:position + 1 + len(rest)]) == rest:
+                    counts[phrase_index] += 1
+        return tuple(counts)
+
+    def count_by_category(self, text: str) -> Dict[str, int]:
+        """Hits per category name"""
+        return dict(zip(CATEGORIES, self.count(text)))
+
+
+def classify_counts(pos_count: int, neg_count: int, frust_count: int, exc_count: int) -> Tuple[str, float, float]:
+    """
+    Sentiment label, score and confidence for one utterance's lexicon hits.
+
+    Frustration and excitement win over the positive/negative balance.
+    """
+    if frust_count > 0:
+        sentiment = "frustriert"
+    elif exc_count > 0:
+        sentiment = "begeistert"
+    elif neg_count > pos_count:
+        sentiment = "negativ"
+    elif pos_count > neg_count:
+        sentiment = "positiv"
+    else:
+        sentiment = "neutral"
+
+    total_matches = pos_count + neg_count + frust_count + exc_count
+    confidence = min(total_matches * CONFIDENCE_PER_MATCH, 1.0)
+    return sentiment, SENTIMENT_SCORES[sentiment], confidence
+
+
+def sentiment_trend(first_score: float, last_score: float) -> str:
+    """Trend label stored in call_summaries.sentiment_trend"""
+    if last_score > first_score + TREND_THRESHOLD:
+        return "verbessert"
+    if last_score < first_score - TREND_THRESHOLD:
+        return "verschlechtert"
+    return "gleich"
+
+
+def load_sentiment_matcher(path: Optional[str] = None) -> SentimentMatcher:
+    """
+    Matcher from the `sentiment.lexicon` config section.
+
+    Categories missing in the config keep their default word list.
+    """
+    configured = config_section("sentiment", path).get("lexicon") or {}
+    lexicon = {category: configured.get(category, words) for category, words in DEFAULT_SENTIMENT_LEXICON.items()}
+    return SentimentMatcher(lexicon)
+
+
+_matcher: Optional[SentimentMatcher] = None
+
+
+def get_sentiment_matcher() -> SentimentMatcher:
+    """Process-wide matcher, compiled from configuration on first use"""
+    global _matcher
+    if _matcher is None:
+        _matcher = load_sentiment_matcher()
+    return _matcher
+
+
+def reload_sentiment_matcher(path: Optional[str] = None) -> SentimentMatcher:
+    """Recompile the process-wide matcher (e.g. after a lexicon change)"""
+    global _matcher
+    _matcher = load_sentiment_matcher(path)
+    return _matcher
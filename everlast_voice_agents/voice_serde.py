@@ -0,0 +1,192 @@
+# Checkpoint Serialization for Everlast Voice Agent
+# Typed, versioned encoding of AgentState values (pydantic models + LangChain messages)
+# orjson when installed, stdlib json otherwise - the wire format is identical
+
+from typing import Any, Dict, Type
+import json
+
+from pydantic import BaseModel
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from .voice_state import (
+    AppointmentState,
+    BANTState,
+    CallMetadata,
+    CompanyInfo,
+    ConsentState,
+    GuardrailsState,
+    ObjectionRecord,
+    SentimentState,
+)
+
+# Try to import orjson for fast encoding
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# ============================================================================
+# FORMAT
+# ============================================================================
+# Registered objects are written as their JSON fields plus a "__type__" tag,
+# e.g. {"__type__": "BANTState", "budget": "Ja", ...}. Tagging inline keeps
+# JSONB paths such as state->'bant'->>'need' queryable in Postgres.
+#
+# Version 0: untagged checkpoints written with json.dumps(default=str)
+# Version 1: tagged objects, version stored under "__v" in the state row
+
+SERDE_VERSION = 1
+TYPE_KEY = "__type__"
+VERSION_KEY = "__v"
+
+_TYPES: Dict[str, Type[BaseModel]] = {}
+_NAMES: Dict[type, str] = {}
+# Messages drop default fields (empty kwargs/metadata) to keep log rows small
+_COMPACT: set = set()
+
+
+def register_type(cls: Type[BaseModel], name: str = None, compact: bool = False) -> Type[BaseModel]:
+    """
+    Register a pydantic model for typed round-trips.
+
+    Args:
+        cls: Model class
+        name: Tag written to the payload (defaults to the class name)
+        compact: Omit fields that equal their default
+
+    Returns:
+        The class, so this can be used as a decorator
+    """
+    name = name or cls.__name__
+    _TYPES[name] = cls
+    _NAMES[cls] = name
+    if compact:
+        _COMPACT.add(cls)
+    return cls
+
+
+for _model in (
+    SentimentState, BANTState, CompanyInfo, ConsentState, ObjectionRecord,
+    AppointmentState, CallMetadata, GuardrailsState
+):
+    register_type(_model)
+
+for _message in (HumanMessage, AIMessage, SystemMessage, ToolMessage):
+    register_type(_message, compact=True)
+
+# Top-level AgentState fields and their model, used to upgrade version 0 rows
+STATE_FIELDS: Dict[str, Type[BaseModel]] = {
+    "bant": BANTState,
+    "company_info": CompanyInfo,
+    "caller_sentiment": SentimentState,
+    "guardrails": GuardrailsState,
+    "appointment": AppointmentState,
+    "consent": ConsentState,
+    "metadata": CallMetadata,
+}
+
+# message.type -> class, for untagged message dicts
+_MESSAGE_TYPES = {"human": HumanMessage, "ai": AIMessage, "system": SystemMessage, "tool": ToolMessage}
+
+# ============================================================================
+# ENCODE / DECODE
+# ============================================================================
+
+def _default(value: Any) -> Any:
+    """Encoder hook for objects the JSON backend cannot handle natively"""
+    cls = type(value)
+    name = _NAMES.get(cls)
+    if name is not None:
+        data = value.model_dump(mode="json", exclude_defaults=cls in _COMPACT)
+        data[TYPE_KEY] = name
+        return data
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (set, tuple)):
+        return list(value)
+    return str(value)
+
+
+def _revive(value: Any) -> Any:
+    """Rebuild registered objects from a decoded JSON tree"""
+    if isinstance(value, dict):
+        name = value.get(TYPE_KEY)
+        if name is not None and name in _TYPES:
+            data = dict(value)
+            del data[TYPE_KEY]
+            return _TYPES[name].model_validate(data)
+        return {key: _revive(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_revive(item) for item in value]
+    return value
+
+
+def dumps(value: Any) -> bytes:
+    """Serialize a value to JSON bytes, tagging registered objects"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(value, default=_default)
+    return json.dumps(value, default=_default, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def parse(data: Any) -> Any:
+    """Parse JSON text/bytes without reviving tagged objects"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(bytes(data) if isinstance(data, memoryview) else data)
+
+
+def loads(data: Any) -> Any:
+    """Deserialize JSON text/bytes (or an already parsed tree) into typed values"""
+    if isinstance(data, (str, bytes, bytearray, memoryview)):
+        data = parse(data)
+    return _revive(data)
+
+
+def to_primitive(value: Any) -> Any:
+    """Tagged JSON-compatible tree, for clients that send JSON themselves (JSONB, PostgREST)"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(orjson.dumps(value, default=_default))
+    return json.loads(dumps(value))
+
+# ============================================================================
+# STATE ROWS
+# ============================================================================
+
+def dumps_state(state: Dict[str, Any]) -> bytes:
+    """Serialize a checkpoint row with the current format version"""
+    return dumps({**state, VERSION_KEY: SERDE_VERSION})
+
+
+def loads_state(data: Any) -> Dict[str, Any]:
+    """Deserialize a checkpoint row, upgrading older format versions"""
+    state = loads(data)
+    version = state.pop(VERSION_KEY, 0)
+    if version > SERDE_VERSION:
+        raise ValueError(f"Checkpoint format v{version} is newer than supported v{SERDE_VERSION}")
+    if version == 0:
+        state = upgrade_v0(state)
+    return state
+
+
+def revive_message(value: Any) -> Any:
+    """Rebuild an untagged message dict (model_dump output) into its class"""
+    if isinstance(value, dict) and value.get("type") in _MESSAGE_TYPES and "content" in value:
+        return _MESSAGE_TYPES[value["type"]].model_validate(value)
+    return value
+
+
+def upgrade_v0(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Rehydrate the plain dicts of an untagged checkpoint into models"""
+    for field, cls in STATE_FIELDS.items():
+        if isinstance(state.get(field), dict):
+            state[field] = cls.model_validate(state[field])
+
+    if isinstance(state.get("objections"), list):
+        state["objections"] = [
+            ObjectionRecord.model_validate(item) if isinstance(item, dict) else item
+            for item in state["objections"]
+        ]
+    if isinstance(state.get("messages"), list):
+        state["messages"] = [revive_message(item) for item in state["messages"]]
+    return state
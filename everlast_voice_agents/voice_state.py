@@ -2,15 +2,24 @@
 # Enhanced with Sentiment Detection and Checkpointing
 
 from typing import TypedDict, Annotated, Sequence, Optional, Literal
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from langchain_core.messages import BaseMessage
 import operator
+import os
 from datetime import datetime
 
+from .voice_sentiment import classify_counts, get_sentiment_matcher, sentiment_trend
+
 # ============================================================================
 # SENTIMENT MODELS
 # ============================================================================
 
+# Sentiment updates kept in SentimentState.history; aggregates cover the whole call
+SENTIMENT_HISTORY_WINDOW = int(os.getenv("SENTIMENT_HISTORY_WINDOW", "20"))
+# Weight of the newest score in the moving average
+SENTIMENT_EMA_ALPHA = 0.3
+
+
 class SentimentState(BaseModel):
     """Caller sentiment tracking for adaptive responses"""
     current_sentiment: Literal["positiv", "neutral", "negativ", "frustriert", "begeistert"] = Field(
@@ -31,24 +40,103 @@ class SentimentState(BaseModel):
     )
     history: list[dict] = Field(
         default_factory=list,
-        description="History of sentiment changes"
+        description="Most recent sentiment changes (at most SENTIMENT_HISTORY_WINDOW)"
     )
     last_updated: Optional[str] = Field(
         default=None,
         description="ISO timestamp of last sentiment update"
     )
 
+    # Aggregates over all updates, maintained incrementally by update()
+    update_count: int = Field(
+        default=0,
+        ge=0,
+        description="Number of sentiment updates in this call"
+    )
+    first_sentiment: Optional[str] = Field(
+        default=None,
+        description="Sentiment of the first update"
+    )
+    first_score: Optional[float] = Field(
+        default=None,
+        description="Score of the first update"
+    )
+    ema_score: float = Field(
+        default=0.0,
+        description="Exponential moving average of the score"
+    )
+    min_score: Optional[float] = Field(
+        default=None,
+        description="Lowest score in this call"
+    )
+    max_score: Optional[float] = Field(
+        default=None,
+        description="Highest score in this call"
+    )
+
+    @model_validator(mode="after")
+    def _bound_history(self) -> "SentimentState":
+        """Derive aggregates for states saved with a full history, then trim it"""
+        if self.update_count < len(self.history):
+            entries, self.history, self.update_count = self.history, [], 0
+            for entry in entries:
+                self._aggregate(entry.get("sentiment"), entry.get("score"))
+            self.history = entries
+        if len(self.history) > SENTIMENT_HISTORY_WINDOW:
+            del self.history[:-SENTIMENT_HISTORY_WINDOW]
+        return self
+
+    def _aggregate(self, sentiment: str, score: Optional[float]) -> None:
+        """Fold one update into the running aggregates"""
+        score = float(score or 0.0)
+        if self.update_count == 0:
+            self.first_sentiment = sentiment
+            self.first_score = score
+            self.ema_score = score
+            self.min_score = score
+            self.max_score = score
+        else:
+            self.ema_score = SENTIMENT_EMA_ALPHA * score + (1 - SENTIMENT_EMA_ALPHA) * self.ema_score
+            self.min_score = min(self.min_score, score)
+            self.max_score = max(self.max_score, score)
+        self.update_count += 1
+
     def update(self, sentiment: str, score: float, confidence: float):
         """Update sentiment state"""
         self.current_sentiment = sentiment
         self.sentiment_score = score
         self.confidence = confidence
         self.last_updated = datetime.now().isoformat()
+        self._aggregate(sentiment, score)
         self.history.append({
             "sentiment": sentiment,
             "score": score,
             "timestamp": self.last_updated
         })
+        if len(self.history) > SENTIMENT_HISTORY_WINDOW:
+            del self.history[0]
+
+    @property
+    def start_sentiment(self) -> str:
+        """Sentiment at the start of the call"""
+        return self.first_sentiment or "neutral"
+
+    def trend(self) -> str:
+        """verbessert / verschlechtert / gleich from the first to the current score"""
+        if self.update_count < 2:
+            return "gleich"
+        return sentiment_trend(self.first_score or 0.0, float(self.sentiment_score or 0.0))
+
+    def summary(self, recent: int = 3) -> str:
+        """Fixed-size description for prompts, independent of call length"""
+        if not self.update_count:
+            return "keine Sentiment-Daten"
+        latest = ", ".join(entry.get("sentiment", "?") for entry in self.history[-recent:])
+        return (
+            f"{self.update_count} Messungen, Start {self.start_sentiment}, zuletzt {latest}; "
+            f"Ø {self.ema_score:+.2f}, Min {self.min_score:+.2f}, Max {self.max_score:+.2f}, "
+            f"Trend {self.trend()}"
+        )
 
     def requires_tone_adjustment(self) -> bool:
         """Check if TTS tone adjustment is needed"""
@@ -221,6 +309,8 @@ class AgentState(TypedDict):
 
     # Messages
     messages: Annotated[Sequence[BaseMessage], operator.add]
+    # Index of the current call's first message (a returning caller's earlier calls come before it)
+    call_message_offset: int
 
     # Qualification
     bant: BANTState
@@ -249,6 +339,9 @@ class AgentState(TypedDict):
     call_started: bool
     call_ended: bool
 
+    # Graph nodes executed in the current turn (per-turn budget)
+    turn_node_count: int
+
     # Summary
     summary: Optional[str]
     next_steps: Optional[str]
@@ -272,40 +365,10 @@ def analyze_sentiment(
     Analyze sentiment from text and update state.
     In production, this would use Deepgram's sentiment analysis API.
     """
-    # Simple keyword-based detection (placeholder for Deepgram integration)
-    positive_words = ["gut", "super", "perfekt", "interessant", "gerne", "ja", "top", "exzellent", "begeistert"]
-    negative_words = ["nein", "nicht", "schlecht", "ärgern", "frustrierend", "doof", "blöd", "ärgerlich"]
-    frustration_words = ["verdammt", "unverschämt", "wütend", "sauer", "genervt", "reicht"]
-    excitement_words = ["wow", "unglaublich", "fantastisch", "amazing", "genial", "toll"]
-
-    text_lower = text.lower()
-
-    # Count matches
-    pos_count = sum(1 for word in positive_words if word in text_lower)
-    neg_count = sum(1 for word in negative_words if word in text_lower)
-    frust_count = sum(1 for word in frustration_words if word in text_lower)
-    exc_count = sum(1 for word in excitement_words if word in text_lower)
-
-    # Determine sentiment
-    if frust_count > 0:
-        sentiment = "frustriert"
-        score = -0.7
-    elif exc_count > 0:
-        sentiment = "begeistert"
-        score = 0.9
-    elif neg_count > pos_count:
-        sentiment = "negativ"
-        score = -0.5
-    elif pos_count > neg_count:
-        sentiment = "positiv"
-        score = 0.5
-    else:
-        sentiment = "neutral"
-        score = 0.0
-
-    # Calculate confidence
-    total_matches = pos_count + neg_count + frust_count + exc_count
-    confidence = min(total_matches * 0.3, 1.0)
+    # Keyword-based detection (placeholder for Deepgram integration), one pass
+    # over the words of the utterance, lexicons from prompts/config.yaml
+    counts = get_sentiment_matcher().count(text)
+    sentiment, score, confidence = classify_counts(*counts)
 
     # Update state
     current_sentiment.update(sentiment, score, confidence)
@@ -368,6 +431,7 @@ def create_initial_state(
         "phone_number": phone_number,
         "current_agent": "supervisor",
         "messages": [],
+        "call_message_offset": 0,
         "bant": BANTState(),
         "company_info": CompanyInfo(),
         "lead_score": None,
@@ -379,6 +443,7 @@ def create_initial_state(
         "consent": ConsentState(),
         "call_started": False,
         "call_ended": False,
+        "turn_node_count": 0,
         "summary": None,
         "next_steps": None,
         "metadata": CallMetadata(
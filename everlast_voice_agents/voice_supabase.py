@@ -0,0 +1,71 @@
+# Async Supabase (PostgREST) client for Everlast Voice Agent
+# One pooled HTTP client per process instead of blocking supabase-py calls
+
+from typing import Optional
+import os
+
+import httpx
+
+# Try to import postgrest (ships with supabase-py)
+try:
+    from postgrest import AsyncPostgrestClient
+    POSTGREST_AVAILABLE = True
+except ImportError:
+    POSTGREST_AVAILABLE = False
+
+# HTTP/2 multiplexes concurrent requests over one connection (needs h2)
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+def create_async_postgrest(
+    supabase_url: Optional[str] = None,
+    supabase_key: Optional[str] = None,
+    timeout: Optional[float] = None,
+    max_connections: Optional[int] = None
+) -> "AsyncPostgrestClient":
+    """
+    Create an async PostgREST client on a pooled keep-alive HTTP client.
+
+    Args:
+        supabase_url: Project URL (defaults to SUPABASE_URL)
+        supabase_key: Service key (defaults to SUPABASE_SERVICE_KEY)
+        timeout: Request timeout in seconds (defaults to SUPABASE_HTTP_TIMEOUT or 10)
+        max_connections: Pool size (defaults to SUPABASE_HTTP_MAX_CONNECTIONS or 20)
+
+    Returns:
+        AsyncPostgrestClient - close with `await client.aclose()`
+    """
+    if not POSTGREST_AVAILABLE:
+        raise ImportError("postgrest is required. Install with: pip install supabase")
+
+    supabase_url = supabase_url or os.getenv("SUPABASE_URL")
+    supabase_key = supabase_key or os.getenv("SUPABASE_SERVICE_KEY")
+    if not supabase_url or not supabase_key:
+        raise ValueError("SUPABASE_URL and SUPABASE_SERVICE_KEY are required")
+
+    timeout = timeout if timeout is not None else float(os.getenv("SUPABASE_HTTP_TIMEOUT", "10"))
+    max_connections = max_connections or int(os.getenv("SUPABASE_HTTP_MAX_CONNECTIONS", "20"))
+
+    http_client = httpx.AsyncClient(
+        timeout=timeout,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections
+        ),
+        http2=HTTP2_AVAILABLE,
+        follow_redirects=True
+    )
+    return AsyncPostgrestClient(
+        f"{supabase_url.rstrip('/')}/rest/v1",
+        headers={
+            "apikey": supabase_key,
+            "Authorization": f"Bearer {supabase_key}",
+            "Accept": "application/json",
+            "Content-Type": "application/json"
+        },
+        http_client=http_client
+    )
@@ -3,12 +3,16 @@
 
 from fastapi import FastAPI, HTTPException, Request, Depends, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel, Field
 from typing import Optional, Literal, List
+from contextlib import asynccontextmanager
 import os
 import json
 import uuid
+import asyncio
+import functools
+import time
 from datetime import datetime
 import httpx
 
@@ -23,8 +27,17 @@ if _current_dir not in sys.path:
 
 try:
     from everlast_voice_agents.voice_agents import process_message, end_conversation, get_conversation_history, clear_conversation
-    from everlast_voice_agents.voice_state import create_initial_state, analyze_sentiment, SentimentState
-    from everlast_voice_agents.voice_checkpointer import get_checkpointer, BaseCheckpointer
+    # Shared with the agent graph so webhook updates and agent turns see the same cached state
+    from everlast_voice_agents.voice_agents import checkpointer, CHECKPOINTER_BACKEND, register_slot_provider
+    from everlast_voice_agents.voice_state import create_initial_state, analyze_sentiment, SentimentState, BANTState, AppointmentState, GuardrailsState
+    from everlast_voice_agents.voice_checkpointer import BaseCheckpointer, CachedCheckpointer
+    from everlast_voice_agents.voice_router import router_stats
+    from everlast_voice_agents.voice_prompts import prompt_stats
+    from everlast_voice_agents.voice_objections import objection_classifier
+    from everlast_voice_agents.voice_persistence import PersistenceQueue, postgrest_writer
+    from everlast_voice_agents.voice_supabase import create_async_postgrest
+    from everlast_voice_agents.voice_bookings import DeferredBookings, BookingTicket
+    from everlast_voice_agents.voice_idempotency import IdempotencyCache, idempotency_key
     print("LangGraph imported successfully from everlast_voice_agents")
 except ImportError as e:
     print(f"LangGraph import error: {e}")
@@ -34,6 +47,7 @@ except ImportError as e:
 
 # Supabase client
 from supabase import create_client, Client
+from postgrest.types import CountMethod
 
 # Import Calendly client
 try:
@@ -43,14 +57,44 @@ except ImportError:
     CALENDLY_CLIENT_AVAILABLE = False
     print("Warning: calendly_client not available")
 
-# Initialize checkpointer
-CHECKPOINTER_BACKEND = os.getenv("CHECKPOINTER_BACKEND", "sqlite")
-checkpointer: BaseCheckpointer = get_checkpointer(backend=CHECKPOINTER_BACKEND)
+# ============================================================================
+# APP LIFESPAN
+# ============================================================================
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup/shutdown"""
+    # Open checkpoint connections before the first call arrives
+    await checkpointer.connect()
+    # Compile the objection patterns now, a broken config fails the deploy instead of a call
+    objection_classifier.reload()
+    # One Calendly client per worker, connected before the first booking
+    calendly = get_calendly_client()
+    if calendly and os.getenv("CALENDLY_WARM_UP", "true").lower() == "true":
+        await calendly.warm_up()
+    if calendly and CALENDLY_EVENT_TYPE_URI:
+        # Availability checks during calls are answered from memory
+        calendly.start_availability_refresh()
+        # Let the booker offer concrete free slots from that cache
+        register_slot_provider(suggest_calendly_slots)
+    yield
+    register_slot_provider(None)
+    # Let running bookings finish so their outcome reaches the database
+    await bookings.close(timeout=float(os.getenv("BOOKING_DRAIN_TIMEOUT", "10")))
+    if calendly_client:
+        await calendly_client.close()
+    # Write out queued analytics rows before the process exits
+    if persistence:
+        await persistence.close(timeout=float(os.getenv("PERSIST_DRAIN_TIMEOUT", "10")))
+        await supabase_async.aclose()
+    # Flush pending checkpoint writes and release connections
+    await checkpointer.close()
 
 app = FastAPI(
     title="Everlast Voice Agent API",
     description="Backend API for Everlast Voice Agent with Vapi integration",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware - configure for production
@@ -86,6 +130,27 @@ CALENDLY_EVENT_TYPE_URI = os.getenv("CALENDLY_EVENT_TYPE_URI")
 # Initialize Supabase client
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY) if SUPABASE_URL and SUPABASE_KEY else None
 
+# Analytics inserts are queued and written in batches off the request path
+supabase_async = create_async_postgrest(SUPABASE_URL, SUPABASE_KEY) if SUPABASE_URL and SUPABASE_KEY else None
+persistence = PersistenceQueue(
+    postgrest_writer(supabase_async),
+    max_queue_size=int(os.getenv("PERSIST_QUEUE_SIZE", "1000")),
+    batch_size=int(os.getenv("PERSIST_BATCH_SIZE", "50")),
+    flush_interval=float(os.getenv("PERSIST_FLUSH_INTERVAL", "0.5")),
+    max_retries=int(os.getenv("PERSIST_MAX_RETRIES", "5")),
+    # Dashboard aggregates over a table go stale once our own rows land in it
+    on_written=lambda table, rows: stats_cache.invalidate(table)
+) if supabase_async else None
+
+# Shared Calendly client, created once per worker (see get_calendly_client)
+calendly_client: Optional["CalendlyClient"] = None
+
+# "deferred" (default) answers bookAppointment within BOOKING_LATENCY_BUDGET
+# and finishes slow bookings in the background; "sync" waits for Calendly.
+BOOKING_MODE = os.getenv("BOOKING_MODE", "deferred")
+# Failed background bookings are posted here (e.g. CRM or Slack) for a human follow-up
+BOOKING_FOLLOWUP_WEBHOOK_URL = os.getenv("BOOKING_FOLLOWUP_WEBHOOK_URL")
+
 # In-memory state store (use Redis in production)
 conversation_states = {}
 
@@ -157,19 +222,103 @@ def get_or_create_conversation_state(conversation_id: str, phone_number: str):
         )
     return conversation_states[conversation_id]
 
-def save_to_supabase(table: str, data: dict):
-    """Save data to Supabase"""
-    if supabase:
+def save_to_supabase(table: str, data: dict) -> bool:
+    """Queue a row for Supabase - written in the background, never blocks the caller"""
+    if persistence:
+        return persistence.enqueue(table, data)
+    return False
+
+def _appointment_row(conversation_id: str, phone_number: str, parameters: dict, result: dict) -> dict:
+    """appointments row for a finished booking attempt"""
+    return {
+        "conversation_id": conversation_id,
+        "phone_number": phone_number,
+        "name": parameters.get("name"),
+        "email": parameters.get("email"),
+        "appointment_date": parameters.get("date"),
+        "appointment_time": parameters.get("time"),
+        "company": parameters.get("company"),
+        "notes": parameters.get("notes"),
+        "timezone": parameters.get("timezone", "Europe/Berlin"),
+        "calendly_event_uri": result.get("event_uri"),
+        "calendly_invitee_uri": result.get("invitee_uri"),
+        "confirmation_url": result.get("confirmation_url"),
+        "booking_status": result.get("status"),
+        "success": result.get("success"),
+        "error_message": result.get("error_message"),
+        "error_code": result.get("error_code"),
+        "created_at": datetime.now().isoformat()
+    }
+
+async def booking_finished(ticket: "BookingTicket") -> None:
+    """Persist a finished booking; failed ones go to the follow-up channel"""
+    context = ticket.context
+    save_to_supabase("appointments", _appointment_row(
+        ticket.conversation_id, context.get("phone_number"), context.get("parameters", {}), ticket.result
+    ))
+    if ticket.status == "failed":
+        await notify_booking_follow_up(ticket)
+
+async def notify_booking_follow_up(ticket: "BookingTicket") -> None:
+    """Hand a failed booking to a human: booking_follow_ups table and optional webhook"""
+    parameters = ticket.context.get("parameters", {})
+    follow_up = {
+        "booking_id": ticket.booking_id,
+        "conversation_id": ticket.conversation_id,
+        "phone_number": ticket.context.get("phone_number"),
+        "name": parameters.get("name"),
+        "email": parameters.get("email"),
+        "requested_date": parameters.get("date"),
+        "requested_time": parameters.get("time"),
+        "error_code": ticket.result.get("error_code"),
+        "error_message": ticket.result.get("error_message") or ticket.result.get("error"),
+        "created_at": datetime.now().isoformat()
+    }
+    save_to_supabase("booking_follow_ups", follow_up)
+
+    if BOOKING_FOLLOWUP_WEBHOOK_URL:
         try:
-            result = supabase.table(table).insert(data).execute()
-            return result
-        except Exception as e:
-            print(f"Error saving to Supabase: {e}")
-            return None
-    return None
+            async with httpx.AsyncClient(timeout=10.0) as client:
+                await client.post(BOOKING_FOLLOWUP_WEBHOOK_URL, json=follow_up)
+        except httpx.HTTPError as e:
+            print(f"Booking follow-up webhook failed: {e}")
+
+bookings = DeferredBookings(
+    on_complete=booking_finished,
+    latency_budget=float(os.getenv("BOOKING_LATENCY_BUDGET", "1.5")),
+    retention=float(os.getenv("BOOKING_STATUS_RETENTION", "3600"))
+)
 
-async def book_calendly_appointment(data: CalendlyBookingRequest) -> dict:
-    """Book appointment via Calendly API using production-ready client"""
+def get_calendly_client() -> Optional["CalendlyClient"]:
+    """Return the worker's shared Calendly client, creating it on first use"""
+    global calendly_client
+    if calendly_client is None and CALENDLY_CLIENT_AVAILABLE and CALENDLY_API_KEY:
+        calendly_client = CalendlyClient(
+            api_key=CALENDLY_API_KEY,
+            user_uri=CALENDLY_USER_URI,
+            event_type_uri=CALENDLY_EVENT_TYPE_URI,
+            http2=os.getenv("CALENDLY_HTTP2", "true").lower() == "true",
+            max_connections=int(os.getenv("CALENDLY_MAX_CONNECTIONS", "10")),
+            max_keepalive_connections=int(os.getenv("CALENDLY_MAX_KEEPALIVE", "5")),
+            keepalive_expiry=float(os.getenv("CALENDLY_KEEPALIVE_EXPIRY", "60")),
+            availability_window_days=int(os.getenv("CALENDLY_AVAILABILITY_DAYS", "14")),
+            availability_refresh_interval=float(os.getenv("CALENDLY_AVAILABILITY_REFRESH", "300")),
+            rate_limit=float(os.getenv("CALENDLY_RATE_LIMIT", "10")),
+            rate_burst=int(os.getenv("CALENDLY_RATE_BURST", "20")),
+            request_deadline=float(os.getenv("CALENDLY_REQUEST_DEADLINE", "8")) or None
+        )
+    return calendly_client
+
+async def suggest_calendly_slots(preference: Optional[str] = None) -> List[str]:
+    """Spoken labels of the next free Calendly slots (slot provider for the booker agent)"""
+    client = get_calendly_client()
+    if not client:
+        return []
+    suggestions = await client.suggest_slots(preference=preference, n=3, timezone="Europe/Berlin")
+    return [slot.label for slot in suggestions]
+
+async def book_calendly_appointment(data: CalendlyBookingRequest, deadline: Optional[float] = None) -> dict:
+    """Book appointment via Calendly API using production-ready client (deadline in seconds)"""
     if not CALENDLY_API_KEY:
         return {
             "success": False,
@@ -183,11 +332,7 @@ async def book_calendly_appointment(data: CalendlyBookingRequest) -> dict:
     # Use new client if available, otherwise fall back to legacy implementation
     if CALENDLY_CLIENT_AVAILABLE:
         try:
-            client = CalendlyClient(
-                api_key=CALENDLY_API_KEY,
-                user_uri=CALENDLY_USER_URI,
-                event_type_uri=CALENDLY_EVENT_TYPE_URI
-            )
+            client = get_calendly_client()
 
             result = await client.book_appointment(
                 name=data.name,
@@ -197,11 +342,10 @@ async def book_calendly_appointment(data: CalendlyBookingRequest) -> dict:
                 phone=data.phone,
                 company=data.company,
                 notes=data.notes,
-                timezone=timezone
+                timezone=timezone,
+                deadline=deadline
             )
 
-            await client.close()
-
             # Convert result to dict for response
             return {
                 "success": result.success,
@@ -216,7 +360,7 @@ async def book_calendly_appointment(data: CalendlyBookingRequest) -> dict:
             }
 
         except Exception as e:
-            logger.error(f"Calendly booking error: {e}")
+            print(f"Calendly booking error: {e}")
             return {
                 "success": False,
                 "error": str(e),
@@ -319,7 +463,15 @@ async def health_check():
         "supabase_connected": supabase is not None,
         "timestamp": datetime.now().isoformat(),
         "langgraph_enabled": True,
-        "checkpointer_backend": CHECKPOINTER_BACKEND
+        "checkpointer_backend": CHECKPOINTER_BACKEND,
+        "checkpoint_cache": checkpointer.stats() if isinstance(checkpointer, CachedCheckpointer) else None,
+        "checkpointer": checkpointer.backend.stats() if isinstance(checkpointer, CachedCheckpointer) else checkpointer.stats(),
+        "persistence": persistence.stats() if persistence else None,
+        "bookings": bookings.stats(),
+        "tool_call_dedupe": tool_calls.stats(),
+        "stats_cache": stats_cache.stats(),
+        "calendly": calendly_client.pool_stats() if calendly_client else None,
+        "calendly_availability": calendly_client.availability.stats() if calendly_client else None
     }
 
 @app.get("/debug/imports")
@@ -395,6 +547,7 @@ async def vapi_webhook(request: Request, background_tasks: BackgroundTasks):
                 "current_agent": result.get("current_agent", "supervisor"),
                 "sentiment": result.get("caller_sentiment", {}).current_sentiment if result.get("caller_sentiment") else "neutral",
                 "tts_adjustments": tts_adjustments,
+                "nodes_executed": result.get("turn_node_count", 0),
                 "checkpoint_saved": True
             })
 
@@ -409,8 +562,53 @@ async def vapi_webhook(request: Request, background_tasks: BackgroundTasks):
         print(f"Error in webhook: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# Tool calls with external side effects (Calendly, Supabase rows) run once per
+# idempotency key; Vapi retries within the TTL get the first response replayed
+IDEMPOTENT_FUNCTIONS = {"qualifyLead", "bookAppointment", "recordObjection", "logConsent", "endCallSummary"}
+# Booking failures worth retrying; replaying them would block the retry for the whole TTL
+TRANSIENT_BOOKING_ERRORS = {"DEADLINE_EXCEEDED", "API_ERROR", "CLIENT_ERROR", "REQUEST_FAILED"}
+tool_calls = IdempotencyCache(
+    ttl_seconds=float(os.getenv("TOOL_CALL_DEDUPE_TTL", "600")),
+    max_entries=int(os.getenv("TOOL_CALL_DEDUPE_MAX_ENTRIES", "10000"))
+)
+
 async def handle_function_call(function_call: dict, conversation_id: str, phone_number: str):
-    """Handle function calls from Vapi"""
+    """Handle function calls from Vapi, deduplicating retried side-effecting calls"""
+    function_name = function_call.get("name")
+    if function_name not in IDEMPOTENT_FUNCTIONS:
+        return await execute_function_call(function_call, conversation_id, phone_number)
+
+    key = idempotency_key(
+        conversation_id,
+        function_name,
+        function_call.get("parameters", {}),
+        call_id=function_call.get("id") or function_call.get("toolCallId")
+    )
+
+    async def execute():
+        response = await execute_function_call(function_call, conversation_id, phone_number)
+        return response.status_code, response.body
+
+    (status_code, body), duplicate = await tool_calls.run(key, execute, cacheable=_replayable_response)
+    response = Response(content=body, status_code=status_code, media_type="application/json")
+    if duplicate:
+        response.headers["X-Idempotent-Replay"] = "true"
+    return response
+
+def _replayable_response(response: tuple) -> bool:
+    """False for booking failures with a temporary cause, so a retry reaches Calendly again"""
+    _, body = response
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return True
+    if not isinstance(data, dict) or data.get("status") != "booking_failed":
+        return True
+    error_code = (data.get("details") or {}).get("error_code")
+    return error_code not in TRANSIENT_BOOKING_ERRORS
+
+async def execute_function_call(function_call: dict, conversation_id: str, phone_number: str):
+    """Execute one function call from Vapi"""
     function_name = function_call.get("name")
     parameters = function_call.get("parameters", {})
 
@@ -455,7 +653,29 @@ async def handle_function_call(function_call: dict, conversation_id: str, phone_
             timezone=parameters.get("timezone", "Europe/Berlin")
         )
 
-        result = await book_calendly_appointment(booking_data)
+        sync = BOOKING_MODE != "deferred"
+        if sync:
+            # Blocking: wait for Calendly up to its own deadline, not the latency budget
+            deadline = float(os.getenv("CALENDLY_BOOKING_DEADLINE", "4")) or None
+            book = lambda: book_calendly_appointment(booking_data, deadline=deadline)
+        else:
+            # The background booking may use the full request deadline
+            book = lambda: book_calendly_appointment(booking_data)
+
+        # Outcome is saved to appointments by booking_finished, also for deferred bookings
+        ticket = await bookings.submit(
+            conversation_id,
+            book,
+            context={"phone_number": phone_number, "parameters": parameters},
+            wait_for_result=sync
+        )
+        if not ticket.done:
+            return JSONResponse({
+                "status": "booking_pending",
+                "booking_id": ticket.booking_id,
+                "message": "Ich trage den Termin gerade ein. Die Bestätigung kommt gleich per E-Mail."
+            })
+        result = ticket.result
 
         # Prepare response for Vapi
         if result.get("success"):
@@ -470,37 +690,37 @@ async def handle_function_call(function_call: dict, conversation_id: str, phone_
                 response_message = "Der gewählte Zeitpunkt liegt in der Vergangenheit."
             elif error_code == "CONFIG_MISSING":
                 response_message = "Die Kalenderintegration ist nicht korrekt konfiguriert."
+            elif error_code == "DEADLINE_EXCEEDED":
+                # Calendly is throttled or slow: don't keep the caller waiting
+                response_message = "Die Buchung dauert gerade zu lange. Ich schicke Ihnen den Buchungslink per E-Mail."
             else:
                 response_message = result.get("error_message", "Es ist ein Fehler aufgetreten.")
 
-        # Save to database
-        data = {
-            "conversation_id": conversation_id,
-            "phone_number": phone_number,
-            "name": parameters.get("name"),
-            "email": parameters.get("email"),
-            "appointment_date": parameters.get("date"),
-            "appointment_time": parameters.get("time"),
-            "company": parameters.get("company"),
-            "notes": parameters.get("notes"),
-            "timezone": parameters.get("timezone", "Europe/Berlin"),
-            "calendly_event_uri": result.get("event_uri"),
-            "calendly_invitee_uri": result.get("invitee_uri"),
-            "confirmation_url": result.get("confirmation_url"),
-            "booking_status": result.get("status"),
-            "success": result.get("success"),
-            "error_message": result.get("error_message"),
-            "error_code": result.get("error_code"),
-            "created_at": datetime.now().isoformat()
-        }
-        save_to_supabase("appointments", data)
-
         return JSONResponse({
             "status": "appointment_booked" if result.get("success") else "booking_failed",
+            "booking_id": ticket.booking_id,
             "message": response_message,
             "details": result
         })
 
+    elif function_name == "getBookingStatus":
+        # Poll a deferred booking on a later turn (latest of the conversation by default)
+        booking_id = parameters.get("bookingId")
+        if booking_id:
+            ticket = bookings.get(booking_id)
+        else:
+            tickets = bookings.for_conversation(conversation_id)
+            ticket = tickets[0] if tickets else None
+
+        if not ticket:
+            return JSONResponse({"status": "booking_unknown", "message": "Ich finde keine laufende Buchung."})
+        messages = {
+            "pending": "Die Buchung läuft noch.",
+            "confirmed": "Der Termin ist bestätigt.",
+            "failed": "Die Buchung hat leider nicht geklappt. Ein Kollege meldet sich mit einem Terminvorschlag."
+        }
+        return JSONResponse({**ticket.to_dict(), "message": messages[ticket.status]})
+
     elif function_name == "recordObjection":
         # Record objection
         data = {
@@ -537,14 +757,7 @@ async def handle_function_call(function_call: dict, conversation_id: str, phone_
 
             # Get sentiment trend
             sentiment = final_state.get("caller_sentiment", SentimentState())
-            sentiment_trend = "gleich"
-            if sentiment.history and len(sentiment.history) >= 2:
-                first = sentiment.history[0].get("score", 0)
-                last = sentiment.history[-1].get("score", 0)
-                if last > first + 0.3:
-                    sentiment_trend = "verbessert"
-                elif last < first - 0.3:
-                    sentiment_trend = "verschlechtert"
+            sentiment_trend = sentiment.trend()
 
             data = {
                 "conversation_id": conversation_id,
@@ -554,12 +767,12 @@ async def handle_function_call(function_call: dict, conversation_id: str, phone_
                 "next_steps": parameters.get("nextSteps"),
                 "notes": parameters.get("notes"),
                 "summary": final_state.get("summary"),
-                "bant_data": final_state.get("bant"),
-                "appointment_booked": final_state.get("appointment", {}).get("booked", False),
-                "sentiment_start": sentiment.history[0]["sentiment"] if sentiment.history else "neutral",
+                "bant_data": final_state.get("bant", BANTState()).model_dump(),
+                "appointment_booked": final_state.get("appointment", AppointmentState()).booked,
+                "sentiment_start": sentiment.start_sentiment,
                 "sentiment_end": sentiment.current_sentiment,
                 "sentiment_trend": sentiment_trend,
-                "guardrails_triggered": len(final_state.get("guardrails", {}).data_integrity_violations) > 0,
+                "guardrails_triggered": len(final_state.get("guardrails", GuardrailsState()).data_integrity_violations) > 0,
                 "ended_at": datetime.now().isoformat()
             }
             save_to_supabase("call_summaries", data)
@@ -591,6 +804,14 @@ async def handle_function_call(function_call: dict, conversation_id: str, phone_
 
     return JSONResponse({"status": "unknown_function"})
 
+@app.get("/bookings/{booking_id}")
+async def get_booking_status(booking_id: str):
+    """Status of a (deferred) booking"""
+    ticket = bookings.get(booking_id)
+    if not ticket:
+        raise HTTPException(status_code=404, detail="Booking not found")
+    return ticket.to_dict()
+
 @app.post("/calls/end")
 async def end_call(request: CallSummaryRequest, conversation_id: str):
     """Manually end a call and save summary"""
@@ -616,24 +837,135 @@ async def end_call(request: CallSummaryRequest, conversation_id: str):
 
     return JSONResponse({"status": "success", "lead_score": request.lead_score})
 
+# ============================================================================
+# DASHBOARD STATS CACHE
+# ============================================================================
+
+class StatsCache:
+    """
+    TTL cache for dashboard aggregates with single-flight recomputation.
+
+    Every open dashboard polls the same endpoints; one Supabase query per
+    endpoint and TTL serves all of them, concurrent misses share a single
+    recomputation. Writes of this app (persistence queue) to a table an
+    endpoint reads shorten its entry to at most min_ttl, so new calls show
+    up quickly without turning every write into a dashboard query.
+    """
+
+    def __init__(self, ttls: dict, default_ttl: float = 30.0, min_ttl: float = 2.0):
+        self.ttls = ttls
+        self.default_ttl = default_ttl
+        self.min_ttl = min_ttl
+        # key -> [loaded_at, expires_at, value, tables]
+        self._entries = {}
+        self._in_flight = {}
+        self.hits = 0
+        self.misses = 0
+        self.joined = 0
+        self.invalidations = 0
+
+    async def get(self, endpoint: str, compute, tables: tuple, params: tuple = ()):
+        """Cached value of an endpoint, recomputed once when expired"""
+        key = (endpoint, params)
+        entry = self._entries.get(key)
+        if entry and entry[1] > time.monotonic():
+            self.hits += 1
+            return entry[2]
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.joined += 1
+            return await asyncio.shield(task)
+
+        self.misses += 1
+        task = asyncio.ensure_future(compute())
+        self._in_flight[key] = task
+        try:
+            value = await asyncio.shield(task)
+        finally:
+            self._in_flight.pop(key, None)
+
+        # Errors are returned as {"error": ...} - don't keep serving them
+        if not (isinstance(value, dict) and "error" in value):
+            now = time.monotonic()
+            self._entries[key] = [now, now + self.ttls.get(endpoint, self.default_ttl), value, tables]
+        return value
+
+    def invalidate(self, table: str) -> None:
+        """Let entries that read `table` expire within min_ttl"""
+        self.invalidations += 1
+        for entry in self._entries.values():
+            if table in entry[3]:
+                entry[1] = min(entry[1], entry[0] + self.min_ttl)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.joined
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "joined": self.joined,
+            "hit_rate": round((self.hits + self.joined) / lookups * 100, 2) if lookups else 0,
+            "invalidations": self.invalidations,
+        }
+
+# Seconds per endpoint, override with STATS_CACHE_TTL_<ENDPOINT> (e.g. STATS_CACHE_TTL_LEAD_SCORES)
+STATS_CACHE_TTLS = {
+    name: float(os.getenv(f"STATS_CACHE_TTL_{name.upper().replace('-', '_')}", default))
+    for name, default in {
+        "conversion": "30",
+        "lead-scores": "60",
+        "objections": "60",
+        "sentiment": "60",
+        "guardrails": "60",
+    }.items()
+}
+stats_cache = StatsCache(
+    STATS_CACHE_TTLS,
+    min_ttl=float(os.getenv("STATS_CACHE_MIN_TTL", "2"))
+)
+
+def cached_stats(endpoint: str, tables: tuple):
+    """Serve a stats endpoint through stats_cache (query parameters are part of the key)"""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            params = args + tuple(sorted(kwargs.items()))
+            return await stats_cache.get(endpoint, lambda: func(*args, **kwargs), tables, params)
+        return wrapper
+    return decorator
+
 # ============================================================================
 # DASHBOARD API ENDPOINTS
 # ============================================================================
+# Aggregation happens in Postgres (count queries and the GROUP BY functions in
+# supabase/stats.sql), so only the aggregates cross the wire.
+
+async def count_rows(table: str, **equals) -> int:
+    """Server-side COUNT(*) of a table, optionally filtered by column = value"""
+    query = supabase_async.table(table).select("id", count=CountMethod.exact, head=True)
+    for column, value in equals.items():
+        query = query.eq(column, value)
+    result = await query.execute()
+    return result.count or 0
+
+async def aggregate_rows(function: str, params: Optional[dict] = None) -> list:
+    """Rows of a stats_* aggregation function"""
+    result = await supabase_async.rpc(function, params or {}).execute()
+    return result.data or []
 
 @app.get("/api/stats/conversion")
+@cached_stats("conversion", ("call_summaries", "appointments"))
 async def get_conversion_stats(days: int = 30):
     """Get conversion rate statistics"""
-    if not supabase:
+    if not supabase_async:
         return {"error": "Supabase not configured"}
 
     try:
-        # Get total calls
-        calls_result = supabase.table("call_summaries").select("*").execute()
-        total_calls = len(calls_result.data) if calls_result.data else 0
-
-        # Get booked appointments
-        appointments_result = supabase.table("appointments").select("*").execute()
-        booked = len(appointments_result.data) if appointments_result.data else 0
+        total_calls, booked = await asyncio.gather(
+            count_rows("call_summaries"),
+            count_rows("appointments")
+        )
 
         conversion_rate = (booked / total_calls * 100) if total_calls > 0 else 0
 
@@ -646,20 +978,17 @@ async def get_conversion_stats(days: int = 30):
         return {"error": str(e)}
 
 @app.get("/api/stats/lead-scores")
+@cached_stats("lead-scores", ("call_summaries",))
 async def get_lead_score_distribution():
     """Get lead score distribution"""
-    if not supabase:
+    if not supabase_async:
         return {"error": "Supabase not configured"}
 
     try:
-        result = supabase.table("call_summaries").select("lead_score").execute()
-        data = result.data if result.data else []
-
         distribution = {"A": 0, "B": 0, "C": 0, "N": 0}
-        for item in data:
-            score = item.get("lead_score")
-            if score in distribution:
-                distribution[score] += 1
+        for row in await aggregate_rows("stats_lead_scores"):
+            if row["lead_score"] in distribution:
+                distribution[row["lead_score"]] = row["total"]
 
         return distribution
     except Exception as e:
@@ -683,30 +1012,28 @@ async def get_recent_calls(limit: int = 10):
         return {"error": str(e)}
 
 @app.get("/api/stats/objections")
+@cached_stats("objections", ("objections",))
 async def get_objection_stats():
     """Get objection statistics"""
-    if not supabase:
+    if not supabase_async:
         return {"error": "Supabase not configured"}
 
     try:
-        result = supabase.table("objections").select("objection_type, outcome").execute()
-        data = result.data if result.data else []
-
         type_counts = {}
         outcome_counts = {"Überwunden": 0, "Nicht überwunden": 0, "Offen": 0}
+        total = 0
 
-        for item in data:
-            obj_type = item.get("objection_type", "Andere")
-            outcome = item.get("outcome", "Offen")
-
-            type_counts[obj_type] = type_counts.get(obj_type, 0) + 1
-            if outcome in outcome_counts:
-                outcome_counts[outcome] += 1
+        # One row per (type, outcome) pair
+        for row in await aggregate_rows("stats_objections"):
+            type_counts[row["objection_type"]] = type_counts.get(row["objection_type"], 0) + row["total"]
+            if row["outcome"] in outcome_counts:
+                outcome_counts[row["outcome"]] += row["total"]
+            total += row["total"]
 
         return {
             "by_type": type_counts,
             "by_outcome": outcome_counts,
-            "total": len(data)
+            "total": total
         }
     except Exception as e:
         return {"error": str(e)}
@@ -773,7 +1100,7 @@ async def get_checkpoint(phone_number: str):
                 "current_agent": checkpoint.get("current_agent"),
                 "bant": checkpoint.get("bant"),
                 "lead_score": checkpoint.get("lead_score"),
-                "appointment_booked": checkpoint.get("appointment", {}).get("booked", False),
+                "appointment_booked": checkpoint.get("appointment", AppointmentState()).booked,
                 "caller_sentiment": checkpoint.get("caller_sentiment", {}).current_sentiment if checkpoint.get("caller_sentiment") else "neutral",
                 "last_updated": checkpoint.get("last_checkpoint")
             }
@@ -808,35 +1135,34 @@ async def list_checkpoints(limit: int = 100):
 # ============================================================================
 
 @app.get("/api/stats/sentiment")
+@cached_stats("sentiment", ("call_summaries",))
 async def get_sentiment_stats(days: int = 30):
     """Get sentiment analysis statistics"""
-    if not supabase:
+    if not supabase_async:
         return {"error": "Supabase not configured"}
 
     try:
-        result = supabase.table("call_summaries")\
-            .select("sentiment_start, sentiment_end, sentiment_trend")\
-            .gte("ended_at", (datetime.now().replace(day=1)).isoformat())\
-            .execute()
-
-        data = result.data if result.data else []
+        rows = await aggregate_rows(
+            "stats_sentiment",
+            {"p_since": (datetime.now().replace(day=1)).isoformat()}
+        )
 
         sentiment_distribution = {"positiv": 0, "neutral": 0, "negativ": 0, "frustriert": 0, "begeistert": 0}
         trends = {"verbessert": 0, "gleich": 0, "verschlechtert": 0}
+        total = 0
 
-        for item in data:
-            end_sentiment = item.get("sentiment_end", "neutral")
-            if end_sentiment in sentiment_distribution:
-                sentiment_distribution[end_sentiment] += 1
-
-            trend = item.get("sentiment_trend", "gleich")
-            if trend in trends:
-                trends[trend] += 1
+        # One row per (sentiment_end, sentiment_trend) pair
+        for row in rows:
+            if row["sentiment_end"] in sentiment_distribution:
+                sentiment_distribution[row["sentiment_end"]] += row["total"]
+            if row["sentiment_trend"] in trends:
+                trends[row["sentiment_trend"]] += row["total"]
+            total += row["total"]
 
         return {
             "sentiment_distribution": sentiment_distribution,
             "trend_analysis": trends,
-            "total_analyzed": len(data)
+            "total_analyzed": total
         }
     except Exception as e:
         return {"error": str(e)}
@@ -846,20 +1172,17 @@ async def get_sentiment_stats(days: int = 30):
 # ============================================================================
 
 @app.get("/api/stats/guardrails")
+@cached_stats("guardrails", ("call_summaries",))
 async def get_guardrails_stats(days: int = 30):
     """Get guardrails trigger statistics"""
-    if not supabase:
+    if not supabase_async:
         return {"error": "Supabase not configured"}
 
     try:
-        result = supabase.table("call_summaries")\
-            .select("guardrails_triggered")\
-            .execute()
-
-        data = result.data if result.data else []
-
-        triggered = sum(1 for item in data if item.get("guardrails_triggered", False))
-        total = len(data)
+        triggered, total = await asyncio.gather(
+            count_rows("call_summaries", guardrails_triggered=True),
+            count_rows("call_summaries")
+        )
 
         return {
             "guardrails_triggered": triggered,
@@ -869,6 +1192,20 @@ async def get_guardrails_stats(days: int = 30):
     except Exception as e:
         return {"error": str(e)}
 
+# ============================================================================
+# ROUTER STATS API
+# ============================================================================
+
+@app.get("/api/stats/router")
+async def get_router_stats():
+    """Get supervisor routing statistics (rule decisions vs. LLM fallbacks)"""
+    return router_stats.snapshot()
+
+@app.get("/api/stats/prompts")
+async def get_prompt_stats():
+    """Get LLM token usage, prompt-cache hits and template answers per agent"""
+    return prompt_stats.snapshot()
+
 # ============================================================================
 # RUN SERVER
 # ============================================================================
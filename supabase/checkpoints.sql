@@ -15,6 +15,18 @@ CREATE TABLE IF NOT EXISTS checkpoints (
     expires_at TIMESTAMP WITH TIME ZONE DEFAULT (NOW() + INTERVAL '24 hours')
 );
 
+-- Append-only log for growing state lists (messages, sentiment history).
+-- The checkpoints row holds the scalar state; new list items are appended
+-- here keyed by (thread_id, stream, seq) and reassembled on load.
+CREATE TABLE IF NOT EXISTS checkpoint_log (
+    thread_id TEXT NOT NULL,
+    stream TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    payload JSONB NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (thread_id, stream, seq)
+);
+
 -- Index for quick lookups by phone number
 CREATE INDEX IF NOT EXISTS idx_checkpoints_phone ON checkpoints(phone_number);
 
@@ -54,12 +66,60 @@ CREATE POLICY checkpoints_delete ON checkpoints
 CREATE POLICY service_role_all ON checkpoints
     FOR ALL TO service_role USING (true) WITH CHECK (true);
 
+ALTER TABLE checkpoint_log ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY checkpoint_log_service_role_all ON checkpoint_log
+    FOR ALL TO service_role USING (true) WITH CHECK (true);
+
+-- Save a checkpoint in one round-trip (SupabaseSaver.set).
+-- Upserts the row on thread_id and writes the given log items. p_log_lengths
+-- holds the stream lengths of this state: log rows beyond them belong to an
+-- earlier conversation on the same thread and are removed.
+CREATE OR REPLACE FUNCTION save_checkpoint(
+    p_thread_id TEXT,
+    p_state JSONB,
+    p_phone_number TEXT,
+    p_conversation_id TEXT,
+    p_expires_at TIMESTAMP WITH TIME ZONE,
+    p_log JSONB DEFAULT '[]'::jsonb,
+    p_log_lengths JSONB DEFAULT '{}'::jsonb
+)
+RETURNS VOID AS $$
+BEGIN
+    DELETE FROM checkpoint_log l
+    USING jsonb_each_text(p_log_lengths) AS len(stream, length)
+    WHERE l.thread_id = p_thread_id
+      AND l.stream = len.stream
+      AND l.seq >= len.length::INTEGER;
+
+    INSERT INTO checkpoint_log (thread_id, stream, seq, payload)
+    SELECT p_thread_id, entry->>'stream', (entry->>'seq')::INTEGER, entry->'payload'
+    FROM jsonb_array_elements(p_log) AS entry
+    ON CONFLICT (thread_id, stream, seq) DO UPDATE SET
+        payload = EXCLUDED.payload;
+
+    INSERT INTO checkpoints (thread_id, state, phone_number, conversation_id, expires_at)
+    VALUES (p_thread_id, p_state, p_phone_number, p_conversation_id, p_expires_at)
+    ON CONFLICT (thread_id) DO UPDATE SET
+        state = EXCLUDED.state,
+        phone_number = EXCLUDED.phone_number,
+        conversation_id = EXCLUDED.conversation_id,
+        expires_at = EXCLUDED.expires_at;
+END;
+$$ LANGUAGE plpgsql;
+
+REVOKE EXECUTE ON FUNCTION save_checkpoint FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION save_checkpoint TO service_role;
+
 -- Cleanup function for expired checkpoints
 CREATE OR REPLACE FUNCTION cleanup_expired_checkpoints()
 RETURNS INTEGER AS $$
 DECLARE
     deleted_count INTEGER;
 BEGIN
+    DELETE FROM checkpoint_log
+    WHERE thread_id IN (SELECT thread_id FROM checkpoints WHERE expires_at < NOW());
+
     DELETE FROM checkpoints
     WHERE expires_at < NOW();
 
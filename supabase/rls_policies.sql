@@ -15,6 +15,9 @@ CREATE POLICY service_role_all_leads ON leads
 CREATE POLICY service_role_all_appointments ON appointments
     FOR ALL TO service_role USING (true) WITH CHECK (true);
 
+CREATE POLICY service_role_all_booking_follow_ups ON booking_follow_ups
+    FOR ALL TO service_role USING (true) WITH CHECK (true);
+
 CREATE POLICY service_role_all_objections ON objections
     FOR ALL TO service_role USING (true) WITH CHECK (true);
 
@@ -136,6 +136,32 @@ CREATE INDEX idx_appointments_date ON appointments(appointment_date);
 CREATE INDEX idx_appointments_status ON appointments(status);
 CREATE INDEX idx_appointments_lead ON appointments(lead_id);
 
+-- ============================================================================
+-- BOOKING FOLLOW-UPS TABLE (failed background bookings for manual follow-up)
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS booking_follow_ups (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    booking_id TEXT NOT NULL,
+    conversation_id TEXT REFERENCES calls(conversation_id),
+    phone_number TEXT,
+
+    -- Requested appointment
+    name TEXT,
+    email TEXT,
+    requested_date TEXT,
+    requested_time TEXT,
+
+    -- Failure
+    error_code TEXT,
+    error_message TEXT,
+
+    -- Follow-up
+    resolved_at TIMESTAMP WITH TIME ZONE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX idx_booking_follow_ups_open ON booking_follow_ups(created_at) WHERE resolved_at IS NULL;
+
 -- ============================================================================
 -- OBJECTIONS TABLE
 -- ============================================================================
@@ -279,6 +305,7 @@ $$ LANGUAGE plpgsql;
 ALTER TABLE calls ENABLE ROW LEVEL SECURITY;
 ALTER TABLE leads ENABLE ROW LEVEL SECURITY;
 ALTER TABLE appointments ENABLE ROW LEVEL SECURITY;
+ALTER TABLE booking_follow_ups ENABLE ROW LEVEL SECURITY;
 ALTER TABLE objections ENABLE ROW LEVEL SECURITY;
 ALTER TABLE consent_logs ENABLE ROW LEVEL SECURITY;
 ALTER TABLE call_summaries ENABLE ROW LEVEL SECURITY;
@@ -0,0 +1,81 @@
+-- Dashboard aggregation functions for Everlast Voice Agent
+-- The /api/stats endpoints call these via RPC and receive only the aggregates;
+-- rescore_call_sentiment applies offline sentiment re-scoring in bulk
+
+-- ============================================================================
+-- CALL SUMMARY COLUMNS WRITTEN BY THE BACKEND (endCallSummary)
+-- ============================================================================
+ALTER TABLE call_summaries ADD COLUMN IF NOT EXISTS sentiment_start TEXT;
+ALTER TABLE call_summaries ADD COLUMN IF NOT EXISTS sentiment_end TEXT;
+ALTER TABLE call_summaries ADD COLUMN IF NOT EXISTS sentiment_trend TEXT;
+ALTER TABLE call_summaries ADD COLUMN IF NOT EXISTS guardrails_triggered BOOLEAN DEFAULT FALSE;
+ALTER TABLE call_summaries ADD COLUMN IF NOT EXISTS ended_at TIMESTAMP WITH TIME ZONE;
+
+-- Index-only counts and range scans for the dashboard
+CREATE INDEX IF NOT EXISTS idx_summaries_ended_at ON call_summaries(ended_at);
+CREATE INDEX IF NOT EXISTS idx_summaries_guardrails ON call_summaries(guardrails_triggered) WHERE guardrails_triggered;
+CREATE INDEX IF NOT EXISTS idx_objections_type_outcome ON objections(objection_type, outcome);
+
+-- ============================================================================
+-- AGGREGATES
+-- ============================================================================
+
+-- Calls per lead score
+CREATE OR REPLACE FUNCTION stats_lead_scores()
+RETURNS TABLE (lead_score TEXT, total BIGINT) AS $$
+    SELECT lead_score, COUNT(*)
+    FROM call_summaries
+    GROUP BY lead_score;
+$$ LANGUAGE sql STABLE;
+
+-- Objections per type and outcome
+CREATE OR REPLACE FUNCTION stats_objections()
+RETURNS TABLE (objection_type TEXT, outcome TEXT, total BIGINT) AS $$
+    SELECT COALESCE(objection_type, 'Andere'), COALESCE(outcome, 'Offen'), COUNT(*)
+    FROM objections
+    GROUP BY 1, 2;
+$$ LANGUAGE sql STABLE;
+
+-- Calls per final sentiment and sentiment trend since a point in time
+CREATE OR REPLACE FUNCTION stats_sentiment(p_since TIMESTAMP WITH TIME ZONE)
+RETURNS TABLE (sentiment_end TEXT, sentiment_trend TEXT, total BIGINT) AS $$
+    SELECT sentiment_end, sentiment_trend, COUNT(*)
+    FROM call_summaries
+    WHERE ended_at >= p_since
+    GROUP BY 1, 2;
+$$ LANGUAGE sql STABLE;
+
+-- ============================================================================
+-- BATCH RE-SCORING (python -m everlast_voice_agents.voice_rescoring)
+-- ============================================================================
+
+-- Set the sentiment columns of existing summaries from a JSON array of
+-- {conversation_id, sentiment_start, sentiment_end, sentiment_trend}; returns rows updated
+CREATE OR REPLACE FUNCTION rescore_call_sentiment(p_rows JSONB)
+RETURNS INTEGER AS $$
+    WITH updated AS (
+        UPDATE call_summaries AS s
+        SET sentiment_start = r.sentiment_start,
+            sentiment_end = r.sentiment_end,
+            sentiment_trend = r.sentiment_trend,
+            updated_at = NOW()
+        FROM jsonb_to_recordset(p_rows) AS r(
+            conversation_id TEXT,
+            sentiment_start TEXT,
+            sentiment_end TEXT,
+            sentiment_trend TEXT
+        )
+        WHERE s.conversation_id = r.conversation_id
+        RETURNING 1
+    )
+    SELECT COUNT(*)::INTEGER FROM updated;
+$$ LANGUAGE sql VOLATILE;
+
+REVOKE EXECUTE ON FUNCTION stats_lead_scores() FROM PUBLIC;
+REVOKE EXECUTE ON FUNCTION stats_objections() FROM PUBLIC;
+REVOKE EXECUTE ON FUNCTION stats_sentiment(TIMESTAMP WITH TIME ZONE) FROM PUBLIC;
+REVOKE EXECUTE ON FUNCTION rescore_call_sentiment(JSONB) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION stats_lead_scores() TO service_role;
+GRANT EXECUTE ON FUNCTION stats_objections() TO service_role;
+GRANT EXECUTE ON FUNCTION stats_sentiment(TIMESTAMP WITH TIME ZONE) TO service_role;
+GRANT EXECUTE ON FUNCTION rescore_call_sentiment(JSONB) TO service_role;
@@ -0,0 +1,243 @@
+"""
+Tests for CalendlyClient against a mocked Calendly API
+Run with: python -m pytest tests/test_calendly_client.py -v
+"""
+
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+
+# Add parent dir to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from calendly_client import CalendlyClient, CalendlyDeadlineExceeded, RateLimiter, parse_calendly_time
+
+USER_URI = "https://api.calendly.com/users/USER"
+EVENT_TYPE_URI = "https://api.calendly.com/event_types/DEMO"
+
+
+class FakeCalendly:
+    """Minimal Calendly API: records requests and serves canned responses"""
+
+    def __init__(self, scheduled_events: int = 0):
+        self.requests = []
+        self.scheduled_events = [
+            {"uri": f"https://api.calendly.com/scheduled_events/E{i}", "status": "active"}
+            for i in range(scheduled_events)
+        ]
+
+    @staticmethod
+    def available_times(start: datetime, end: datetime) -> list:
+        """Half-hour slots 08:00-16:00 UTC on every day in [start, end)"""
+        slots = []
+        day = start.replace(hour=0, minute=0, second=0, microsecond=0)
+        while day < end:
+            for minutes in range(8 * 60, 16 * 60, 30):
+                slot = day + timedelta(minutes=minutes)
+                if start <= slot < end:
+                    slots.append({
+                        "status": "available",
+                        "start_time": slot.strftime("%Y-%m-%dT%H:%M:%S.000000Z"),
+                        "end_time": (slot + timedelta(minutes=30)).strftime("%Y-%m-%dT%H:%M:%S.000000Z"),
+                    })
+            day += timedelta(days=1)
+        return slots
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if request.url.path == "/event_type_available_times":
+            start = parse_calendly_time(request.url.params["start_time"])
+            end = parse_calendly_time(request.url.params["end_time"])
+            return httpx.Response(200, json={"collection": self.available_times(start, end)})
+        if request.url.path == "/scheduled_events" and request.method == "POST":
+            return httpx.Response(201, json={"resource": {"uri": "https://api.calendly.com/scheduled_events/NEW"}})
+        if request.url.path == "/scheduled_events":
+            offset = int(request.url.params.get("page_token", 0))
+            count = int(request.url.params["count"])
+            next_offset = offset + count
+            return httpx.Response(200, json={
+                "collection": self.scheduled_events[offset:next_offset],
+                "pagination": {
+                    "next_page_token": str(next_offset) if next_offset < len(self.scheduled_events) else None
+                },
+            })
+        if request.url.path == "/event_types":
+            return httpx.Response(200, json={"collection": [
+                {"uri": EVENT_TYPE_URI, "name": "Demo", "duration": 30}
+            ]})
+        if request.url.path == "/users/me":
+            return httpx.Response(200, json={"resource": {"uri": USER_URI}})
+        return httpx.Response(404, json={})
+
+
+def make_client(api=None, **kwargs) -> CalendlyClient:
+    api = api or FakeCalendly()
+    return CalendlyClient(
+        api_key="test-key",
+        user_uri=USER_URI,
+        event_type_uri=EVENT_TYPE_URI,
+        transport=httpx.MockTransport(api),
+        **kwargs
+    )
+
+
+@pytest.mark.asyncio
+async def test_warm_up_fills_event_type_cache():
+    api = FakeCalendly()
+    client = make_client(api)
+
+    assert await client.warm_up() is True
+    event_types = await client.get_event_types()
+    await client.close()
+
+    assert [e.name for e in event_types] == ["Demo"]
+    # Served from the cache filled during warm-up
+    assert len(api.requests) == 1
+    stats = client.pool_stats()
+    assert stats["requests"] == 1
+    assert stats["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_availability_is_answered_from_the_cache():
+    api = FakeCalendly()
+    client = make_client(api, availability_window_days=14)
+    await client.availability.refresh(EVENT_TYPE_URI)
+    # 14 days need two 7-day requests
+    assert len(api.requests) == 2
+
+    slot = (datetime.now(timezone.utc) + timedelta(days=2)).replace(hour=9, minute=0, second=0, microsecond=0)
+    date, time = slot.strftime("%Y-%m-%d"), slot.strftime("%H:%M")
+
+    assert await client.check_slot_availability(EVENT_TYPE_URI, date, time, timezone="UTC") is True
+    assert await client.check_slot_availability(EVENT_TYPE_URI, date, "09:10", timezone="UTC") is False
+    assert len(api.requests) == 2
+
+    result = await client.book_appointment("Max Muster", "max@example.com", date, time, timezone="UTC")
+    assert result.success
+    # The booked slot is gone locally without another availability fetch
+    assert await client.check_slot_availability(EVENT_TYPE_URI, date, time, timezone="UTC") is False
+    assert [r.url.path for r in api.requests[2:]] == ["/scheduled_events"]
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_slots_outside_the_window_fall_back_to_the_api():
+    api = FakeCalendly()
+    client = make_client(api, availability_window_days=3)
+    await client.availability.refresh(EVENT_TYPE_URI)
+    requests_before = len(api.requests)
+
+    later = datetime.now(timezone.utc) + timedelta(days=10)
+    await client.check_slot_availability(EVENT_TYPE_URI, later.strftime("%Y-%m-%d"), "09:00", timezone="UTC")
+
+    assert len(api.requests) == requests_before + 1
+    assert client.availability.stats()["misses"] == 1
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_suggest_slots_prefers_distinct_days():
+    api = FakeCalendly()
+    client = make_client(api)
+
+    after = (datetime.now(timezone.utc) + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    afternoon = await client.suggest_slots("afternoon", after=after, n=3, timezone="UTC")
+    morning = await client.suggest_slots("morning", after=after, n=2, timezone="UTC", one_per_day=False)
+    await client.close()
+
+    assert [s.time for s in afternoon] == ["12:00", "12:00", "12:00"]
+    assert len({s.date for s in afternoon}) == 3
+    assert afternoon[0].label.endswith(f"{afternoon[0].start.strftime('%d.%m.')} um 12:00 Uhr")
+    assert [s.time for s in morning] == ["08:00", "08:30"]
+    # Loaded once, the second call is served from the cache
+    assert [r.url.path for r in api.requests] == ["/event_type_available_times"] * 2
+
+    with pytest.raises(ValueError):
+        await client.suggest_slots("evening")
+
+
+@pytest.mark.asyncio
+async def test_iter_scheduled_events_follows_page_tokens():
+    api = FakeCalendly(scheduled_events=250)
+    client = make_client(api)
+
+    uris = [event["uri"] async for event in client.iter_scheduled_events(page_size=100)]
+    first_page = await client.list_scheduled_events()
+
+    assert len(uris) == 250
+    assert uris[-1].endswith("/E249")
+    assert [r.url.params.get("page_token") for r in api.requests[:3]] == [None, "100", "200"]
+    assert len(first_page) == 20
+
+    # Stopping early does not fetch beyond the prefetched page
+    api.requests.clear()
+    async for _ in client.iter_scheduled_events(page_size=10):
+        break
+    assert len(api.requests) <= 2
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_collect_scheduled_events_caps_concurrency():
+    api = FakeCalendly(scheduled_events=40)
+    client = make_client(api)
+    running = 0
+    peak = 0
+
+    async def reconcile(event):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.001)
+        running -= 1
+        return event["uri"]
+
+    results = await client.collect_scheduled_events(reconcile, concurrency=4, page_size=15)
+    await client.close()
+
+    assert len(results) == 40
+    assert results[0].endswith("/E0")
+    assert peak == 4
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_queues_and_fails_fast():
+    limiter = RateLimiter(rate=100.0, burst=2)
+
+    await asyncio.gather(*(limiter.acquire() for _ in range(4)))
+    assert limiter.stats()["queued"] == 2
+
+    limiter.pause(30)
+    started = time.monotonic()
+    with pytest.raises(CalendlyDeadlineExceeded):
+        await limiter.acquire(deadline=time.monotonic() + 1)
+    assert time.monotonic() - started < 0.1
+    assert limiter.stats()["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_429_fails_fast_within_the_booking_deadline():
+    api = FakeCalendly()
+
+    def throttled(request):
+        api.requests.append(request)
+        return httpx.Response(429, headers={"Retry-After": "30"}, json={})
+
+    client = make_client(throttled)
+    started = time.monotonic()
+    result = await client.book_appointment("Max Muster", "max@example.com", "2030-01-07", "10:00", deadline=1.0)
+    elapsed = time.monotonic() - started
+    stats = client.pool_stats()
+    await client.close()
+
+    assert result.error_code == "DEADLINE_EXCEEDED"
+    assert elapsed < 0.5
+    assert len(api.requests) == 1
+    assert stats["deadline_exceeded"] == 1
+    assert stats["rate_limiter"]["throttled"] == 1
@@ -0,0 +1,101 @@
+"""
+Tests for the dashboard stats endpoints against a mocked PostgREST
+Run with: python -m pytest tests/test_dashboard_stats.py -v
+"""
+
+import os
+import sys
+
+import httpx
+import pytest
+
+# Add parent dir to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import asyncio
+
+from postgrest import AsyncPostgrestClient
+
+import main
+
+COUNTS = {"call_summaries": 200, "appointments": 50}
+AGGREGATES = {
+    "stats_lead_scores": [{"lead_score": "A", "total": 20}, {"lead_score": "C", "total": 180}],
+    "stats_objections": [
+        {"objection_type": "Preis", "outcome": "Überwunden", "total": 7},
+        {"objection_type": "Preis", "outcome": "Offen", "total": 3},
+        {"objection_type": "Zeit", "outcome": "Offen", "total": 5},
+    ],
+}
+
+
+class FakePostgrest:
+    """Answers HEAD count queries and stats_* RPCs, records every request"""
+
+    def __init__(self):
+        self.requests = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        name = request.url.path.rsplit("/", 1)[-1]
+        if request.method == "HEAD":
+            total = COUNTS[name] // 4 if "guardrails_triggered" in request.url.params else COUNTS[name]
+            return httpx.Response(200, headers={"Content-Range": f"*/{total}"})
+        return httpx.Response(200, json=AGGREGATES[name])
+
+
+@pytest.fixture
+def postgrest(monkeypatch):
+    api = FakePostgrest()
+    client = AsyncPostgrestClient(
+        "https://example.supabase.co/rest/v1",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(api))
+    )
+    monkeypatch.setattr(main, "supabase_async", client)
+    monkeypatch.setattr(main, "stats_cache", main.StatsCache(main.STATS_CACHE_TTLS))
+    return api
+
+
+@pytest.mark.asyncio
+async def test_conversion_uses_count_queries(postgrest):
+    stats = await main.get_conversion_stats()
+
+    assert stats == {"total_calls": 200, "booked_appointments": 50, "conversion_rate": 25.0}
+    # HEAD requests: no rows are transferred
+    assert [r.method for r in postgrest.requests] == ["HEAD", "HEAD"]
+
+
+@pytest.mark.asyncio
+async def test_grouped_stats_come_from_rpc(postgrest):
+    scores = await main.get_lead_score_distribution()
+    objections = await main.get_objection_stats()
+    guardrails = await main.get_guardrails_stats()
+
+    assert scores == {"A": 20, "B": 0, "C": 180, "N": 0}
+    assert objections["by_type"] == {"Preis": 10, "Zeit": 5}
+    assert objections["by_outcome"] == {"Überwunden": 7, "Nicht überwunden": 0, "Offen": 8}
+    assert objections["total"] == 15
+    assert guardrails == {"guardrails_triggered": 50, "total_calls": 200, "trigger_rate": 25.0}
+    assert [r.url.path for r in postgrest.requests[:2]] == ["/rest/v1/rpc/stats_lead_scores", "/rest/v1/rpc/stats_objections"]
+
+
+@pytest.mark.asyncio
+async def test_viewers_share_one_query_until_our_writes_land(postgrest):
+    main.stats_cache.min_ttl = 0  # fresh cache per test (see fixture)
+
+    results = await asyncio.gather(*(main.get_objection_stats() for _ in range(5)))
+    await main.get_objection_stats()
+    assert len(postgrest.requests) == 1
+    assert all(result == results[0] for result in results)
+
+    # A write to another table keeps the entry, a write to objections expires it
+    main.stats_cache.invalidate("consent_logs")
+    await main.get_objection_stats()
+    assert len(postgrest.requests) == 1
+    main.stats_cache.invalidate("objections")
+    await main.get_objection_stats()
+    assert len(postgrest.requests) == 2
+
+    stats = main.stats_cache.stats()
+    assert stats["misses"] == 2
+    assert stats["joined"] == 4
@@ -0,0 +1,259 @@
+"""
+Tests for the LangGraph agent execution modes
+Run with: python -m pytest tests/test_voice_agents.py -v
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import pytest
+
+os.environ.setdefault("ANTHROPIC_API_KEY", "test-key")
+os.environ.setdefault("DATABASE_PATH", os.path.join(tempfile.mkdtemp(), "checkpoints.db"))
+
+# Add parent dir to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from langchain_core.messages import AIMessage, HumanMessage
+from everlast_voice_agents import voice_agents
+from everlast_voice_agents.voice_state import create_initial_state
+
+
+class ScriptedLLM:
+    """Stand-in for ChatAnthropic that answers per agent system prompt"""
+
+    def __init__(self, replies, delay: float = 0.0):
+        self.replies = replies
+        self.delay = delay
+        self.calls = 0
+
+    def _reply(self, messages) -> AIMessage:
+        self.calls += 1
+        system_prompt = messages[0].text
+        for prompt, reply in self.replies.items():
+            # The agent prompt follows the shared context block
+            if prompt in system_prompt:
+                return AIMessage(content=reply)
+        return AIMessage(content="")
+
+    def invoke(self, messages):
+        time.sleep(self.delay)
+        return self._reply(messages)
+
+    async def ainvoke(self, messages):
+        await asyncio.sleep(self.delay)
+        return self._reply(messages)
+
+
+# Supervisor → bant_qualifier → (goodbye phrase) → dsgvo_logger → END
+SCRIPT = {
+    voice_agents.SUPERVISOR_PROMPT: "bant_qualifier",
+    voice_agents.BANT_PROMPT: "Vielen Dank, bis bald!",
+    voice_agents.DSGVO_PROMPT: "Ist die Aufzeichnung in Ordnung?"
+}
+
+
+def _state(message: str = "Ja, wir haben Budget eingeplant"):
+    state = create_initial_state(conversation_id="conv-1", phone_number="+49123456789")
+    state["messages"] = [HumanMessage(content=message)]
+    return state
+
+
+@pytest.fixture(autouse=True)
+def llm_routing(monkeypatch):
+    """Execution-mode tests exercise the LLM supervisor path"""
+    monkeypatch.setattr(voice_agents, "ROUTER_MODE", "llm")
+
+
+@pytest.fixture
+def scripted_llm(monkeypatch):
+    llm = ScriptedLLM(SCRIPT)
+    monkeypatch.setattr(voice_agents, "llm", llm)
+    return llm
+
+
+def test_sync_graph_runs_all_nodes(scripted_llm):
+    """Legacy sync path still produces the full turn"""
+    result = voice_agents.graph.invoke(_state())
+
+    assert result["current_agent"] == "bant_qualifier"
+    assert result["bant"].budget == "Ja"
+    assert result["call_started"] is True
+    assert scripted_llm.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_async_graph_matches_sync(scripted_llm):
+    """Async nodes produce the same state as the sync nodes"""
+    result = await voice_agents.async_graph.ainvoke(_state())
+
+    assert result["current_agent"] == "bant_qualifier"
+    assert result["bant"].budget == "Ja"
+    assert result["call_started"] is True
+    assert [m.content for m in result["messages"][1:]] == [
+        "[SUPERVISOR → bant_qualifier]",
+        "Vielen Dank, bis bald!",
+        "Ist die Aufzeichnung in Ordnung?"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_async_mode_serves_calls_concurrently(monkeypatch):
+    """Concurrent turns overlap their LLM waits instead of queueing"""
+    monkeypatch.setattr(voice_agents, "llm", ScriptedLLM(SCRIPT, delay=0.1))
+    monkeypatch.setattr(voice_agents, "AGENT_EXECUTION_MODE", "async")
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(voice_agents.run_graph(_state()) for _ in range(10)))
+    elapsed = time.perf_counter() - started
+
+    assert len(results) == 10
+    # 10 calls x 3 LLM round-trips x 0.1s would take 3s if serialized
+    assert elapsed < 1.0
+
+
+@pytest.mark.asyncio
+async def test_turn_scope_stops_after_specialist_reply(monkeypatch):
+    """Turn scope runs supervisor + one specialist, then ends the graph"""
+    llm = ScriptedLLM({**SCRIPT, voice_agents.BANT_PROMPT: "Wann möchten Sie starten?"})
+    monkeypatch.setattr(voice_agents, "llm", llm)
+    monkeypatch.setattr(voice_agents, "AGENT_EXECUTION_SCOPE", "turn")
+
+    result = await voice_agents.run_graph(_state())
+
+    assert result["turn_node_count"] == 2
+    assert result["messages"][-1].content == "Wann möchten Sie starten?"
+    assert llm.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_loop_scope_respects_node_budget(monkeypatch):
+    """Legacy loop scope is cut off by MAX_TURN_NODES"""
+    llm = ScriptedLLM({**SCRIPT, voice_agents.BANT_PROMPT: "Wann möchten Sie starten?"})
+    monkeypatch.setattr(voice_agents, "llm", llm)
+    monkeypatch.setattr(voice_agents, "AGENT_EXECUTION_SCOPE", "loop")
+    monkeypatch.setattr(voice_agents, "MAX_TURN_NODES", 5)
+
+    result = await voice_agents.run_graph(_state())
+
+    assert result["turn_node_count"] == 4
+    assert llm.calls == 4
+
+
+@pytest.mark.asyncio
+async def test_loop_scope_skips_hop_that_does_not_fit_budget(monkeypatch):
+    """With one node left after the specialist, no second supervisor hop starts"""
+    llm = ScriptedLLM({**SCRIPT, voice_agents.BANT_PROMPT: "Wann möchten Sie starten?"})
+    monkeypatch.setattr(voice_agents, "llm", llm)
+    monkeypatch.setattr(voice_agents, "AGENT_EXECUTION_SCOPE", "loop")
+    monkeypatch.setattr(voice_agents, "MAX_TURN_NODES", 3)
+
+    result = await voice_agents.run_graph(_state())
+
+    assert result["turn_node_count"] == 2
+    assert result["messages"][-1].content == "Wann möchten Sie starten?"
+    assert llm.calls == 2
+
+
+def test_node_budget_below_two_is_rejected():
+    env = {**os.environ, "MAX_TURN_NODES": "1"}
+    check = subprocess.run(
+        [sys.executable, "-c", "import everlast_voice_agents.voice_agents"],
+        cwd=os.path.join(os.path.dirname(__file__), '..'),
+        env=env,
+        capture_output=True,
+        text=True
+    )
+    assert check.returncode != 0
+    assert "MAX_TURN_NODES must be at least 2" in check.stderr
+
+
+@pytest.mark.asyncio
+async def test_hybrid_router_skips_supervisor_llm(monkeypatch):
+    """A confident rule decision routes without a supervisor LLM call"""
+    llm = ScriptedLLM({**SCRIPT, voice_agents.BANT_PROMPT: "Wann möchten Sie starten?"})
+    monkeypatch.setattr(voice_agents, "llm", llm)
+    monkeypatch.setattr(voice_agents, "ROUTER_MODE", "hybrid")
+    voice_agents.router_stats.reset()
+
+    state = _state()
+    state["call_started"] = True
+    result = await voice_agents.run_graph(state)
+
+    assert result["current_agent"] == "bant_qualifier"
+    assert llm.calls == 1
+    assert voice_agents.router_stats.snapshot()["rule_decisions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_booker_offers_provider_slots(monkeypatch):
+    """Free slots from the registered provider are injected into the booker prompt"""
+    prompts = []
+
+    class RecordingLLM(ScriptedLLM):
+        async def ainvoke(self, messages):
+            prompts.append(messages[0].text)
+            return await super().ainvoke(messages)
+
+    preferences = []
+
+    async def provider(preference):
+        preferences.append(preference)
+        return ["Dienstag, 14.05. um 14:00 Uhr"]
+
+    monkeypatch.setattr(voice_agents, "llm", RecordingLLM({voice_agents.CALENDLY_PROMPT: "Passt Dienstag?"}))
+    monkeypatch.setattr(voice_agents, "slot_provider", None)
+    voice_agents.register_slot_provider(provider)
+
+    await voice_agents.acalendly_booker_agent(_state("Am liebsten nachmittags"))
+
+    assert preferences == ["afternoon"]
+    assert "Dienstag, 14.05. um 14:00 Uhr" in prompts[0]
+
+
+@pytest.mark.asyncio
+async def test_slow_slot_provider_is_skipped(monkeypatch):
+    async def provider(preference):
+        await asyncio.sleep(1)
+        return ["Montag, 13.05. um 09:00 Uhr"]
+
+    monkeypatch.setattr(voice_agents, "llm", ScriptedLLM({voice_agents.CALENDLY_PROMPT: "Wann passt es Ihnen?"}))
+    monkeypatch.setattr(voice_agents, "slot_provider", provider)
+    monkeypatch.setattr(voice_agents, "SLOT_SUGGESTION_TIMEOUT", 0.01)
+
+    result = await voice_agents.acalendly_booker_agent(_state("Gerne einen Termin"))
+
+    assert result["messages"][0].content == "Wann passt es Ihnen?"
+
+
+@pytest.mark.asyncio
+async def test_returning_caller_starts_a_new_call(monkeypatch):
+    """A new conversation id on a known number marks where the new call begins"""
+    saved = {}
+
+    class Checkpoints:
+        async def get(self, thread_id):
+            state = _state("Das ist uns zu teuer")
+            state["call_ended"] = True
+            return state
+
+        async def set(self, thread_id, state):
+            saved[thread_id] = state
+
+    async def run_graph(state):
+        return state
+
+    monkeypatch.setattr(voice_agents, "checkpointer", Checkpoints())
+    monkeypatch.setattr(voice_agents, "run_graph", run_graph)
+
+    result = await voice_agents.process_message("conv-2", "+49123456789", "Hallo, ich bin es wieder")
+
+    assert result["conversation_id"] == "conv-2"
+    assert result["call_message_offset"] == 1
+    assert result["call_ended"] is False
+    assert [m.content for m in result["messages"][result["call_message_offset"]:]] == ["Hallo, ich bin es wieder"]
+    assert saved["+49123456789"] is result
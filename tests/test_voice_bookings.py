@@ -0,0 +1,108 @@
+"""
+Tests for deferred bookings
+Run with: python -m pytest tests/test_voice_bookings.py -v
+"""
+
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+# Add parent dir to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from everlast_voice_agents.voice_bookings import DeferredBookings
+
+
+def booking(delay: float, success: bool = True):
+    async def book():
+        await asyncio.sleep(delay)
+        return {"success": success, "error_code": None if success else "API_ERROR"}
+    return book
+
+
+@pytest.mark.asyncio
+async def test_fast_booking_is_answered_directly():
+    finished = []
+
+    async def on_complete(ticket):
+        finished.append(ticket.booking_id)
+
+    bookings = DeferredBookings(on_complete=on_complete, latency_budget=0.5)
+    ticket = await bookings.submit("conv-1", booking(0.0))
+
+    assert ticket.done
+    assert ticket.status == "confirmed"
+    assert finished == [ticket.booking_id]
+    assert bookings.stats()["deferred"] == 0
+
+
+@pytest.mark.asyncio
+async def test_slow_booking_completes_in_background():
+    finished = []
+
+    async def on_complete(ticket):
+        finished.append(ticket.status)
+
+    bookings = DeferredBookings(on_complete=on_complete, latency_budget=0.01)
+    ticket = await bookings.submit("conv-1", booking(0.05, success=False), context={"phone_number": "+49123"})
+
+    assert ticket.status == "pending"
+    assert bookings.for_conversation("conv-1")[0] is ticket
+
+    await bookings.close()
+
+    assert bookings.get(ticket.booking_id).status == "failed"
+    assert finished == ["failed"]
+    assert bookings.stats()["deferred"] == 1
+
+
+@pytest.mark.asyncio
+async def test_booking_exception_is_recorded_as_failure():
+    async def book():
+        raise RuntimeError("calendly down")
+
+    bookings = DeferredBookings(latency_budget=0.5)
+    ticket = await bookings.submit("conv-2", book)
+
+    assert ticket.status == "failed"
+    assert ticket.result["error_code"] == "CLIENT_ERROR"
+
+
+@pytest.mark.asyncio
+async def test_wait_for_result_ignores_latency_budget():
+    bookings = DeferredBookings(latency_budget=0.01)
+    ticket = await bookings.submit("conv-3", booking(0.05), wait_for_result=True)
+
+    assert ticket.status == "confirmed"
+    assert bookings.stats()["deferred"] == 0
+
+
+@pytest.mark.asyncio
+async def test_sync_booking_mode_waits_for_slow_calendly(monkeypatch):
+    os.environ.setdefault("ANTHROPIC_API_KEY", "test-key")
+    import main
+
+    deadlines = []
+
+    async def slow_booking(data, deadline=None):
+        deadlines.append(deadline)
+        await asyncio.sleep(0.05)
+        return {"success": True, "event_id": "evt-1"}
+
+    monkeypatch.setenv("CALENDLY_BOOKING_DEADLINE", "4")
+    monkeypatch.setattr(main, "BOOKING_MODE", "sync")
+    monkeypatch.setattr(main, "bookings", DeferredBookings(latency_budget=0.01))
+    monkeypatch.setattr(main, "book_calendly_appointment", slow_booking)
+
+    response = await main.execute_function_call(
+        {"name": "bookAppointment", "parameters": {"name": "Max", "email": "max@example.com", "date": "2026-11-02", "time": "10:00"}},
+        "conv-4",
+        "+49123456789"
+    )
+
+    body = json.loads(response.body)
+    assert body["status"] == "appointment_booked"
+    assert deadlines == [4.0]
@@ -0,0 +1,253 @@
+"""
+Tests for checkpointers and the in-process checkpoint cache
+Run with: python -m pytest tests/test_voice_checkpointer.py -v
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+
+import pytest
+
+# Add parent dir to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from everlast_voice_agents.voice_checkpointer import BaseCheckpointer, CachedCheckpointer, SqliteSaver
+from everlast_voice_agents.voice_state import SENTIMENT_HISTORY_WINDOW, SentimentState
+
+
+class MemoryBackend(BaseCheckpointer):
+    """Dict-backed checkpointer that counts backend round-trips"""
+
+    def __init__(self, delay: float = 0.0):
+        self.data = {}
+        self.delay = delay
+        self.gets = 0
+        self.sets = 0
+
+    async def get(self, thread_id):
+        self.gets += 1
+        await asyncio.sleep(self.delay)
+        return self.data.get(thread_id)
+
+    async def set(self, thread_id, state):
+        self.sets += 1
+        await asyncio.sleep(self.delay)
+        self.data[thread_id] = dict(state)
+
+    async def delete(self, thread_id):
+        self.data.pop(thread_id, None)
+
+    async def list_threads(self, limit=100):
+        return list(self.data)[:limit]
+
+
+@pytest.mark.asyncio
+async def test_mid_call_turns_hit_memory():
+    backend = MemoryBackend()
+    cache = CachedCheckpointer(backend)
+
+    await cache.set("+49123", {"messages": ["Hallo"]})
+    for _ in range(5):
+        state = await cache.get("+49123")
+
+    assert state == {"messages": ["Hallo"]}
+    assert backend.gets == 0
+    assert cache.stats()["hits"] == 5
+
+
+@pytest.mark.asyncio
+async def test_cached_state_is_isolated_from_caller_mutations():
+    backend = MemoryBackend()
+    cache = CachedCheckpointer(backend)
+    state = {"caller_sentiment": SentimentState(), "objections": [], "messages": ["Hallo"]}
+    await cache.set("+49123", state)
+
+    # Mutations after set() and on a returned state (e.g. a turn that fails later)
+    state["caller_sentiment"].current_sentiment = "frustriert"
+    turn = await cache.get("+49123")
+    turn["caller_sentiment"].current_sentiment = "begeistert"
+    turn["objections"].append("Preis")
+    turn["messages"].append("Zu teuer")
+
+    reread = await cache.get("+49123")
+    assert reread["caller_sentiment"].current_sentiment == "neutral"
+    assert reread["objections"] == [] and reread["messages"] == ["Hallo"]
+    assert backend.gets == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_loads_are_coalesced():
+    backend = MemoryBackend(delay=0.05)
+    backend.data["+49123"] = {"lead_score": "A"}
+    cache = CachedCheckpointer(backend)
+
+    results = await asyncio.gather(*(cache.get("+49123") for _ in range(10)))
+
+    assert all(r == {"lead_score": "A"} for r in results)
+    assert backend.gets == 1
+    assert cache.stats()["coalesced_loads"] == 9
+
+
+@pytest.mark.asyncio
+async def test_lru_and_idle_ttl_eviction():
+    backend = MemoryBackend()
+    cache = CachedCheckpointer(backend, max_entries=2, ttl_seconds=0.05)
+
+    await cache.set("a", {"n": 1})
+    await cache.set("b", {"n": 2})
+    await cache.set("c", {"n": 3})  # evicts "a"
+    assert await cache.get("a") == {"n": 1}
+    assert backend.gets == 1
+
+    await asyncio.sleep(0.06)  # everything idles out
+    assert await cache.get("c") == {"n": 3}
+    assert backend.gets == 2
+
+
+@pytest.mark.asyncio
+async def test_write_behind_coalesces_and_flushes():
+    backend = MemoryBackend(delay=0.01)
+    cache = CachedCheckpointer(backend, write_behind=True)
+
+    for turn in range(5):
+        await cache.set("+49123", {"turn": turn})
+    assert await cache.get("+49123") == {"turn": 4}
+
+    await cache.close()
+    assert backend.data["+49123"] == {"turn": 4}
+    assert backend.sets < 5
+
+
+@pytest.mark.asyncio
+async def test_sqlite_appends_only_new_log_items(tmp_path):
+    saver = SqliteSaver(str(tmp_path / "checkpoints.db"))
+    state = {
+        "phone_number": "+49123",
+        "lead_score": None,
+        "messages": [],
+        "caller_sentiment": {"current_sentiment": "neutral", "history": []}
+    }
+
+    for turn in range(3):
+        state["messages"] = state["messages"] + [f"Nachricht {turn}"]
+        state["caller_sentiment"]["history"].append({"sentiment": "neutral", "score": 0.0})
+        await saver.set("+49123", state)
+
+    with sqlite3.connect(saver.db_path) as conn:
+        row = conn.execute("SELECT state FROM checkpoints").fetchone()
+        log_count = conn.execute("SELECT COUNT(*) FROM checkpoint_log").fetchone()[0]
+    assert "messages" not in json.loads(row[0])
+    assert log_count == 6  # 3 messages + 3 sentiment events, each written once
+
+    fresh = SqliteSaver(saver.db_path)
+    loaded = await fresh.get("+49123")
+    assert loaded["messages"] == ["Nachricht 0", "Nachricht 1", "Nachricht 2"]
+    assert len(loaded["caller_sentiment"]["history"]) == 3
+    assert "_log" not in loaded
+    await saver.close()
+    await fresh.close()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_resets_log_for_new_conversation(tmp_path):
+    saver = SqliteSaver(str(tmp_path / "checkpoints.db"))
+    await saver.set("+49123", {"messages": ["a", "b", "c"]})
+    await saver.set("+49123", {"messages": ["neu"]})
+    await saver.close()
+
+    fresh = SqliteSaver(saver.db_path)
+    loaded = await fresh.get("+49123")
+    await fresh.close()
+    assert loaded["messages"] == ["neu"]
+
+
+@pytest.mark.asyncio
+async def test_sqlite_logs_every_update_of_a_bounded_sentiment_history(tmp_path):
+    saver = SqliteSaver(str(tmp_path / "checkpoints.db"))
+    sentiment = SentimentState()
+    turns = SENTIMENT_HISTORY_WINDOW + 5
+
+    for turn in range(turns):
+        sentiment.update("neutral", turn / 100, 0.5)
+        await saver.set("+49123", {"messages": [], "caller_sentiment": sentiment})
+    await saver.close()
+
+    with sqlite3.connect(saver.db_path) as conn:
+        seqs = [row[0] for row in conn.execute("SELECT seq FROM checkpoint_log WHERE stream = 'sentiment' ORDER BY seq")]
+    assert seqs == list(range(turns))
+
+    fresh = SqliteSaver(saver.db_path)
+    loaded = (await fresh.get("+49123"))["caller_sentiment"]
+    await fresh.close()
+    assert loaded.update_count == turns
+    assert loaded.history == sentiment.history
+    assert loaded.first_score == 0.0
+
+
+@pytest.mark.asyncio
+async def test_sqlite_groups_concurrent_writes(tmp_path):
+    saver = SqliteSaver(str(tmp_path / "checkpoints.db"))
+    await saver.connect()
+
+    await asyncio.gather(*(
+        saver.set(f"+49{i}", {"messages": [f"Hallo {i}"]}) for i in range(20)
+    ))
+
+    stats = saver.stats()
+    assert stats["writes"] == 20
+    assert stats["write_batches"] < 20
+    assert len(await saver.list_threads()) == 20
+    await saver.close()
+
+    with sqlite3.connect(saver.db_path) as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+@pytest.mark.asyncio
+async def test_sqlite_without_aiosqlite_uses_worker_threads(tmp_path, monkeypatch):
+    from everlast_voice_agents import voice_checkpointer
+    monkeypatch.setattr(voice_checkpointer, "ASYNC_SQLITE_AVAILABLE", False)
+
+    saver = SqliteSaver(str(tmp_path / "checkpoints.db"))
+    await saver.set("+49123", {"messages": ["a"]})
+    await saver.delete("+49123")
+    await saver.set("+49456", {"messages": ["b"]})
+
+    assert await saver.get("+49123") is None
+    assert (await saver.get("+49456"))["messages"] == ["b"]
+    await saver.close()
+
+
+@pytest.mark.asyncio
+async def test_supabase_write_is_one_rpc_request():
+    from everlast_voice_agents.voice_checkpointer import SupabaseSaver
+    import httpx
+
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(204)
+
+    saver = SupabaseSaver("https://example.supabase.co", "service-key")
+    await saver.client.aclose()
+    saver.client.session = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    state = {"phone_number": "+49123", "conversation_id": "conv-1", "messages": ["a", "b"]}
+    await saver.set("+49123", state)
+    state["messages"] = state["messages"] + ["c"]
+    await saver.set("+49123", state)
+    await saver.close()
+
+    assert [r.url.path for r in requests] == ["/rest/v1/rpc/save_checkpoint"] * 2
+    first, second = (json.loads(r.content) for r in requests)
+    assert first["p_phone_number"] == "+49123"
+    assert first["p_conversation_id"] == "conv-1"
+    assert first["p_expires_at"]
+    assert [entry["payload"] for entry in first["p_log"]] == ["a", "b"]
+    # Second write only carries the new message
+    assert [entry["payload"] for entry in second["p_log"]] == ["c"]
+    assert second["p_log_lengths"] == {"messages": 3}
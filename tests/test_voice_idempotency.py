@@ -0,0 +1,121 @@
+"""
+Tests for idempotent tool calls
+Run with: python -m pytest tests/test_voice_idempotency.py -v
+"""
+
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+# Add parent dir to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from everlast_voice_agents.voice_idempotency import IdempotencyCache, idempotency_key
+
+
+def test_key_prefers_call_id_and_ignores_parameter_order():
+    assert idempotency_key("conv-1", "bookAppointment", {"a": 1}, call_id="call-9") == "bookAppointment:call-9"
+    assert idempotency_key("conv-1", "qualifyLead", {"budget": "Ja", "need": "Hoch"}) == \
+        idempotency_key("conv-1", "qualifyLead", {"need": "Hoch", "budget": "Ja"})
+    assert idempotency_key("conv-1", "qualifyLead", {"budget": "Ja"}) != \
+        idempotency_key("conv-2", "qualifyLead", {"budget": "Ja"})
+
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicates_share_one_execution():
+    cache = IdempotencyCache()
+    calls = 0
+
+    async def book():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.02)
+        return {"status": "appointment_booked"}
+
+    results = await asyncio.gather(*(cache.run("k", book) for _ in range(3)))
+    replay, duplicate = await cache.run("k", book)
+
+    assert calls == 1
+    assert [dup for _, dup in results].count(False) == 1
+    assert duplicate is True
+    assert replay == {"status": "appointment_booked"}
+    assert cache.stats()["joined"] == 2
+    assert cache.stats()["replayed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failures_and_expired_entries_run_again():
+    cache = IdempotencyCache(ttl_seconds=0.01)
+    attempts = 0
+
+    async def flaky():
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise ConnectionError("supabase unavailable")
+        return attempts
+
+    with pytest.raises(ConnectionError):
+        await cache.run("k", flaky)
+    assert await cache.run("k", flaky) == (2, False)
+
+    await asyncio.sleep(0.02)
+    assert await cache.run("k", flaky) == (3, False)
+
+
+@pytest.mark.asyncio
+async def test_uncacheable_results_run_again():
+    cache = IdempotencyCache()
+    attempts = 0
+
+    async def book():
+        nonlocal attempts
+        attempts += 1
+        return {"status": "booking_failed" if attempts == 1 else "appointment_booked"}
+
+    def cacheable(result):
+        return result["status"] != "booking_failed"
+
+    assert await cache.run("k", book, cacheable) == ({"status": "booking_failed"}, False)
+    assert await cache.run("k", book, cacheable) == ({"status": "appointment_booked"}, False)
+    assert await cache.run("k", book, cacheable) == ({"status": "appointment_booked"}, True)
+    assert attempts == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_booking_with_temporary_error_is_retried(monkeypatch):
+    os.environ.setdefault("ANTHROPIC_API_KEY", "test-key")
+    import main
+    from everlast_voice_agents.voice_bookings import DeferredBookings
+
+    outcomes = [
+        {"success": False, "error_code": "DEADLINE_EXCEEDED"},
+        {"success": False, "error_code": "DOUBLE_BOOKING"},
+    ]
+    calls = 0
+
+    async def booking(data, deadline=None):
+        nonlocal calls
+        calls += 1
+        return outcomes[calls - 1]
+
+    monkeypatch.setattr(main, "BOOKING_MODE", "sync")
+    monkeypatch.setattr(main, "bookings", DeferredBookings())
+    monkeypatch.setattr(main, "book_calendly_appointment", booking)
+    monkeypatch.setattr(main, "tool_calls", IdempotencyCache())
+    monkeypatch.setattr(main, "save_to_supabase", lambda table, data: None)
+
+    function_call = {
+        "name": "bookAppointment",
+        "parameters": {"name": "Max", "email": "max@example.com", "date": "2026-11-02", "time": "10:00"}
+    }
+    responses = [await main.handle_function_call(function_call, "conv-5", "+49123456789") for _ in range(3)]
+    codes = [json.loads(r.body)["details"]["error_code"] for r in responses]
+
+    # Timeout runs again, the permanent DOUBLE_BOOKING answer is replayed
+    assert calls == 2
+    assert codes == ["DEADLINE_EXCEEDED", "DOUBLE_BOOKING", "DOUBLE_BOOKING"]
+    assert responses[2].headers.get("X-Idempotent-Replay") == "true"
@@ -0,0 +1,196 @@
+"""
+Tests for the config-driven objection classifier
+Run with: python -m pytest tests/test_voice_objections.py -v
+"""
+
+import os
+import sys
+
+import pytest
+
+os.environ.setdefault("ANTHROPIC_API_KEY", "test-key")
+
+# Add parent dir to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from langchain_core.messages import AIMessage, HumanMessage
+from everlast_voice_agents import voice_agents
+from everlast_voice_agents.voice_config import ReloadingConfig
+from everlast_voice_agents.voice_objections import (
+    DEFAULT_OBJECTIONS,
+    OBJECTION_TYPES,
+    ObjectionClassifier,
+    classify_objection,
+    load_objection_classifier,
+    render_template,
+    template_response,
+)
+from everlast_voice_agents.voice_prompts import prompt_stats
+from everlast_voice_agents.voice_state import CompanyInfo, ObjectionRecord, SentimentState, create_initial_state
+
+
+def test_config_patterns_map_to_canonical_types():
+    classifier = load_objection_classifier()
+
+    assert classifier.classify("Das ist uns zu teuer.").type == "Preis"
+    assert classifier.classify("Ich muss das mit meinem Chef abstimmen").type == "Nicht-Entscheider"
+    assert classifier.classify("Wir nutzen bereits ChatGPT").type == "Bereits-Lösung"
+    assert all(entry["type"] in OBJECTION_TYPES for entry in classifier.entries.values())
+
+    unknown = classifier.classify("Wie funktioniert die CRM-Anbindung?")
+    assert unknown.type == "Andere" and unknown.confidence == 0.0 and unknown.key is None
+
+
+def test_qualification_answers_are_no_objection():
+    classifier = load_objection_classifier()
+
+    for text in [
+        "Ja, wir haben Budget eingeplant.",
+        "Ich bin der Chef hier, ich entscheide.",
+        "Später im Jahr wollen wir starten.",
+        "Wir haben bereits 50 Mitarbeiter.",
+        "Das muss ich nicht abstimmen, das entscheide ich.",
+        "Geld ist vorhanden, die Kosten sind eingeplant.",
+        "Was würde das ungefähr kosten?",
+    ]:
+        assert classifier.classify(text).type == "Andere", text
+
+    # Same for the built-in defaults
+    defaults = ObjectionClassifier(DEFAULT_OBJECTIONS)
+    assert defaults.classify("Ja, wir haben Budget eingeplant.").type == "Andere"
+    assert defaults.classify("Ich bin der Chef hier.").type == "Andere"
+
+
+def test_whole_words_and_confidence():
+    classifier = ObjectionClassifier({
+        "preis": {"type": "Preis", "patterns": ["teuer", "kein budget", "kein geld"]},
+        "nicht_entscheider": {"type": "Nicht-Entscheider", "patterns": ["chef", "gf"]},
+        "zeit": {"type": "Zeit", "patterns": ["keine zeit"]},
+    })
+
+    # "gf" inside a word and "chef" in "Chefarzt" are no hits
+    assert classifier.classify("Begfried ist Chefarzt").type == "Andere"
+    assert classifier.classify("Keine, Zeit!").type == "Zeit"
+
+    single = classifier.classify("Zu teuer")
+    double = classifier.classify("Teuer, kein Budget, kein Geld")
+    mixed = classifier.classify("Teuer, und mein Chef entscheidet")
+    assert single.confidence == 0.6
+    assert double.confidence == 1.0 and double.patterns == ["teuer", "kein budget", "kein geld"]
+    # Tie goes to the entry listed first, with lower confidence
+    assert mixed.type == "Preis" and mixed.confidence == 0.3
+
+
+def test_unknown_type_is_rejected():
+    with pytest.raises(ValueError):
+        ObjectionClassifier({"preis": {"type": "Budget", "patterns": ["teuer"]}})
+
+
+def test_hot_reload_keeps_last_good_config(tmp_path):
+    config = tmp_path / "config.yaml"
+    config.write_text("objections:\n  zeit:\n    type: Zeit\n    patterns: [stress]\n", encoding="utf-8")
+    reloading = ReloadingConfig(load_objection_classifier, path=str(config), check_interval=0)
+
+    assert reloading.get().classify("Zu viel Stress").type == "Zeit"
+
+    config.write_text("objections:\n  preis:\n    type: Preis\n    patterns: [stress]\n", encoding="utf-8")
+    os.utime(config, (1, 1))
+    assert reloading.get().classify("Zu viel Stress").type == "Preis"
+    assert reloading.reloads == 1
+
+    config.write_text("objections: [unclosed\n", encoding="utf-8")
+    os.utime(config, (2, 2))
+    assert reloading.get().classify("Zu viel Stress").type == "Preis"
+
+    with pytest.raises(Exception):
+        reloading.reload()
+
+
+def test_render_template_fills_company_info():
+    company = CompanyInfo(name="Müller GmbH", current_tools="ChatGPT")
+
+    assert render_template('"Für {company}:\n  kurz  gesagt"\n', company) == "Für Müller GmbH: kurz gesagt"
+    assert render_template("Mit {current_tools} zufrieden?", company) == "Mit ChatGPT zufrieden?"
+    # Unknown value, unknown placeholder or stray braces: let the LLM answer
+    assert render_template("Im Bereich {industry}", company) is None
+    assert render_template("Hallo {name}", company) is None
+    assert render_template("Preis {", company) is None
+
+
+def test_template_response_then_fallback():
+    match = classify_objection("Das ist uns zu teuer")
+    company = CompanyInfo()
+
+    first = template_response(match, company)
+    assert first.startswith("Ich verstehe, dass Budget") and '"' not in first
+    assert template_response(match, company, previous=1).startswith("Wir haben auch flexible Modelle")
+    assert template_response(match, company, previous=2) is None
+    assert template_response(classify_objection("Wie läuft die Anbindung?"), company) is None
+
+
+class CountingLLM:
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, messages):
+        self.calls += 1
+        return AIMessage(content="Verstehe ich. Was wäre Ihnen die Zeitersparnis wert?")
+
+
+def _objection_state(message: str):
+    state = create_initial_state(conversation_id="conv-1", phone_number="+49123456789")
+    state["messages"] = [HumanMessage(content=message)]
+    return state
+
+
+def test_objection_handler_answers_from_template(monkeypatch):
+    llm = CountingLLM()
+    monkeypatch.setattr(voice_agents, "llm", llm)
+    prompt_stats.reset()
+
+    result = voice_agents.objection_handler_agent(_objection_state("Ehrlich gesagt ist uns das zu teuer."))
+
+    assert llm.calls == 0
+    assert result["objections"][-1].type == "Preis"
+    assert result["messages"][-1].content.startswith("Ich verstehe, dass Budget")
+    assert prompt_stats.snapshot()["by_agent"]["objection_handler"]["template_responses"] == 1
+
+
+def test_objection_handler_uses_llm_when_unsure_or_frustrated(monkeypatch):
+    llm = CountingLLM()
+    monkeypatch.setattr(voice_agents, "llm", llm)
+
+    # No clear type
+    voice_agents.objection_handler_agent(_objection_state("Das klingt alles ziemlich kompliziert."))
+    # Frustrated caller
+    state = _objection_state("Zu teuer, das sagte ich doch schon!")
+    state["caller_sentiment"] = SentimentState(current_sentiment="frustriert", sentiment_score=-0.7)
+    voice_agents.objection_handler_agent(state)
+    # Response and fallback for this type already given
+    state = _objection_state("Immer noch zu teuer.")
+    state["objections"] = [ObjectionRecord(type="Preis", text="zu teuer", response_given="...")] * 2
+    result = voice_agents.objection_handler_agent(state)
+
+    assert llm.calls == 3
+    assert result["objections"][-1].type == "Preis"
+    assert result["messages"][-1].content.startswith("Verstehe ich")
+
+    monkeypatch.setattr(voice_agents, "OBJECTION_TEMPLATES", False)
+    voice_agents.objection_handler_agent(_objection_state("Das ist uns zu teuer."))
+    assert llm.calls == 4
+
+
+def test_objection_handler_needs_more_than_one_word_for_template(monkeypatch):
+    llm = CountingLLM()
+    monkeypatch.setattr(voice_agents, "llm", llm)
+
+    # BANT answers that contain objection words
+    for text in ["Ich bin der Chef hier, ich entscheide.", "Später im Jahr wollen wir starten."]:
+        result = voice_agents.objection_handler_agent(_objection_state(text))
+        assert result["objections"][-1].type == "Andere"
+    # One bare pattern word ("ChatGPT") classifies, but is too weak for a canned answer
+    result = voice_agents.objection_handler_agent(_objection_state("Wir überlegen, ChatGPT zu testen."))
+
+    assert classify_objection("Wir überlegen, ChatGPT zu testen.").confidence == 0.6
+    assert result["objections"][-1].type == "Bereits-Lösung"
+    assert llm.calls == 3
@@ -0,0 +1,107 @@
+"""
+Tests for the batched persistence queue
+Run with: python -m pytest tests/test_voice_persistence.py -v
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+# Add parent dir to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from everlast_voice_agents.voice_persistence import PersistenceQueue
+
+
+class RecordingWriter:
+    """Collects written batches; fails the first `failures` calls"""
+
+    def __init__(self, failures: int = 0, reject=None):
+        self.batches = []
+        self.failures = failures
+        self.reject = reject
+
+    async def __call__(self, table, rows):
+        if self.failures > 0:
+            self.failures -= 1
+            raise ConnectionError("supabase unavailable")
+        if self.reject and any(self.reject(row) for row in rows):
+            raise ValueError("invalid row")
+        self.batches.append((table, list(rows)))
+
+
+@pytest.mark.asyncio
+async def test_rows_are_batched_per_table():
+    writer = RecordingWriter()
+    queue = PersistenceQueue(writer, batch_size=10, flush_interval=0.05)
+
+    for i in range(25):
+        assert queue.enqueue("objections", {"i": i})
+    queue.enqueue("consent_logs", {"i": 0})
+    await queue.close()
+
+    sizes = sorted(len(rows) for table, rows in writer.batches if table == "objections")
+    assert sizes == [5, 10, 10]
+    assert queue.stats()["objections"]["written"] == 25
+    assert queue.stats()["consent_logs"]["written"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_retried_with_backoff():
+    writer = RecordingWriter(failures=2)
+    queue = PersistenceQueue(writer, flush_interval=0.01, retry_base_delay=0.01)
+
+    queue.enqueue("appointments", {"id": 1})
+    await queue.close()
+
+    stats = queue.stats()["appointments"]
+    assert stats["retries"] == 2
+    assert stats["written"] == 1
+    assert stats["failed"] == 0
+
+
+@pytest.mark.asyncio
+async def test_bad_row_does_not_drop_its_batch():
+    writer = RecordingWriter(reject=lambda row: row["id"] == 2)
+    queue = PersistenceQueue(writer, flush_interval=0.05, max_retries=1, retry_base_delay=0.01)
+
+    for i in range(4):
+        queue.enqueue("call_summaries", {"id": i})
+    await queue.close()
+
+    written = [row["id"] for _, rows in writer.batches for row in rows]
+    assert sorted(written) == [0, 1, 3]
+    assert queue.stats()["call_summaries"]["failed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_full_queue_drops_instead_of_blocking():
+    writer = RecordingWriter()
+    queue = PersistenceQueue(writer, max_queue_size=2, flush_interval=0.05)
+
+    results = [queue.enqueue("objections", {"i": i}) for i in range(3)]
+    await queue.close()
+
+    assert results == [True, True, False]
+    assert queue.stats()["objections"]["dropped"] == 1
+    assert queue.enqueue("objections", {"i": 4}) is False
+
+
+@pytest.mark.asyncio
+async def test_write_listener_sees_stored_rows_only():
+    written = []
+    writer = RecordingWriter(reject=lambda row: row["id"] == 1)
+    queue = PersistenceQueue(
+        writer,
+        flush_interval=0.01,
+        max_retries=0,
+        on_written=lambda table, rows: written.append((table, rows))
+    )
+
+    queue.enqueue("objections", {"id": 0})
+    queue.enqueue("objections", {"id": 1})
+    await queue.close()
+
+    assert written == [("objections", 1)]
@@ -0,0 +1,108 @@
+"""
+Tests for the precompiled agent prompts and prompt-cache counters
+Run with: python -m pytest tests/test_voice_prompts.py -v
+"""
+
+import os
+import sys
+
+# Add parent dir to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from langchain_core.messages import AIMessage
+from everlast_voice_agents.voice_prompts import (
+    PROMPT_CACHE_MIN_TOKENS,
+    AgentPrompt,
+    PromptStats,
+    estimate_tokens,
+    load_shared_context,
+)
+
+
+def test_static_system_block_is_cached_and_hint_follows_it():
+    prompt = AgentPrompt("Du bist Anna.", "Letzte Nachricht: {last_message}", cache=True)
+
+    system, human = prompt.format_messages(last_message="Preis {teuer}?")
+    assert system.content == [{"type": "text", "text": "Du bist Anna.", "cache_control": {"type": "ephemeral"}}]
+    assert human.content == "Letzte Nachricht: Preis {teuer}?"
+
+    system, _ = prompt.format_messages("Der Caller ist frustriert.", last_message="Nein")
+    assert system.content[0]["cache_control"] == {"type": "ephemeral"}
+    assert system.content[1] == {"type": "text", "text": "Der Caller ist frustriert."}
+    assert system.text == "Du bist Anna.Der Caller ist frustriert."
+
+    uncached, _ = AgentPrompt("Du bist Anna.", "{x}", cache=False).format_messages(x="")
+    assert "cache_control" not in uncached.content[0]
+
+
+def test_stats_count_tokens_and_cache_hits_per_agent():
+    stats = PromptStats()
+    stats.record("bant_qualifier", AIMessage(content="", usage_metadata={
+        "input_tokens": 1200, "output_tokens": 40, "total_tokens": 1240,
+        "input_token_details": {"cache_creation": 1000},
+    }))
+    stats.record("bant_qualifier", AIMessage(content="", usage_metadata={
+        "input_tokens": 1200, "output_tokens": 60, "total_tokens": 1260,
+        "input_token_details": {"cache_read": 1000},
+    }))
+    stats.record("supervisor", AIMessage(content="bant_qualifier"))
+
+    snapshot = stats.snapshot()
+    bant = snapshot["by_agent"]["bant_qualifier"]
+    assert snapshot["total_calls"] == 3
+    assert bant["calls"] == 2
+    assert bant["cache_hits"] == 1
+    assert bant["cache_read_tokens"] == 1000
+    assert bant["cache_creation_tokens"] == 1000
+    assert bant["cache_hit_rate"] == 50.0
+    assert bant["cached_input_share"] == round(1000 / 2400 * 100, 2)
+    assert snapshot["by_agent"]["supervisor"]["input_tokens"] == 0
+
+
+def test_stats_count_template_answers():
+    stats = PromptStats()
+    stats.record("objection_handler", AIMessage(content="Verstehe."))
+    stats.record_template("objection_handler")
+    stats.record_template("objection_handler")
+    stats.record_template("objection_handler")
+
+    snapshot = stats.snapshot()
+    objection = snapshot["by_agent"]["objection_handler"]
+    assert snapshot["total_calls"] == 1
+    assert snapshot["total_template_responses"] == 3
+    assert objection["template_share"] == 75.0
+    assert objection["cache_hit_rate"] == 0
+
+
+def test_shared_context_precedes_cached_agent_block(capsys):
+    shared = "Gemeinsamer Kontext. " * 300
+    prompt = AgentPrompt("Du bist Anna.", "{x}", cache=True, shared=shared, name="bant_qualifier")
+
+    system, _ = prompt.format_messages("Hinweis", x="")
+    assert [block["text"] for block in system.content] == [shared, "Du bist Anna.", "Hinweis"]
+    assert "cache_control" not in system.content[0]
+    assert system.content[1]["cache_control"] == {"type": "ephemeral"}
+    assert prompt.cacheable
+    assert capsys.readouterr().out == ""
+
+    short = AgentPrompt("Du bist Anna.", "{x}", cache=True, name="kurz")
+    assert not short.cacheable
+    assert "below the 1024-token cache minimum" in capsys.readouterr().out
+
+
+def test_shared_context_from_config(tmp_path):
+    config = tmp_path / "config.yaml"
+    config.write_text(
+        "agent:\n  name: Anna\n"
+        "objections:\n  preis:\n    type: Preis\n    patterns: [zu teuer]\n    response: Verstehe.\n"
+        "sentiment:\n  lexicon:\n    positive: [gut]\n",
+        encoding="utf-8"
+    )
+
+    context = load_shared_context(str(config))
+    assert "name: Anna" in context and "response: Verstehe." in context
+    assert "patterns" not in context and "lexicon" not in context
+    assert load_shared_context(str(tmp_path / "missing.yaml")) == ""
+
+    # The shipped config makes every agent prefix long enough to be cached
+    assert estimate_tokens(load_shared_context()) >= PROMPT_CACHE_MIN_TOKENS
@@ -0,0 +1,127 @@
+"""
+Tests for batch sentiment re-scoring
+Run with: python -m pytest tests/test_voice_rescoring.py -v
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+# Add parent dir to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from everlast_voice_agents.voice_rescoring import (
+    CallTranscript,
+    main,
+    read_checkpoints,
+    read_transcripts,
+    rescore_calls,
+    score_calls,
+    score_utterances,
+)
+from everlast_voice_agents.voice_state import SentimentState, analyze_sentiment
+
+UTTERANCES = [
+    "Ja, gerne!",
+    "Nein, das ist nicht gut.",
+    "Wow, genial.",
+    "Das ist unverschämt",
+    "Im Januar vielleicht",
+]
+
+
+def test_batch_scores_match_analyze_sentiment():
+    expected = []
+    for text in UTTERANCES:
+        state = analyze_sentiment(text, SentimentState())
+        expected.append((state.current_sentiment, state.sentiment_score, state.confidence))
+
+    assert score_utterances(UTTERANCES) == expected
+
+
+def test_call_rows_have_start_end_and_trend():
+    rows = score_calls([
+        CallTranscript("conv-1", ["Das ist unverschämt", "Ja, super"]),
+        CallTranscript("conv-2", []),
+        CallTranscript("conv-3", ["Ja gut", "Okay"]),
+    ])
+
+    assert rows == [
+        {"conversation_id": "conv-1", "sentiment_start": "frustriert", "sentiment_end": "positiv", "sentiment_trend": "verbessert"},
+        {"conversation_id": "conv-2", "sentiment_start": "neutral", "sentiment_end": "neutral", "sentiment_trend": "gleich"},
+        {"conversation_id": "conv-3", "sentiment_start": "positiv", "sentiment_end": "neutral", "sentiment_trend": "verschlechtert"},
+    ]
+
+
+def test_read_transcripts_groups_utterance_lines(tmp_path):
+    path = tmp_path / "transcripts.jsonl"
+    lines = [
+        {"conversation_id": "a", "role": "assistant", "text": "Guten Tag"},
+        {"conversation_id": "a", "role": "user", "text": "Ja"},
+        {"conversation_id": "a", "text": "Gerne"},
+        {"conversation_id": "b", "utterances": ["Nein"]},
+        {"conversation_id": "c", "text": "Wow"},
+    ]
+    path.write_text("\n".join(json.dumps(line) for line in lines) + "\n", encoding="utf-8")
+
+    assert list(read_transcripts(str(path))) == [
+        CallTranscript("a", ["Ja", "Gerne"]),
+        CallTranscript("b", ["Nein"]),
+        CallTranscript("c", ["Wow"]),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_read_checkpoints_scores_only_the_latest_call():
+    from langchain_core.messages import AIMessage, HumanMessage
+
+    class Checkpoints:
+        async def list_threads(self, limit=100):
+            return ["+49123"]
+
+        async def get(self, thread_id):
+            return {
+                "conversation_id": "call-2",
+                "call_message_offset": 2,
+                "messages": [
+                    HumanMessage(content="Das ist unverschämt"),  # call-1
+                    AIMessage(content="Das tut mir leid."),
+                    HumanMessage(content="Ja, gerne!"),
+                    AIMessage(content="Super."),
+                ],
+            }
+
+    calls = [call async for call in read_checkpoints(Checkpoints())]
+    assert calls == [CallTranscript("call-2", ["Ja, gerne!"])]
+
+
+@pytest.mark.asyncio
+async def test_rescore_streams_chunks_to_writer():
+    written = []
+
+    async def write(rows):
+        written.append([row["conversation_id"] for row in rows])
+        return len(rows)
+
+    calls = [CallTranscript(f"conv-{i}", ["Ja"]) for i in range(5)]
+    result = await rescore_calls(calls, write, chunk_size=2)
+
+    assert written == [["conv-0", "conv-1"], ["conv-2", "conv-3"], ["conv-4"]]
+    assert result["calls"] == 5
+    assert result["updated"] == 5
+    assert result["sentiment_end"] == {"positiv": 5}
+
+
+@pytest.mark.asyncio
+async def test_cli_dry_run(tmp_path, capsys):
+    path = tmp_path / "transcripts.jsonl"
+    path.write_text(json.dumps({"conversation_id": "a", "utterances": ["Nein", "Wow"]}) + "\n", encoding="utf-8")
+
+    result = await main([str(path), "--dry-run"])
+
+    assert result["calls"] == 1
+    assert result["updated"] == 0
+    assert result["sentiment_end"] == {"begeistert": 1}
+    assert '"calls": 1' in capsys.readouterr().out
@@ -0,0 +1,82 @@
+"""
+Tests for the deterministic supervisor router
+Run with: python -m pytest tests/test_voice_router.py -v
+"""
+
+import os
+import sys
+
+# Add parent dir to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from everlast_voice_agents.voice_router import RouterStats, route_deterministic
+from everlast_voice_agents.voice_state import BANTState, SentimentState, create_initial_state
+
+
+def _state(**overrides):
+    state = create_initial_state(conversation_id="conv-1", phone_number="+49123456789")
+    state["call_started"] = True
+    state.update(overrides)
+    return state
+
+
+def test_consent_before_call_start():
+    decision = route_deterministic(_state(call_started=False), "Guten Tag")
+    assert decision.agent == "dsgvo_logger"
+    assert decision.confidence >= 0.9
+
+
+def test_call_end_goes_to_logger():
+    decision = route_deterministic(_state(call_ended=True), "Tschüss")
+    assert decision.agent == "dsgvo_logger"
+
+
+def test_objection_cue_routes_to_objection_handler():
+    sentiment = SentimentState(current_sentiment="negativ", sentiment_score=-0.5)
+    decision = route_deterministic(_state(), "Das ist uns zu teuer", sentiment)
+    assert decision.agent == "objection_handler"
+    assert decision.confidence >= 0.9
+
+
+def test_qualified_lead_with_booking_cue_goes_to_calendly():
+    bant = BANTState(budget="Ja", authority="Entscheider", need="Hoch", timeline="Sofort")
+    decision = route_deterministic(_state(bant=bant), "Gerne einen Termin nächste Woche")
+    assert decision.agent == "calendly_booker"
+    assert decision.reason == "qualified_A"
+
+
+def test_discovery_phase_goes_to_bant_qualifier():
+    decision = route_deterministic(_state(), "Wir sind 25 Mitarbeiter")
+    assert decision.agent == "bant_qualifier"
+
+
+def test_ambiguous_case_has_low_confidence():
+    sentiment = SentimentState(current_sentiment="frustriert", sentiment_score=-0.7)
+    decision = route_deterministic(_state(), "Hm, na gut", sentiment)
+    assert decision.confidence < 0.75
+
+
+def test_router_stats_counts_paths():
+    stats = RouterStats()
+    stats.record("rules", "bant_qualifier", "bant_incomplete")
+    stats.record("rules", "bant_qualifier", "bant_incomplete")
+    stats.record("llm_fallback", "objection_handler")
+
+    snapshot = stats.snapshot()
+    assert snapshot["total_decisions"] == 3
+    assert snapshot["rule_decisions"] == 2
+    assert snapshot["llm_fallbacks"] == 1
+    assert snapshot["by_agent"] == {"bant_qualifier": 2, "objection_handler": 1}
+
+
+def test_bant_answers_with_objection_words_are_not_rule_routed():
+    # Timeline/authority answers and words that merely contain a cue
+    for text in ["Später im Jahr wollen wir starten", "Ich bin der Chef, ich entscheide das"]:
+        decision = route_deterministic(_state(), text)
+        assert decision.reason == "objection_word" and decision.confidence < 0.75, text
+
+    decision = route_deterministic(_state(), "Schicken Sie uns einen Kostenvoranschlag")
+    assert decision.agent == "bant_qualifier"
+
+    decision = route_deterministic(_state(), "Das muss ich mit meinem Chef besprechen")
+    assert decision.agent == "objection_handler" and decision.confidence >= 0.75
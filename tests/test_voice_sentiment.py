@@ -0,0 +1,82 @@
+"""
+Tests for the compiled sentiment matcher
+Run with: python -m pytest tests/test_voice_sentiment.py -v
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add parent dir to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from everlast_voice_agents.voice_sentiment import (
+    DEFAULT_SENTIMENT_LEXICON,
+    SentimentMatcher,
+    load_sentiment_matcher,
+)
+from everlast_voice_agents.voice_state import SENTIMENT_HISTORY_WINDOW, SentimentState, analyze_sentiment
+
+
+def test_matches_whole_words_and_counts_occurrences():
+    matcher = SentimentMatcher(DEFAULT_SENTIMENT_LEXICON)
+
+    assert matcher.count("Im Januar passt es") == (0, 0, 0, 0)
+    assert matcher.count("Das ist nichts für uns") == (0, 0, 0, 0)
+    assert matcher.count("Ja, gut! Super/toll.") == (3, 0, 0, 1)
+    assert matcher.count_by_category("Nein, nicht schon wieder - ich bin GENERVT!") == {
+        "positive": 0, "negative": 2, "frustration": 1, "excitement": 0
+    }
+
+
+def test_phrases_and_duplicate_words():
+    matcher = SentimentMatcher({"frustration": ["es reicht jetzt"], "positive": ["ja"]})
+    assert matcher.count("Ja, es reicht jetzt!") == (1, 0, 1, 0)
+    assert matcher.count("es reicht") == (0, 0, 0, 0)
+
+    with pytest.raises(ValueError):
+        SentimentMatcher({"positive": ["gut"], "negative": ["Gut"]})
+
+
+def test_lexicon_from_config_file(tmp_path):
+    config = tmp_path / "config.yaml"
+    config.write_text("sentiment:\n  lexicon:\n    positive: [prima]\n", encoding="utf-8")
+
+    matcher = load_sentiment_matcher(str(config))
+    assert matcher.count("prima, ja") == (1, 0, 0, 0)
+    # Categories missing in the file keep their defaults
+    assert matcher.count("wow") == (0, 0, 0, 1)
+
+    assert load_sentiment_matcher(str(tmp_path / "missing.yaml")).count("ja") == (1, 0, 0, 0)
+
+
+def test_analyze_sentiment_uses_matcher():
+    assert analyze_sentiment("Das ist unverschämt!", SentimentState()).current_sentiment == "frustriert"
+    assert analyze_sentiment("Im Januar, gerne.", SentimentState()).current_sentiment == "positiv"
+    assert analyze_sentiment("Nichts Neues", SentimentState()).current_sentiment == "neutral"
+
+
+def test_history_is_bounded_and_aggregates_cover_the_call():
+    sentiment = SentimentState()
+    scores = [-0.7] + [0.0] * 40 + [0.5]
+    for score in scores:
+        sentiment.update("positiv" if score > 0 else "neutral", score, 0.5)
+    sentiment.update("begeistert", 0.9, 0.9)
+
+    assert len(sentiment.history) == SENTIMENT_HISTORY_WINDOW
+    assert sentiment.history[-1]["sentiment"] == "begeistert"
+    assert sentiment.update_count == len(scores) + 1
+    assert sentiment.start_sentiment == "neutral"
+    assert (sentiment.min_score, sentiment.max_score) == (-0.7, 0.9)
+    assert sentiment.trend() == "verbessert"
+    assert sentiment.summary().startswith(f"{len(scores) + 1} Messungen, Start neutral, zuletzt neutral, positiv, begeistert")
+
+
+def test_full_history_from_older_checkpoints_is_folded_into_aggregates():
+    history = [{"sentiment": "frustriert", "score": -0.7}] + [{"sentiment": "neutral", "score": 0.0}] * 30
+    sentiment = SentimentState(history=history)
+
+    assert sentiment.update_count == 31
+    assert sentiment.start_sentiment == "frustriert"
+    assert len(sentiment.history) == SENTIMENT_HISTORY_WINDOW
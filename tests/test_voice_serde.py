@@ -0,0 +1,93 @@
+"""
+Tests for typed checkpoint serialization
+Run with: python -m pytest tests/test_voice_serde.py -v
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+# Add parent dir to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from everlast_voice_agents.voice_checkpointer import SqliteSaver
+from everlast_voice_agents.voice_serde import SERDE_VERSION, dumps, dumps_state, loads, loads_state
+from everlast_voice_agents.voice_state import (
+    AppointmentState,
+    BANTState,
+    ObjectionRecord,
+    SentimentState,
+    create_initial_state,
+)
+
+
+def test_models_and_messages_round_trip_typed():
+    value = {
+        "bant": BANTState(budget="Ja", need="Hoch"),
+        "objections": [ObjectionRecord(type="Preis", text="zu teuer")],
+        "messages": [HumanMessage(content="Hallo"), AIMessage(content="Guten Tag!")],
+    }
+
+    loaded = loads(dumps(value))
+
+    assert loaded["bant"] == value["bant"]
+    assert isinstance(loaded["objections"][0], ObjectionRecord)
+    assert isinstance(loaded["messages"][0], HumanMessage)
+    assert isinstance(loaded["messages"][1], AIMessage)
+    assert loaded["messages"][1].content == "Guten Tag!"
+
+
+def test_tags_keep_model_fields_queryable():
+    row = json.loads(dumps_state({"bant": BANTState(need="Hoch")}))
+
+    assert row["__v"] == SERDE_VERSION
+    assert row["bant"]["need"] == "Hoch"
+    assert row["bant"]["__type__"] == "BANTState"
+
+
+def test_untagged_checkpoints_are_upgraded():
+    legacy = json.dumps({
+        "bant": {"budget": "Nein"},
+        "appointment": {"booked": True},
+        "objections": [{"type": "Zeit"}],
+        "messages": [{"type": "human", "content": "Hallo"}],
+    })
+
+    state = loads_state(legacy)
+
+    assert state["bant"].budget == "Nein"
+    assert state["appointment"].booked is True
+    assert state["objections"][0].type == "Zeit"
+    assert isinstance(state["messages"][0], HumanMessage)
+
+
+def test_newer_format_is_rejected():
+    with pytest.raises(ValueError):
+        loads_state(json.dumps({"__v": SERDE_VERSION + 1}))
+
+
+@pytest.mark.asyncio
+async def test_sqlite_reload_is_typed(tmp_path):
+    saver = SqliteSaver(str(tmp_path / "checkpoints.db"))
+    state = create_initial_state("conv-1", "+49123")
+    state["messages"] = [HumanMessage(content="Das klingt interessant")]
+    state["caller_sentiment"].update("positiv", 0.6, 0.7)
+    await saver.set("+49123", state)
+    await saver.close()
+
+    fresh = SqliteSaver(saver.db_path)
+    loaded = await fresh.get("+49123")
+    await fresh.close()
+
+    assert isinstance(loaded["bant"], BANTState)
+    assert isinstance(loaded["appointment"], AppointmentState)
+    assert isinstance(loaded["messages"][0], HumanMessage)
+    assert isinstance(loaded["caller_sentiment"], SentimentState)
+    assert len(loaded["caller_sentiment"].history) == 1
+    # The next turn mutates the reloaded models directly
+    loaded["caller_sentiment"].update("neutral", 0.0, 0.5)
+    assert loaded["bant"].model_dump()["budget"] is None